@@ -8,22 +8,8 @@ from tkinter import ttk, font, messagebox
 import RPi.GPIO as GPIO
 import requests
 from datetime import datetime, timedelta
-
-# API URLs for Fingerprint, NFC, and Current Date-Time
-FINGERPRINT_API_URL = "https://prolocklogger.pro/api/getuserbyfingerprint/"
-TIME_IN_FINGERPRINT_URL = "https://prolocklogger.pro/api/logs/time-in/fingerprint"
-TIME_OUT_FINGERPRINT_URL = "https://prolocklogger.pro/api/logs/time-out/fingerprint"
-RECENT_LOGS_FINGERPRINT_URL2 = 'https://prolocklogger.pro/api/recent-logs/by-fingerid'
-LAB_SCHEDULE_FINGERPRINT_URL = 'https://prolocklogger.pro/api/lab-schedules/fingerprint/'
-
-USER_INFO_URL = 'https://prolocklogger.pro/api/user-information/by-id-card'
-RECENT_LOGS_URL = 'https://prolocklogger.pro/api/recent-logs'
-TIME_IN_URL = 'https://prolocklogger.pro/api/logs/time-in'
-TIME_OUT_URL = 'https://prolocklogger.pro/api/logs/time-out'
-RECENT_LOGS_URL2 = 'https://prolocklogger.pro/api/recent-logs/by-uid'
-CURRENT_DATE_TIME_URL = 'https://prolocklogger.pro/api/current-date-time'
-LAB_SCHEDULE_URL = 'https://prolocklogger.pro/api/student/lab-schedule/rfid/'
-LOGS_URL = 'https://prolocklogger.pro/api/logs'  # Added log status API URL
+from prolock_api import api  # Shared keep-alive client for prolocklogger.pro
+from remote_commands import RemoteCommandPoller
 
 # GPIO pin configuration for the solenoid lock and buzzer
 SOLENOID_PIN = 17
@@ -101,8 +87,10 @@ class AttendanceApp:
         self.last_time_in = {}
         self.is_manual_unlock = False  # Flag to check if the door was manually unlocked
 
-        # Start periodic checking of log status
-        self.root.after(1000, self.check_log_status_periodically)  # Check log status every 10 seconds
+        # Watch /logs for new status entries (incremental, sub-second), and re-apply the latest
+        # status every 10 seconds as the old full poll did, so a missed GPIO action is corrected
+        self.remote_commands = RemoteCommandPoller(api, self.handle_remote_log, reapply=self.handle_remote_log)
+        self.remote_commands.start()
 
         # Handle window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -140,34 +128,20 @@ class AttendanceApp:
         GPIO.output(SOLENOID_PIN, GPIO.HIGH)
         print("Door locked.")
 
-    def fetch_latest_log_status(self):
-        try:
-            response = requests.get(LOGS_URL)
-            response.raise_for_status()
-            logs = response.json().get("logs", [])
-
-            if logs:
-                latest_log = logs[-1]  # Get the latest log (assumes logs are in chronological order)
-                status = latest_log.get("status", "")
-
-                # Only lock the door if it was not manually unlocked
-                if not self.is_manual_unlock:
-                    if status == "close":
-                        self.lock_door()
-                    elif status == "open":
-                        self.unlock_door()
-        except requests.RequestException as e:
-            print(f"Error fetching log status: {e}")
+    def handle_remote_log(self, latest_log):
+        """Apply a new /logs entry delivered by the remote command poller."""
+        status = latest_log.get("status", "")
 
-    def check_log_status_periodically(self):
-        self.fetch_latest_log_status()
-        self.root.after(10000, self.check_log_status_periodically)  # Call again after 10 seconds
+        # Only lock the door if it was not manually unlocked
+        if not self.is_manual_unlock:
+            if status == "close":
+                self.lock_door()
+            elif status == "open":
+                self.unlock_door()
 
     def get_user_details(self, fingerprint_id):
         try:
-            response = requests.get(f"{FINGERPRINT_API_URL}{fingerprint_id}")
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_user_by_fingerprint(fingerprint_id)
             return data.get('name', None)
         except requests.RequestException as e:
             print("API Error", f"Failed to fetch data from API: {e}")
@@ -175,9 +149,7 @@ class AttendanceApp:
 
     def fetch_current_date_time(self):
         try:
-            response = requests.get(CURRENT_DATE_TIME_URL)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_current_date_time()
             if 'day_of_week' in data and 'current_time' in data:
                 return data
             else:
@@ -203,9 +175,7 @@ class AttendanceApp:
 
             print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
 
-            response = requests.get(f"{LAB_SCHEDULE_FINGERPRINT_URL}{fingerprint_id}")
-            response.raise_for_status()
-            schedules = response.json()
+            schedules = api.get_lab_schedule_fingerprint(fingerprint_id)
 
             for schedule in schedules:
                 schedule_day = schedule.get('day_of_the_week')
@@ -242,9 +212,7 @@ class AttendanceApp:
 
             print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
 
-            response = requests.get(f"{LAB_SCHEDULE_URL}{rfid_number}")
-            response.raise_for_status()
-            schedules = response.json()
+            schedules = api.get_lab_schedule_rfid(rfid_number)
 
             for schedule in schedules:
                 schedule_day = schedule.get('day_of_the_week')
@@ -266,10 +234,7 @@ class AttendanceApp:
 
     def check_time_in_record_fingerprint(self, fingerprint_id):
         try:
-            url = f"{RECENT_LOGS_FINGERPRINT_URL2}?fingerprint_id={fingerprint_id}"
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs_by_fingerprint(fingerprint_id)
             return any(log.get('time_in') and not log.get('time_out') for log in logs)
         except requests.RequestException as e:
             print(f"Error checking Time-In record: {e}")
@@ -280,9 +245,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_IN_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_in={current_time_data['current_time']}&user_name={user_name}&role_id={role_id}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_in_fingerprint(fingerprint_id, current_time_data['current_time'], user_name, role_id)
             print("Time-In recorded successfully.")
             print("Success", "Time-In recorded successfully.")
         except requests.RequestException as e:
@@ -293,9 +256,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_OUT_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_out_fingerprint(fingerprint_id, current_time_data['current_time'])
             print("Time-Out recorded successfully.")
         except requests.RequestException as e:
             print(f"Error recording Time-Out: {e}")
@@ -376,17 +337,13 @@ class AttendanceApp:
 
     def record_all_time_out(self):
         try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs()
 
             for log in logs:
                 uid = log.get('UID')
                 if log.get('time_in') and not log.get('time_out') and uid:
                     default_time_out = "00:00"
-                    url = f"{TIME_OUT_URL}?rfid_number={uid}&time_out={default_time_out}"
-                    response = requests.put(url)
-                    response.raise_for_status()
+                    api.time_out(uid, default_time_out)
                     print(f"Time-Out recorded for UID {uid} at {default_time_out}.")
 
             self.refresh_logs_table()
@@ -399,9 +356,7 @@ class AttendanceApp:
 
     def fetch_recent_logs(self):
         try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs()
             for i in self.logs_tree.get_children():
                 self.logs_tree.delete(i)
             for log in logs:
@@ -433,10 +388,7 @@ class AttendanceApp:
 
     def fetch_user_info(self, uid):
         try:
-            url = f'{USER_INFO_URL}?id_card_id={uid}'
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_user_by_id_card(uid)
 
             self.student_number_entry.delete(0, tk.END)
             self.student_number_entry.insert(0, data.get('user_number', 'None'))
@@ -465,7 +417,7 @@ class AttendanceApp:
                 self.last_time_in[uid] = current_time
 
         except requests.HTTPError as http_err:
-            if response.status_code == 404:
+            if http_err.response is not None and http_err.response.status_code == 404:
                 self.clear_data()
                 self.update_result("Card is not registered, Please contact the administrator.")
             else:
@@ -475,10 +427,7 @@ class AttendanceApp:
 
     def check_time_in_record(self, rfid_number):
         try:
-            url = f'{RECENT_LOGS_URL2}?rfid_number={rfid_number}'
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs_by_uid(rfid_number)
             return any(log.get('time_in') and not log.get('time_out') for log in logs)
         except requests.RequestException as e:
             self.update_result(f"Error checking Time-In record: {e}")
@@ -493,9 +442,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_IN_URL}?rfid_number={rfid_number}&time_in={current_time_data['current_time']}&year={year}&user_name={user_name}&role_id=3"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_in(rfid_number, current_time_data['current_time'], year, user_name)
             print("Time-In recorded successfully.")
             self.update_result("Time-In recorded successfully.")
             self.fetch_recent_logs()
@@ -515,9 +462,7 @@ class AttendanceApp:
                 self.update_result("No Time-In record found for this RFID. Cannot record Time-Out.")
                 return
 
-            url = f"{TIME_OUT_URL}?rfid_number={rfid_number}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_out(rfid_number, current_time_data['current_time'])
             print("Time-Out recorded successfully.")
             self.update_result("Time-Out recorded successfully.")
             self.fetch_recent_logs()
@@ -536,6 +481,7 @@ class AttendanceApp:
 
     def on_closing(self):
         self.running = False
+        self.remote_commands.stop()
         if self.nfc_thread.is_alive():
             self.nfc_thread.join()
         if self.fingerprint_thread.is_alive():
@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+
+import requests
+
+from tracing import span
+
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_journal.db')
+
+# API client methods the journal is allowed to replay
+JOURNAL_ACTIONS = (
+    'time_in_fingerprint',
+    'time_out_fingerprint',
+    'time_in',
+    'time_out',
+    'update_door_status',
+)
+
+RETRY_BASE_DELAY = 2  # seconds; doubles on every failed attempt
+RETRY_MAX_DELAY = 5 * 60
+DONE_RETENTION = 7 * 24 * 60 * 60  # Keep uploaded events a week for auditing
+
+PENDING = 'pending'
+DONE = 'done'
+REJECTED = 'rejected'
+
+
+class AttendanceJournal:
+    """Durable, append-only record of attendance and door events (SQLite, WAL mode).
+
+    Every time-in, time-out and door event is written here before any network
+    call, with its own idempotency key and the day it happened, so it
+    survives a crash or an outage and is replayed to the API in the order
+    it happened, dated to that day rather than the day it is uploaded.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " idempotency_key TEXT NOT NULL UNIQUE,"
+            " action TEXT NOT NULL,"
+            " args TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " event_date TEXT)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(journal)")]
+        if 'event_date' not in columns:  # Journal written before events were dated
+            self.conn.execute("ALTER TABLE journal ADD COLUMN event_date TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS journal_status ON journal (status, id)")
+        self.conn.commit()
+
+    def append(self, action, *args, day=None, key=None):
+        """Record an event that happened on `day` (ISO date, default today) and return its idempotency key.
+
+        `key` defaults to a fresh UUID. An event whose `key` is already in
+        the journal is not recorded twice.
+        """
+        if action not in JOURNAL_ACTIONS:
+            raise ValueError(f"Unknown journal action: {action}")
+        key = key or str(uuid.uuid4())
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO journal (idempotency_key, action, args, created_at, event_date) VALUES (?, ?, ?, ?, ?)",
+                (key, action, json.dumps(args), time.time(), day or date.today().isoformat()),
+            )
+            self.conn.commit()
+        return key
+
+    def next_pending(self):
+        """Oldest event still to upload, as (id, key, action, args, event_date, attempts, next_attempt_at)."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, idempotency_key, action, args, event_date, attempts, next_attempt_at FROM journal"
+                " WHERE status = ? ORDER BY id LIMIT 1", (PENDING,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6]
+
+    def latest_pending(self, actions, subject):
+        """Newest pending event among `actions` whose first argument is `subject`, as its action, or None."""
+        placeholders = ', '.join('?' * len(actions))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT action, args FROM journal WHERE status = ? AND action IN ({placeholders}) ORDER BY id DESC",
+                (PENDING,) + tuple(actions)
+            ).fetchall()
+        for action, args in rows:
+            args = json.loads(args)
+            if args and str(args[0]) == str(subject):
+                return action
+        return None
+
+    def latest_pending_all(self, actions):
+        """{first argument: action} of the newest pending event among `actions` for every subject that has one."""
+        placeholders = ', '.join('?' * len(actions))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT action, args FROM journal WHERE status = ? AND action IN ({placeholders}) ORDER BY id",
+                (PENDING,) + tuple(actions)
+            ).fetchall()
+        latest = {}
+        for action, args in rows:
+            args = json.loads(args)
+            if args:
+                latest[str(args[0])] = action
+        return latest
+
+    def mark_done(self, entry_id):
+        self._update(entry_id, "status = ?, last_error = NULL", (DONE,))
+
+    def mark_rejected(self, entry_id, error):
+        self._update(entry_id, "status = ?, attempts = attempts + 1, last_error = ?", (REJECTED, str(error)))
+
+    def mark_retry(self, entry_id, error, delay):
+        self._update(entry_id, "attempts = attempts + 1, next_attempt_at = ?, last_error = ?",
+                     (time.time() + delay, str(error)))
+
+    def _update(self, entry_id, assignments, values):
+        with self.lock:
+            self.conn.execute(f"UPDATE journal SET {assignments} WHERE id = ?", values + (entry_id,))
+            self.conn.commit()
+
+    def pending_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM journal WHERE status = ?", (PENDING,)).fetchone()[0]
+
+    def purge_done(self, older_than=DONE_RETENTION):
+        with self.lock:
+            self.conn.execute("DELETE FROM journal WHERE status = ? AND created_at < ?",
+                              (DONE, time.time() - older_than))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class JournalUploader:
+    """Background thread that drains the journal to the API.
+
+    Events are sent strictly in order, each with its idempotency key. A
+    network error or 5xx leaves the event at the head of the queue and backs
+    off exponentially; a 4xx means the server will never accept it, so it is
+    marked rejected (kept for inspection) and the queue moves on.
+    """
+
+    def __init__(self, client, journal, clock=None):
+        self.client = client
+        self.journal = journal
+        self.clock = clock  # TimeSync; events are dated by the server's clock once it has synced
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+        self.listeners = []  # Called with (action, args) after each successful upload
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._upload_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def notify(self):
+        """Wake the uploader because a new event was appended."""
+        self.wakeup.set()
+
+    def today(self):
+        current = self.clock.now_datetime() if self.clock is not None else None
+        return (current.date() if current is not None else date.today()).isoformat()
+
+    def submit(self, action, *args, idempotency_key=None):
+        """Append an event to the journal and wake the uploader. Never blocks on the network."""
+        with span('journal append'):
+            key = self.journal.append(action, *args, day=self.today(), key=idempotency_key)
+        self.notify()
+        return key
+
+    def _upload_loop(self):
+        self.journal.purge_done()
+        while self.running:
+            delay = self.upload_next()
+            if delay is None:
+                continue
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+
+    def upload_next(self):
+        """Try the oldest pending event. Returns seconds to wait, or None to continue at once."""
+        entry = self.journal.next_pending()
+        if entry is None:
+            return RETRY_MAX_DELAY
+        entry_id, key, action, args, event_date, attempts, next_attempt_at = entry
+
+        wait = next_attempt_at - time.time()
+        if wait > 0:
+            return wait
+
+        try:
+            getattr(self.client, action)(*args, log_date=event_date, idempotency_key=key)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and 400 <= status < 500 and status not in (408, 429):
+                print(f"Journal: {action} {args} rejected by server: {e}")
+                self.journal.mark_rejected(entry_id, e)
+                return None
+            return self._retry(entry_id, action, attempts, e)
+        except requests.RequestException as e:
+            return self._retry(entry_id, action, attempts, e)
+
+        self.journal.mark_done(entry_id)
+        for callback in self.listeners:
+            callback(action, args)
+        return None
+
+    def _retry(self, entry_id, action, attempts, error):
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempts))
+        print(f"Journal: {action} upload failed ({error}); retrying in {delay}s.")
+        self.journal.mark_retry(entry_id, error, delay)
+        return delay
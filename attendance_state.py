@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from datetime import date
+
+import requests
+
+from closeout import open_log_uids
+
+ATTENDANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_attendance.json')
+RECONCILE_INTERVAL = 60  # Seconds between background checks against /recent-logs
+
+OUT, IN = 'out', 'in'
+
+
+def open_state(logs):
+    """IN if any of a user's recent logs has a time-in but no time-out."""
+    return IN if any(log.get('time_in') and not log.get('time_out') for log in logs) else OUT
+
+
+class AttendanceState:
+    """Whether each card and faculty fingerprint is timed in (IN) or not (OUT), answered from memory.
+
+    A tap or scan toggles OUT -> IN -> OUT. Our own time-ins and time-outs
+    update the state as soon as they are journaled, so the next one decides
+    without asking the server. A background thread downloads /recent-logs
+    every `reconcile_interval` seconds and takes the server's word for every
+    card, except cards we changed after that download started or while the
+    journal still had events waiting to upload; those keep the local state
+    until a later pass. Until the first reconcile succeeds, an unknown card
+    is looked up once via /recent-logs/by-uid. /recent-logs has no
+    fingerprint IDs, so a fingerprint is looked up once a day via
+    /recent-logs/by-fingerid and after that only this kiosk changes it.
+    Either lookup is skipped when the journal still holds an unsent event
+    for that user. The state is saved to `path` and dropped when the day
+    changes.
+    """
+
+    def __init__(self, client, journal=None, path=ATTENDANCE_PATH, reconcile_interval=RECONCILE_INTERVAL):
+        self.client = client
+        self.journal = journal
+        self.path = path
+        self.reconcile_interval = reconcile_interval
+        self.lock = threading.Lock()
+        self.states = {}  # card UID -> IN or OUT
+        self.fingers = {}  # fingerprint ID (str) -> IN or OUT
+        self.changed_at = {}  # card UID -> monotonic time of our latest write
+        self.day = date.today().isoformat()
+        self.reconciled = False  # True once the whole table has been checked against the server
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Attendance: ignoring unreadable {self.path}: {e}")
+            return
+        if saved.get('day') == self.day:
+            self.states = saved.get('states', {})
+            self.fingers = saved.get('fingers', {})
+
+    def save(self):
+        with self.lock:
+            data = json.dumps({'day': self.day, 'states': self.states, 'fingers': self.fingers},
+                              separators=(',', ':'))
+        partial = self.path + '.part'
+        try:
+            with open(partial, 'w') as f:
+                f.write(data)
+            os.replace(partial, self.path)
+        except OSError as e:
+            print(f"Attendance: failed to save {self.path}: {e}")
+
+    def _roll_over(self):
+        """Start a new day with an empty table (caller holds the lock)."""
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day = today
+            self.states.clear()
+            self.fingers.clear()
+            self.changed_at.clear()
+            self.reconciled = False
+
+    def state(self, uid):
+        """IN or OUT. Raises requests.RequestException only for a read-through before the first reconcile."""
+        with self.lock:
+            self._roll_over()
+            state = self.states.get(uid)
+            if state is not None:
+                return state
+            if self.reconciled:
+                return OUT  # Not open on the server at the last reconcile, and not timed in by us since
+        state = self._pending_state('time_in', 'time_out', uid)
+        if state is None:
+            state = open_state(self.client.get_recent_logs_by_uid(uid))
+        with self.lock:
+            self.states.setdefault(uid, state)
+            return self.states[uid]
+
+    def is_in(self, uid):
+        return self.state(uid) == IN
+
+    def fingerprint_state(self, fingerprint_id):
+        """IN or OUT. Raises requests.RequestException only for the day's first lookup of this fingerprint."""
+        key = str(fingerprint_id)
+        with self.lock:
+            self._roll_over()
+            state = self.fingers.get(key)
+            if state is not None:
+                return state
+        state = self._pending_state('time_in_fingerprint', 'time_out_fingerprint', key)
+        if state is None:
+            state = open_state(self.client.get_recent_logs_by_fingerprint(fingerprint_id))
+        with self.lock:
+            self.fingers.setdefault(key, state)
+            return self.fingers[key]
+
+    def fingerprint_is_in(self, fingerprint_id):
+        return self.fingerprint_state(fingerprint_id) == IN
+
+    def _pending_state(self, time_in_action, time_out_action, key):
+        """State left by the newest unsent journal event for `key`, or None if there is none."""
+        if self.journal is None:
+            return None
+        action = self.journal.latest_pending((time_in_action, time_out_action), key)
+        if action is None:
+            return None
+        return IN if action == time_in_action else OUT
+
+    def _set(self, uids, state):
+        now = time.monotonic()
+        with self.lock:
+            self._roll_over()
+            for uid in uids:
+                self.states[uid] = state
+                self.changed_at[uid] = now
+
+    def _set_fingerprint(self, fingerprint_id, state):
+        with self.lock:
+            self._roll_over()
+            self.fingers[str(fingerprint_id)] = state
+
+    def mark_in(self, uid):
+        self._set([uid], IN)
+
+    def mark_out(self, uid):
+        self._set([uid], OUT)
+
+    def mark_fingerprint_in(self, fingerprint_id):
+        self._set_fingerprint(fingerprint_id, IN)
+
+    def mark_fingerprint_out(self, fingerprint_id):
+        self._set_fingerprint(fingerprint_id, OUT)
+
+    def mark_all_out(self, uids):
+        """After a close-out: every listed card is OUT."""
+        self._set(uids, OUT)
+
+    def reconcile(self):
+        """Apply the server's open logs to every card we have not changed since. Returns cards changed."""
+        started = time.monotonic()
+        try:
+            open_uids = set(open_log_uids(self.client.get_recent_logs()))
+        except requests.RequestException as e:
+            print(f"Attendance: reconcile failed, keeping local state: {e}")
+            return 0
+        # Writes still in the journal are not on the server yet, so the download cannot overrule them
+        backlog = self.journal is not None and self.journal.pending_count() > 0
+
+        changed = 0
+        with self.lock:
+            self._roll_over()
+            for uid in set(self.states) | open_uids:
+                written = self.changed_at.get(uid)
+                if written is not None and (backlog or written >= started):
+                    continue
+                state = IN if uid in open_uids else OUT
+                if self.states.get(uid) != state:
+                    self.states[uid] = state
+                    changed += 1
+                self.changed_at.pop(uid, None)
+            self.reconciled = True
+        if changed:
+            print(f"Attendance: {changed} cards corrected from the server.")
+        self.save()
+        return changed
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._reconcile_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _reconcile_loop(self):
+        while self.running:
+            self.reconcile()
+            self.wakeup.wait(self.reconcile_interval)
+            self.wakeup.clear()
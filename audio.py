@@ -0,0 +1,78 @@
+import threading
+
+import pygame
+
+# name: (file, priority, max play time in ms). Higher priority preempts lower.
+SOUND_BANK = {
+    'beep': ("beep.mp3", 1, 1000),
+    'welcome': ("welcome.mp3", 2, 2000),
+    'wrong': ("wrong.mp3", 2, 1000),
+    'alarm': ("alarm-2.mp3", 3, 10000),
+}
+
+FEEDBACK_CHANNEL = 0  # Tap/scan beeps, never blocked by announcements
+EVENT_CHANNEL = 1  # Welcome/wrong/alarm, with priority preemption
+SPEECH_CHANNEL = 2  # Pre-rendered TTS phrases
+
+
+class AudioEngine:
+    """Fire-and-forget playback of the kiosk sounds.
+
+    Every file is decoded once into a pygame.mixer.Sound at start-up and
+    played on a reserved channel, so play() returns immediately instead of
+    loading from disk and sleeping on the scan or NFC thread. A sound on the
+    event channel is replaced by a new one of equal or higher priority and
+    dropped if something more important is still playing.
+    """
+
+    def __init__(self, bank=SOUND_BANK):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(3)
+        self.channels = {
+            FEEDBACK_CHANNEL: pygame.mixer.Channel(FEEDBACK_CHANNEL),
+            EVENT_CHANNEL: pygame.mixer.Channel(EVENT_CHANNEL),
+            SPEECH_CHANNEL: pygame.mixer.Channel(SPEECH_CHANNEL),
+        }
+        self.lock = threading.Lock()
+        self.current_priority = 0
+        self.sounds = {}
+        self.bank = bank
+        for name, (path, priority, max_ms) in bank.items():
+            try:
+                self.sounds[name] = pygame.mixer.Sound(path)
+            except pygame.error as e:
+                print(f"Failed to load {path}: {e}")
+
+    def play(self, name):
+        """Start a sound from the bank and return at once. Returns True if it started."""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        _, priority, max_ms = self.bank[name]
+
+        if priority <= 1:
+            self.channels[FEEDBACK_CHANNEL].play(sound, maxtime=max_ms)
+            return True
+
+        channel = self.channels[EVENT_CHANNEL]
+        with self.lock:
+            if channel.get_busy() and priority < self.current_priority:
+                return False  # Something more important is playing
+            channel.stop()
+            channel.play(sound, maxtime=max_ms)
+            self.current_priority = priority
+        return True
+
+    def play_speech(self, sound):
+        """Play a pre-rendered speech Sound, queued behind any phrase still playing."""
+        channel = self.channels[SPEECH_CHANNEL]
+        if channel.get_busy():
+            channel.queue(sound)
+        else:
+            channel.play(sound)
+
+    def stop(self):
+        for channel in self.channels.values():
+            channel.stop()
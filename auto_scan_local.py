@@ -7,12 +7,14 @@ import RPi.GPIO as GPIO
 import time
 import subprocess
 import requests
+from sensor_driver import FingerDetector
 
 # API URL
 api_url = "https://prolocklogger.pro/api/getuserbyfingerprint/"
 
 # GPIO pin configuration for the solenoid lock
 SOLENOID_PIN = 17  # Replace with your GPIO pin number
+TOUCH_PIN = None  # BCM pin wired to the sensor's touch-sense output; None polls get_image() instead
 
 # Setup GPIO
 GPIO.setmode(GPIO.BCM)
@@ -29,6 +31,7 @@ def initialize_serial():
         return None
 
 finger = initialize_serial()
+finger_detector = FingerDetector(TOUCH_PIN, GPIO)
 
 # State variables
 unlock_attempt = True
@@ -91,8 +94,7 @@ def auto_scan_fingerprint():
         return
 
     print("Waiting for image...")
-    while finger.get_image() != adafruit_fingerprint.OK:
-        pass
+    finger_detector.wait_for_image(finger)
 
     print("Templating...")
     if finger.image_2_tz(1) != adafruit_fingerprint.OK:
@@ -0,0 +1,87 @@
+"""Compare cold (one connection per call) and pooled API latency.
+
+Replays the request sequence of one fingerprint scan in auto_scan_fingerprint
+against the local stub server:
+    python bench_api_client.py --scans 50 --connect-delay 40
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from prolock_api import ProLockAPI
+from prolock_stub_server import StubServer
+
+
+def scan_paths(fingerprint_id):
+    """The GET/PUT/POST calls one successful fingerprint time-in makes."""
+    return [
+        ('GET', f'getuserbyfingerprint/{fingerprint_id}', None),
+        ('GET', f'lab-schedules/fingerprint/{fingerprint_id}', None),
+        ('GET', 'current-date-time', None),
+        ('GET', f'lab-schedules/fingerprint/{fingerprint_id}', None),
+        ('GET', 'recent-logs/by-fingerid', {'fingerprint_id': fingerprint_id}),
+        ('GET', 'current-date-time', None),
+        ('PUT', 'logs/time-in/fingerprint', {'fingerprint_id': fingerprint_id, 'time_in': '08:00'}),
+        ('POST', 'door/log-status', {'fingerprint_id': fingerprint_id, 'status': 'open'}),
+    ]
+
+
+def run_cold(base_url, scans):
+    timings = []
+    for i in range(scans):
+        start = time.perf_counter()
+        for method, path, params in scan_paths(i + 3):
+            # Bare requests.<method>() opens and closes a connection per call
+            response = requests.request(method, f'{base_url}/{path}', params=params)
+            response.raise_for_status()
+            response.json()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_pooled(base_url, scans):
+    client = ProLockAPI(base_url)
+    timings = []
+    try:
+        for i in range(scans):
+            start = time.perf_counter()
+            for method, path, params in scan_paths(i + 3):
+                client.request(method, path, params)
+            timings.append(time.perf_counter() - start)
+    finally:
+        client.close()
+    return timings
+
+
+def report(label, timings, connections):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1] if len(timings_ms) > 1 else timings_ms[0]
+    print(f"{label:<8} mean {statistics.mean(timings_ms):8.2f} ms  "
+          f"p50 {statistics.median(timings_ms):8.2f} ms  p95 {p95:8.2f} ms  "
+          f"connections {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold vs pooled API calls per scan.")
+    parser.add_argument('--scans', type=int, default=50)
+    parser.add_argument('--connect-delay', type=float, default=40.0,
+                        help="Simulated TCP+TLS handshake cost per new connection, in ms")
+    parser.add_argument('--response-delay', type=float, default=0.0, help="Simulated server time, in ms")
+    args = parser.parse_args()
+
+    print(f"{args.scans} scans x {len(scan_paths(0))} requests, "
+          f"handshake {args.connect_delay:.0f} ms, server {args.response_delay:.0f} ms")
+    for label, runner in (('cold', run_cold), ('pooled', run_pooled)):
+        server = StubServer(connect_delay=args.connect_delay / 1000.0,
+                            response_delay=args.response_delay / 1000.0).start()
+        try:
+            timings = runner(server.base_url, args.scans)
+            report(label, timings, server.connection_count)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Compare finger-detection strategies against a simulated R307 sensor.
+
+Each strategy waits for a finger that lands at a random moment; we record
+the wake-up latency (touch -> get_image() OK), how many get_image() round
+trips went over the serial line, and the CPU time burnt while idle:
+    python bench_finger_detect.py --touches 10 --idle 2.0
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import adafruit_fingerprint
+
+from sensor_driver import FingerDetector
+
+SERIAL_ROUND_TRIP = 0.03  # get_image() at 57600 baud: command + 12-byte ack
+
+
+class SimulatedSensor:
+    """get_image() returns NOFINGER until touch_at, then OK; each call costs one round trip."""
+
+    def __init__(self, round_trip=SERIAL_ROUND_TRIP):
+        self.round_trip = round_trip
+        self.touch_at = float('inf')
+        self.calls = 0
+
+    def get_image(self):
+        self.calls += 1
+        time.sleep(self.round_trip)
+        if time.monotonic() >= self.touch_at:
+            return adafruit_fingerprint.OK
+        return adafruit_fingerprint.NOFINGER
+
+
+class SimulatedTouchLine:
+    """The bits of RPi.GPIO FingerDetector uses, driven by SimulatedSensor.touch_at."""
+    IN, PUD_UP, PUD_DOWN, RISING, FALLING = range(5)
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+        self.callback = None
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        self.callback = callback
+
+    def remove_event_detect(self, pin):
+        self.callback = None
+
+    def input(self, pin):
+        return int(time.monotonic() >= self.sensor.touch_at)
+
+    def touch(self, delay):
+        self.sensor.touch_at = time.monotonic() + delay
+        threading.Timer(delay, self.callback, args=(None,)).start()
+
+
+def fixed_poll(sensor, interval):
+    """The old auto_scan_fingerprint loop (1 s; 0.5 s in v3)."""
+    while sensor.get_image() != adafruit_fingerprint.OK:
+        time.sleep(interval)
+
+
+def busy_spin(sensor):
+    """The old enroll_fingerprint / auto_scan_local.py loop."""
+    while sensor.get_image() != adafruit_fingerprint.OK:
+        pass
+
+
+def run(name, wait, touches, idle, interrupt=False):
+    rng = random.Random(42)
+    latencies, calls, cpu = [], 0, 0.0
+    for _ in range(touches):
+        sensor = SimulatedSensor()
+        line = SimulatedTouchLine(sensor)
+        detector = FingerDetector(touch_pin=4 if interrupt else None, gpio=line if interrupt else None)
+        delay = idle + rng.uniform(0, 1.0)
+        if interrupt:
+            line.touch(delay)
+        else:
+            sensor.touch_at = time.monotonic() + delay
+        cpu_start = time.process_time()
+        wait(sensor, detector)
+        latencies.append((time.monotonic() - sensor.touch_at) * 1000)
+        cpu += time.process_time() - cpu_start
+        calls += sensor.calls
+    print(f"{name:<22} latency p50 {statistics.median(latencies):6.0f} ms  max {max(latencies):6.0f} ms | "
+          f"{calls / touches:5.1f} get_image/scan | CPU {cpu / touches * 1000:6.1f} ms/scan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark finger-detection strategies.")
+    parser.add_argument('--touches', type=int, default=10)
+    parser.add_argument('--idle', type=float, default=2.0, help="Seconds before each finger lands")
+    args = parser.parse_args()
+
+    run("fixed poll 1 s", lambda s, d: fixed_poll(s, 1.0), args.touches, args.idle)
+    run("fixed poll 0.5 s (v3)", lambda s, d: fixed_poll(s, 0.5), args.touches, args.idle)
+    run("busy spin", lambda s, d: busy_spin(s), args.touches, args.idle)
+    run("adaptive poll", lambda s, d: d.wait_for_image(s), args.touches, args.idle)
+    run("touch-line interrupt", lambda s, d: d.wait_for_image(s), args.touches, args.idle, interrupt=True)
+
+
+if __name__ == '__main__':
+    main()
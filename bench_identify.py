@@ -0,0 +1,72 @@
+"""Fingerprint search time as the template library fills up.
+
+For each library size, stores that many templates in the simulated sensor
+and times one-to-many searches for enrolled fingers (hits) and an unknown
+finger (misses) with:
+    library full     finger.finger_search(), as the kiosk used to
+    library fast     finger.finger_fast_search()
+    identify full    Identifier in FULL mode (one round trip per search)
+    identify fast    Identifier in FAST mode with full-search fallback
+    python bench_identify.py --sizes 10 50 100 250 500 1000 --trials 5
+    python bench_identify.py --timings recorded_timings.json
+"""
+import argparse
+import random
+import statistics
+import time
+
+import adafruit_fingerprint
+
+from hardware_sim import HardwareSimulator, load_timings
+from identification import Identifier, FAST, FULL
+
+LIBRARY_SIZE = 1000
+
+
+def strategies(finger):
+    return [
+        ("library full", finger.finger_search),
+        ("library fast", finger.finger_fast_search),
+        ("identify full", Identifier(finger, mode=FULL).identify),
+        ("identify fast", Identifier(finger, mode=FAST).identify),
+    ]
+
+
+def time_search(finger, search, label):
+    finger.buffers[1] = label
+    start = time.perf_counter()
+    result = search()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint identification against library size.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100, 250, 500, LIBRARY_SIZE])
+    parser.add_argument('--trials', type=int, default=5, help="Hits and misses timed per size and strategy")
+    parser.add_argument('--timings', help="TimingRecorder JSON to replay instead of the default timings")
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    timings = load_timings(args.timings) if args.timings else None
+    print(f"{'templates':>9}  {'strategy':<14}{'hit mean':>10}{'hit max':>10}{'miss mean':>11}{'errors':>8}")
+    for size in args.sizes:
+        enrolled = {str(slot): f"user-{slot}" for slot in range(size)}
+        finger = HardwareSimulator({'enrolled': enrolled}, timings).fingerprint
+        finger.library_size = LIBRARY_SIZE
+        for name, search in strategies(finger):
+            hits, misses, errors = [], [], 0
+            for _ in range(args.trials):
+                slot = rng.randrange(size)
+                elapsed, result = time_search(finger, search, f"user-{slot}")
+                hits.append(elapsed)
+                errors += result != adafruit_fingerprint.OK or finger.finger_id != slot
+                elapsed, result = time_search(finger, search, "stranger")
+                misses.append(elapsed)
+                errors += result == adafruit_fingerprint.OK
+            print(f"{size:>9}  {name:<14}{statistics.mean(hits):>8.0f}ms{max(hits):>8.0f}ms"
+                  f"{statistics.mean(misses):>9.0f}ms{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Decode time for a fingerprint image upload: the pixel loop vs NumPy.
+
+Decodes the simulator's 36864-byte test image (the same payload shape as
+get_fpdata(sensorbuffer="image")) with the loop save_fingerprint_image
+used to run and with fingerprint_image.py, and checks they agree:
+    python bench_image_decode.py --runs 20
+"""
+import argparse
+import importlib.util
+import statistics
+import time
+
+from fingerprint_image import image_from_fpdata, image_quality, unpack_image
+from hardware_sim import test_image
+
+
+def loop_decode(result):
+    """The previous save_fingerprint_image body, minus the sensor and the file."""
+    from PIL import Image
+    img = Image.new("L", (256, 288), "white")
+    pixeldata = img.load()
+    mask = 0b00001111
+    x = 0
+    y = 0
+    for i in range(len(result)):
+        pixeldata[x, y] = (int(result[i]) >> 4) * 17
+        x += 1
+        pixeldata[x, y] = (int(result[i]) & mask) * 17
+        if x == 255:
+            x = 0
+            y += 1
+        else:
+            x += 1
+    return img
+
+
+def best_and_median(func, data, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(data)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint image decoding.")
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    data = list(test_image())  # get_fpdata() returns a list of ints
+    rows = [("unpack_image (raw levels)", unpack_image)]
+    if importlib.util.find_spec('PIL') is not None:
+        rows = [("pixel loop + PIL", loop_decode), ("image_from_fpdata", image_from_fpdata)] + rows
+    else:
+        print("PIL is not installed: timing the raw-array decode only")
+
+    results = {}
+    for name, func in rows:
+        results[name] = best_and_median(func, data, args.runs)
+        print(f"{name:<28} best {results[name][0]:8.2f} ms  median {results[name][1]:8.2f} ms")
+    if "pixel loop + PIL" in results:
+        if loop_decode(data).tobytes() != image_from_fpdata(data).tobytes():
+            print("Decoders disagree!")
+        print(f"Speed-up: {results['pixel loop + PIL'][1] / results['image_from_fpdata'][1]:.0f}x")
+    print(f"Quality of the test image: {image_quality(unpack_image(data))}")
+
+
+if __name__ == '__main__':
+    main()
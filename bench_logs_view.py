@@ -0,0 +1,83 @@
+"""Time recent-logs Treeview refreshes: full rebuild vs LogTableModel diff.
+
+Needs a display (run on the Pi, or under xvfb-run on a Linux box):
+    python bench_logs_view.py --rows 100 1000 10000
+"""
+import argparse
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from logs_view import LOG_FIELDS, LogTableModel
+
+
+def make_logs(count, start_id=1):
+    return [{
+        'id': start_id + i,
+        'date': '2024-10-18',
+        'user_name': f'Student {start_id + i}',
+        'seat_id': (start_id + i) % 40,
+        'user_number': f'2021-{start_id + i:05d}',
+        'year': '3',
+        'block_name': 'A',
+        'assigned_instructor': 'Instructor',
+        'time_in': '08:00',
+        'time_out': None,
+    } for i in range(count)]
+
+
+def full_rebuild(tree, logs):
+    """What fetch_recent_logs used to do after every time-in/time-out."""
+    for i in tree.get_children():
+        tree.delete(i)
+    for log in reversed(logs):
+        tree.insert("", "end", values=tuple(log.get(field, 'N/A') for field in LOG_FIELDS))
+
+
+def timed(root, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(root, rows, row_cap):
+    logs = make_logs(rows)
+    # One new time-in and one time-out on an existing row: the typical refresh
+    next_logs = [dict(log) for log in logs]
+    next_logs[-1]['time_out'] = '09:00'
+    next_logs.append(make_logs(1, start_id=rows + 1)[0])
+
+    tree = ttk.Treeview(root, columns=LOG_FIELDS, show='headings')
+    tree.pack()
+    full_rebuild(tree, logs)
+    full_ms = timed(root, full_rebuild, tree, next_logs)
+    tree.destroy()
+
+    tree = ttk.Treeview(root, columns=LOG_FIELDS, show='headings')
+    tree.pack()
+    model = LogTableModel(tree, row_cap=row_cap)
+    first_ms = timed(root, model.set_logs, logs)
+    diff_ms = timed(root, model.set_logs, next_logs)
+    tree.destroy()
+
+    print(f"{rows:>6} rows: full rebuild {full_ms:9.2f} ms | "
+          f"model first render {first_ms:8.2f} ms, incremental refresh {diff_ms:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Treeview refresh strategies.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--row-cap', type=int, default=200)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    print(f"row cap {args.row_cap}")
+    for rows in args.rows:
+        bench(root, rows, args.row_cap)
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
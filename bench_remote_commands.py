@@ -0,0 +1,77 @@
+"""Measure remote-command latency and bytes per poll against the stub /logs feed.
+
+Compares the old full-download poll with RemoteCommandPoller as the log
+history grows:
+    python bench_remote_commands.py --history 100 1000 10000
+"""
+import argparse
+import threading
+import time
+
+from prolock_api import ProLockAPI
+from prolock_stub_server import LogFeed, StubServer, default_routes
+from remote_commands import RemoteCommandPoller
+
+
+def make_history(size):
+    return [{'id': i + 1, 'status': 'close', 'action_type': 'fingerprint',
+             'user_name': f'User {i}', 'time_in': '08:00', 'time_out': '09:00'} for i in range(size)]
+
+
+def bench_history(size, polls):
+    feed = LogFeed(make_history(size))
+    routes = default_routes()
+    routes['logs'] = feed
+    server = StubServer(routes=routes).start()
+    client = ProLockAPI(server.base_url)
+    try:
+        # Old behaviour: GET /logs and read logs[-1]
+        start = time.perf_counter()
+        feed.bytes_sent = 0
+        for _ in range(polls):
+            client.get_logs().get('logs', [])[-1:]
+        full_ms = (time.perf_counter() - start) * 1000 / polls
+        full_bytes = feed.bytes_sent / polls
+
+        # Incremental poller: first poll primes the cursor, then measure idle polls
+        poller = RemoteCommandPoller(client, lambda log: None)
+        poller.poll_once()
+        feed.bytes_sent = 0
+        start = time.perf_counter()
+        for _ in range(polls):
+            poller.poll_once()
+        incremental_ms = (time.perf_counter() - start) * 1000 / polls
+        incremental_bytes = feed.bytes_sent / polls
+
+        # Command latency: time from appending manual_unlock to the handler running
+        seen = threading.Event()
+        poller = RemoteCommandPoller(client, lambda log: log.get('action_type') == 'manual_unlock' and seen.set())
+        poller.poll_once()
+        poller.start()
+        time.sleep(poller.interval / 2)
+        appended = time.perf_counter()
+        feed.append(status='open', action_type='manual_unlock')
+        seen.wait(5)
+        latency_ms = (time.perf_counter() - appended) * 1000
+        poller.stop()
+    finally:
+        client.close()
+        server.stop()
+
+    print(f"history {size:>6}: full poll {full_ms:7.2f} ms {full_bytes:>10.0f} B | "
+          f"incremental {incremental_ms:6.2f} ms {incremental_bytes:>6.0f} B | "
+          f"manual_unlock seen after {latency_ms:6.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs incremental /logs polling.")
+    parser.add_argument('--history', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--polls', type=int, default=20)
+    args = parser.parse_args()
+    print("Old poll: full GET /logs every 10 s. New poll: conditional GET /logs?since= every 0.5 s")
+    for size in args.history:
+        bench_history(size, args.polls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Headless end-to-end benchmark of the fingerprint and NFC scan loops.
+
+Runs the kiosk's scan path (FingerDetector -> image_2_tz -> Identifier search ->
+ScanPipeline lookups, and NFC tap -> user and schedule lookups) against the
+hardware simulator and the local stub API, so it needs no Pi, sensor,
+reader or display:
+    python bench_scan_loop.py --fingers 20 --taps 20 --interval 1.5
+    python bench_scan_loop.py --timings recorded_timings.json --api-delay 0.08
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import datetime
+
+import adafruit_fingerprint
+
+from hardware_sim import HardwareSimulator, load_timings
+from identification import Identifier
+from prolock_api import ProLockAPI
+from prolock_stub_server import StubServer
+from scan_pipeline import ScanPipeline
+from schedule_cache import ScheduleCache
+from sensor_driver import FingerDetector
+
+TOUCH_PIN = 4
+
+
+def make_script(fingers, taps, interval, unknown_every=5):
+    """Alternate enrolled users with the odd unknown finger; taps interleave half an interval later."""
+    enrolled = {str(slot): f"user-{slot}" for slot in range(3, 53)}
+    events = []
+    for i in range(fingers):
+        label = "stranger" if unknown_every and i % unknown_every == unknown_every - 1 else f"user-{3 + i % 50}"
+        events.append({'at': 0.5 + i * interval, 'finger': label, 'hold': 0.8})
+    for i in range(taps):
+        events.append({'at': 0.5 + interval / 2 + i * interval, 'tag': f"04a1{i:04x}22"})
+    return {'enrolled': enrolled, 'events': events}
+
+
+def allowed_now(index):
+    now = datetime.now()
+    return index.allows(now.strftime('%A'), now.date(), now.hour * 60 + now.minute)
+
+
+def fingerprint_loop(sim, client, detector, pipeline, schedules, results, stop):
+    finger = sim.fingerprint
+    identifier = Identifier(finger)
+    while not stop.is_set():
+        if not detector.wait_for_image(finger, should_continue=lambda: not stop.is_set()):
+            return
+        touch = sim.current_touch()
+        touched_at = touch[0] if touch else time.monotonic()
+        if finger.image_2_tz(1) != adafruit_fingerprint.OK or identifier.identify() != adafruit_fingerprint.OK:
+            outcome = 'no match'
+        else:
+            fingerprint_id = finger.finger_id
+            lookups = {
+                'name': lambda: client.get_user_by_fingerprint(fingerprint_id).get('name'),
+                'schedule': lambda: allowed_now(schedules.fingerprint(fingerprint_id)),
+                'has_time_in': lambda: bool(client.get_recent_logs_by_fingerprint(fingerprint_id)),
+            }
+            denies = {'name': lambda result: not result, 'schedule': lambda result: not result}
+            found, denied_by, timed_out = pipeline.run(lookups, denies)
+            outcome = 'timeout' if timed_out else 'denied' if denied_by else 'granted'
+        results.append(('fingerprint', outcome, time.monotonic() - touched_at))
+        detector.wait_for_removal(finger, should_continue=lambda: not stop.is_set())
+
+
+def nfc_loop(sim, client, schedules, results, stop):
+    while not stop.is_set():
+        tag = sim.nfc.connect(rdwr={'on-connect': lambda tag: False}, terminate=stop.is_set)
+        if not tag:
+            continue
+        uid = tag.identifier.hex()
+        user = client.get_user_by_id_card(uid)
+        outcome = 'granted' if user and allowed_now(schedules.rfid(uid)) else 'denied'
+        results.append(('nfc', outcome, time.monotonic() - tag.tapped_at))
+
+
+def report(kind, results, elapsed):
+    rows = [row for row in results if row[0] == kind]
+    if not rows:
+        return
+    latencies = sorted(latency * 1000 for _, _, latency in rows)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    outcomes = {}
+    for _, outcome, _ in rows:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    print(f"{kind:<12} {len(rows):3d} scans, {len(rows) / elapsed:5.2f}/s | latency p50 "
+          f"{statistics.median(latencies):6.0f} ms  p95 {p95:6.0f} ms  max {latencies[-1]:6.0f} ms | {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan loops against simulated hardware.")
+    parser.add_argument('--fingers', type=int, default=20)
+    parser.add_argument('--taps', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=1.5, help="Seconds between consecutive scans")
+    parser.add_argument('--timings', help="TimingRecorder JSON to replay instead of the default timings")
+    parser.add_argument('--api-delay', type=float, default=0.05, help="Simulated server time per request")
+    parser.add_argument('--touch-line', action='store_true', help="Detect fingers via the touch-sense line")
+    args = parser.parse_args()
+
+    sim = HardwareSimulator(make_script(args.fingers, args.taps, args.interval),
+                            load_timings(args.timings) if args.timings else None)
+    server = StubServer(response_delay=args.api_delay).start()
+    client = ProLockAPI(server.base_url)
+    schedules = ScheduleCache(client)
+    pipeline = ScanPipeline()
+    detector = FingerDetector(TOUCH_PIN if args.touch_line else None, sim.gpio if args.touch_line else None)
+    results, stop = [], threading.Event()
+
+    threads = [
+        threading.Thread(target=fingerprint_loop, args=(sim, client, detector, pipeline, schedules, results, stop)),
+        threading.Thread(target=nfc_loop, args=(sim, client, schedules, results, stop)),
+    ]
+    sim.start()
+    for thread in threads:
+        thread.start()
+    duration = 0.5 + max(args.fingers, args.taps) * args.interval + 2.0
+    time.sleep(duration)
+    stop.set()
+    sim.nfc.close()
+    for thread in threads:
+        thread.join()
+    pipeline.shutdown()
+    client.close()
+    server.stop()
+
+    print(f"{args.fingers} fingers and {args.taps} taps every {args.interval}s, "
+          f"API delay {args.api_delay * 1000:.0f} ms, {'touch line' if args.touch_line else 'adaptive poll'}")
+    report('fingerprint', results, duration)
+    report('nfc', results, duration)
+
+
+if __name__ == '__main__':
+    main()
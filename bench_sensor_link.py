@@ -0,0 +1,66 @@
+"""Fingerprint link throughput by baud rate and data packet size.
+
+Times image uploads (get_fpdata("image"), as save_fingerprint_image does)
+and character-file uploads and downloads against the simulated sensor at
+every rate and packet size, then lets LinkTuner negotiate on a sensor
+whose wiring tops out at `--wiring-limit`:
+    python bench_sensor_link.py --baud 19200 57600 115200 --wiring-limit 57600
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from hardware_sim import HardwareSimulator, IMAGE_SIZE, TEMPLATE_SIZE
+from sensor_link import LinkTuner, BAUD_RATES, PACKET_SIZES
+
+PORT = 'sim'
+
+
+def timed(transfer, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        transfer()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint link settings.")
+    parser.add_argument('--transfers', type=int, default=2, help="Transfers timed per setting")
+    parser.add_argument('--baud', type=int, nargs='+', default=[57600, 115200],
+                        help=f"Any of {sorted(BAUD_RATES)}; an image takes 38 s at 9600")
+    parser.add_argument('--wiring-limit', type=int, default=115200,
+                        help="Fastest rate the simulated wiring carries (at least the 57600 default)")
+    args = parser.parse_args()
+
+    finger = HardwareSimulator({'enrolled': {'1': 'user-1'}}).fingerprint
+    finger.max_baud = max(args.baud)
+    print(f"{'baud':>7} {'packet':>7} {'image':>9} {'KiB/s':>7} {'char up':>9} {'char down':>10}")
+    for baud in args.baud:
+        for code, size in sorted(PACKET_SIZES.items()):
+            finger.baudrate = baud // 9600
+            finger.data_packet_size = code
+            finger.reopen(baud)
+            finger.load_model(1, 1)
+            template = finger.get_fpdata("char", 1)
+            image = timed(lambda: finger.get_fpdata("image"), args.transfers)
+            char_up = timed(lambda: finger.get_fpdata("char", 1), args.transfers)
+            char_down = timed(lambda: finger.send_fpdata(template, "char", 1), args.transfers)
+            print(f"{baud:>7} {size:>6}B {image * 1000:>7.0f}ms {IMAGE_SIZE / 1024 / image:>7.1f} "
+                  f"{char_up * 1000:>7.0f}ms {char_down * 1000:>8.0f}ms")
+    print(f"(image {IMAGE_SIZE} bytes, template {TEMPLATE_SIZE} bytes)")
+
+    # Negotiation from the factory default on wiring that cannot carry every rate
+    finger.baudrate, finger.data_packet_size = 57600 // 9600, 2
+    finger.max_baud = args.wiring_limit
+    finger.reopen(57600)
+    path = os.path.join(tempfile.mkdtemp(), 'link.json')
+    tuner = LinkTuner(lambda port, baudrate: finger.reopen(baudrate), PORT, path=path)
+    start = time.perf_counter()
+    _, baudrate, code = tuner.tune()
+    print(f"Negotiated {baudrate} baud, {PACKET_SIZES[code]}-byte packets in {time.perf_counter() - start:.1f} s "
+          f"(wiring limit {args.wiring_limit})")
+
+
+if __name__ == '__main__':
+    main()
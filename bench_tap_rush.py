@@ -0,0 +1,141 @@
+"""Load test for the NFC tap queue: a class-start rush of card taps.
+
+Replays `--taps` taps at random (Poisson) times over `--duration` seconds
+through the simulated reader and NFCReader, and records each one against
+the local stub API the way debug_nfc does (card lookup, server time,
+recent logs, schedule, time-in). Every mode gets the same tap script:
+    inline      the reader thread records each tap itself, as before the tap queue
+    queue-N     TapProcessor with N workers
+    python bench_tap_rush.py --taps 40 --duration 60 --api-delay 0.25
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from hardware_sim import HardwareSimulator
+from nfc_reader import NFCReader, TapProcessor
+from prolock_api import ProLockAPI
+from prolock_stub_server import StubServer
+
+
+def make_script(taps, duration, students, seed):
+    """Poisson arrivals squeezed into `duration`; some students tap twice (time-in, then time-out)."""
+    rng = random.Random(seed)
+    gaps = [rng.expovariate(1.0) for _ in range(taps)]
+    scale = duration / sum(gaps)
+    at, events = 0.5, []
+    for gap in gaps:
+        at += gap * scale
+        events.append({'at': at, 'tag': f"04b2{rng.randrange(students):04x}33"})
+    return {'events': events}
+
+
+def record_tap(client, uid):
+    """The requests debug_nfc.fetch_user_info makes for one tap."""
+    user = client.get_user_by_id_card(uid)
+    client.get_current_date_time()
+    if client.get_recent_logs_by_uid(uid):
+        client.time_out(uid, datetime.now().strftime('%H:%M'))
+    else:
+        client.get_lab_schedule_rfid(uid)
+        client.time_in(uid, datetime.now().strftime('%H:%M'), user.get('year'), user.get('user_name'))
+
+
+class ScriptedReader:
+    """Wraps the simulated frontend and remembers when the last tag was actually tapped."""
+
+    def __init__(self, nfc):
+        self.nfc = nfc
+        self.tapped_at = None
+
+    def connect(self, **options):
+        tag = self.nfc.connect(**options)
+        if tag:
+            self.tapped_at = tag.tapped_at
+        return tag
+
+
+def run(mode, workers, args):
+    sim = HardwareSimulator(make_script(args.taps, args.duration, args.students, args.seed))
+    server = StubServer(response_delay=args.api_delay).start()
+    client = ProLockAPI(server.base_url)
+    latencies, order, max_depth = [], [], [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def handle(uid, timestamp):
+        record_tap(client, uid)
+        with lock:
+            latencies.append(time.time() - timestamp)
+            order.append((uid, timestamp))
+            if len(latencies) == args.taps:
+                done.set()
+
+    def track_depth(depth):
+        max_depth[0] = max(max_depth[0], depth)
+
+    frontend = ScriptedReader(sim.nfc)
+    reader = NFCReader(frontend, suppression_window=0)
+    processor = None
+    if mode == 'inline':
+        target = handle
+    else:
+        processor = TapProcessor(handle, workers=workers)
+        processor.add_listener(track_depth)
+        target = processor.submit
+
+    def arrived(uid, timestamp):
+        # Latency counts from the scripted tap, including time the card waited for a busy reader
+        target(uid, time.time() - (time.monotonic() - frontend.tapped_at))
+
+    reader.add_listener(arrived)
+
+    started = time.monotonic()
+    sim.start()
+    reader.start()
+    done.wait(args.duration * 4 + 30)
+    elapsed = time.monotonic() - started
+    reader.stop()
+    sim.nfc.close()
+    reader.join()
+    if processor is not None:
+        processor.shutdown()
+    client.close()
+    server.stop()
+
+    # Per-card order: each student's taps must be recorded in the order they were read
+    last_seen, out_of_order = {}, 0
+    for uid, timestamp in order:
+        if timestamp < last_seen.get(uid, 0.0):
+            out_of_order += 1
+        last_seen[uid] = timestamp
+    latencies = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    print(f"{mode:<10} {len(latencies):3d}/{args.taps} taps in {elapsed:6.1f} s | latency p50 "
+          f"{statistics.median(latencies) if latencies else 0.0:6.0f} ms  p95 {p95:6.0f} ms  "
+          f"max {latencies[-1] if latencies else 0.0:6.0f} ms | max depth {max_depth[0]:2d} | "
+          f"out of order {out_of_order}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NFC tap handling under a class-start rush.")
+    parser.add_argument('--taps', type=int, default=40)
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds over which the taps arrive")
+    parser.add_argument('--students', type=int, default=30, help="Distinct cards; fewer than --taps means repeats")
+    parser.add_argument('--api-delay', type=float, default=0.25, help="Simulated server time per request")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 3])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.taps} taps from {args.students} cards over {args.duration:.0f} s, "
+          f"API delay {args.api_delay * 1000:.0f} ms")
+    run('inline', 0, args)
+    for workers in args.workers:
+        run(f"queue-{workers}", workers, args)
+
+
+if __name__ == '__main__':
+    main()
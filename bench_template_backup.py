@@ -0,0 +1,51 @@
+"""Template backup/restore throughput against the simulated sensor.
+
+Exports `--templates` models from one simulated sensor and restores them
+onto an empty one at each baud rate; character file transfers are timed
+from the baud rate and data packet size, so the numbers show what the
+serial line allows:
+    python bench_template_backup.py --templates 50 --baud 57600 115200
+"""
+import argparse
+import os
+import tempfile
+
+from hardware_sim import HardwareSimulator, PACKET_SIZES
+from template_backup import export_templates, restore_templates, report
+from template_index import TemplateIndex
+
+
+def sensor(enrolled, baud, packet_size):
+    finger = HardwareSimulator({'enrolled': enrolled}).fingerprint
+    finger.baudrate = baud // 9600
+    finger.data_packet_size = packet_size
+    return finger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint template backup and restore.")
+    parser.add_argument('--templates', type=int, default=50)
+    parser.add_argument('--baud', type=int, nargs='+', default=[57600, 115200])
+    parser.add_argument('--packet-size', type=int, choices=sorted(PACKET_SIZES), default=2,
+                        help="Data packet size code: 0=32, 1=64, 2=128, 3=256 bytes")
+    args = parser.parse_args()
+
+    enrolled = {str(slot): f"user-{slot}" for slot in range(1, args.templates + 1)}
+    workdir = tempfile.mkdtemp()
+    archive = os.path.join(workdir, 'templates.plt')
+    for baud in args.baud:
+        source = sensor(enrolled, baud, args.packet_size)
+        count, total_bytes, elapsed = export_templates(source, archive, sorted(source.library))
+        report("Exported", count, total_bytes, elapsed, baud)
+
+        target = sensor({}, baud, args.packet_size)
+        index = TemplateIndex(os.path.join(workdir, f'index-{baud}.json'))
+        restored, skipped, total_bytes, elapsed = restore_templates(target, archive, index)
+        report("Restored", restored, total_bytes, elapsed, baud)
+        if target.library != source.library:
+            print("  restored library does not match the source!")
+    print(f"Archive: {os.path.getsize(archive)} bytes for {args.templates} templates")
+
+
+if __name__ == '__main__':
+    main()
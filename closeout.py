@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import requests
+
+DEFAULT_TIME_OUT = "00:00"
+CLOSE_OUT_WORKERS = 4  # Concurrent PUTs; stays within the API client's connection pool
+CLOSE_OUT_RETRIES = 2  # Extra attempts per log after a network error or 5xx
+CLOSE_OUT_BACKOFF = 0.5  # Seconds before the first retry, doubled after each
+
+
+def open_log_uids(logs):
+    """Card UIDs with a time-in but no time-out, once each, in log order."""
+    uids = []
+    seen = set()
+    for log in logs:
+        uid = log.get('UID')
+        if log.get('time_in') and not log.get('time_out') and uid and uid not in seen:
+            seen.add(uid)
+            uids.append(uid)
+    return uids
+
+
+def close_out_key(uid, time_out, day=None):
+    """Idempotency key for one student's close-out, stable across retries and re-runs on the same day."""
+    day = day or date.today().isoformat()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"prolock/time-out/{day}/{uid}/{time_out}"))
+
+
+def is_transient(error):
+    if not isinstance(error, requests.HTTPError) or error.response is None:
+        return True
+    status = error.response.status_code
+    return status >= 500 or status in (408, 429)
+
+
+class BulkTimeOut:
+    """Closes every open student log when the instructor times out.
+
+    The API has no batch endpoint, so the time-outs go out as PUTs with at
+    most `workers` in flight, each retried `retries` times on transient
+    errors. run_async() does the whole thing, including the /recent-logs
+    download, on a background thread so the door locks immediately.
+
+    With an `uploader` (JournalUploader), students whose newest unsent
+    journal event is a time-in are closed out too. Their time-in is not on
+    the server yet, so their time-out is journaled behind it instead of
+    sent directly. Idempotency keys use `day`, which should come from the
+    server clock the journal dates events by.
+    """
+
+    def __init__(self, client, uploader=None, workers=CLOSE_OUT_WORKERS, retries=CLOSE_OUT_RETRIES,
+                 backoff=CLOSE_OUT_BACKOFF):
+        self.client = client
+        self.uploader = uploader
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _close_one(self, uid, time_out, day=None):
+        """Returns (uid, attempts, error or None)."""
+        key = close_out_key(uid, time_out, day)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                self.client.time_out(uid, time_out, idempotency_key=key)
+                return uid, attempts, None
+            except requests.RequestException as e:
+                if attempts > self.retries or not is_transient(e):
+                    return uid, attempts, e
+                time.sleep(self.backoff * (2 ** (attempts - 1)))
+
+    def close(self, uids, time_out=DEFAULT_TIME_OUT, day=None):
+        """Time out `uids` concurrently. Returns (closed, failed {uid: error}, total attempts)."""
+        closed, failed, total_attempts = [], {}, 0
+        if not uids:
+            return closed, failed, total_attempts
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="closeout") as pool:
+            for uid, attempts, error in pool.map(lambda uid: self._close_one(uid, time_out, day), uids):
+                total_attempts += attempts
+                if error is None:
+                    closed.append(uid)
+                else:
+                    failed[uid] = error
+        return closed, failed, total_attempts
+
+    def queued_time_ins(self):
+        """Card UIDs whose newest unsent journal event is a time-in."""
+        if self.uploader is None:
+            return []
+        latest = self.uploader.journal.latest_pending_all(('time_in', 'time_out'))
+        return [uid for uid, action in latest.items() if action == 'time_in']
+
+    def run(self, time_out=DEFAULT_TIME_OUT, day=None):
+        """Download the open logs and close them all, plus queued time-ins. Returns close()'s result.
+
+        Journaled time-outs are counted as closed.
+        """
+        queued = self.queued_time_ins()
+        uids = [uid for uid in open_log_uids(self.client.get_recent_logs()) if uid not in queued]
+        closed, failed, attempts = self.close(uids, time_out, day)
+        for uid in queued:
+            self.uploader.submit('time_out', uid, time_out, idempotency_key=close_out_key(uid, time_out, day))
+            closed.append(uid)
+        print(f"Close-out: {len(closed)}/{len(uids) + len(queued)} logs timed out at {time_out} "
+              f"in {attempts} requests ({len(queued)} journaled behind their time-in), {len(failed)} failed.")
+        return closed, failed, attempts
+
+    def run_async(self, time_out=DEFAULT_TIME_OUT, day=None, on_done=None, on_error=None):
+        """Start run() on a background thread; a close-out already in progress is not repeated."""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return False
+
+            def job():
+                try:
+                    result = self.run(time_out, day)
+                except (requests.RequestException, sqlite3.Error) as e:
+                    print(f"Error updating default time-out records: {e}")
+                    if on_error is not None:
+                        on_error(e)
+                    return
+                if on_done is not None:
+                    on_done(*result)
+
+            self.thread = threading.Thread(target=job, daemon=True)
+            self.thread.start()
+            return True
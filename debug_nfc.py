@@ -1,52 +1,50 @@
 import threading
 import time
-import serial
 import adafruit_fingerprint
-import nfc
 import tkinter as tk
 from tkinter import ttk, font, messagebox
 from PIL import Image, ImageTk
-import RPi.GPIO as GPIO
+from hardware import load_gpio, open_fingerprint, open_nfc  # Real devices or the simulator (PROLOCK_HARDWARE)
 import requests
 from datetime import datetime, timedelta
 import pyttsx3  # Import pyttsx3 for text-to-speech
 import pygame
-
-API_URL = 'https://prolocklogger.pro/api'
-
-# API URLs for Fingerprint, NFC, and Current Date-Time
-FINGERPRINT_API_URL = f'{API_URL}/getuserbyfingerprint/'
-TIME_IN_FINGERPRINT_URL = f'{API_URL}/logs/time-in/fingerprint'
-TIME_OUT_FINGERPRINT_URL = f'{API_URL}/logs/time-out/fingerprint'
-RECENT_LOGS_FINGERPRINT_URL2 = f'{API_URL}/recent-logs/by-fingerid'
-LAB_SCHEDULE_FINGERPRINT_URL = f'{API_URL}/lab-schedules/fingerprint/'
-
-USER_INFO_URL = f'{API_URL}/user-information/by-id-card'
-RECENT_LOGS_URL = f'{API_URL}/recent-logs'
-TIME_IN_URL = f'{API_URL}/logs/time-in'
-TIME_OUT_URL = f'{API_URL}/logs/time-out'
-RECENT_LOGS_URL2 = f'{API_URL}/recent-logs/by-uid'
-CURRENT_DATE_TIME_URL = f'{API_URL}/current-date-time'
-LAB_SCHEDULE_URL = f'{API_URL}/student/lab-schedule/rfid/'
-LOGS_URL = f'{API_URL}/logs'
-
-# Laravel API endpoint URLs
-FACULTIES_URL = f'{API_URL}/users/role/2'
-ENROLL_URL = f'{API_URL}/users/update-fingerprint'
-ADMIN_URL = f'{API_URL}/admin/role/1'
+from prolock_api import api  # Shared keep-alive client for prolocklogger.pro
+from time_sync import TimeSync
+from schedule_cache import ScheduleCache, FINGERPRINT
+from schedule_prefetch import SchedulePrefetcher
+from attendance_journal import AttendanceJournal, JournalUploader
+from attendance_state import AttendanceState
+import sqlite3
+from remote_commands import RemoteCommandPoller
+from logs_view import LogTableModel
+from ui_dispatcher import UIDispatcher
+from scan_pipeline import ScanPipeline
+from audio import AudioEngine
+from speech import SpeechWorker, WELCOME_PHRASE, GOODBYE_PHRASE, greeting_phrases
+from sensor_driver import FingerDetector
+from identification import Identifier
+from template_index import TemplateIndex
+from tracing import begin_trace, end_trace, span
+from closeout import BulkTimeOut, DEFAULT_TIME_OUT, close_out_key
+from user_directory import UserDirectory
+from nfc_reader import NFCReader, TapProcessor
 
 # GPIO pin configuration for the solenoid lock and buzzer
 SOLENOID_PIN = 17
 BUZZER_PIN = 27
+TOUCH_PIN = None  # BCM pin wired to the sensor's touch-sense output; None polls get_image() instead
 
 # Setup GPIO
+GPIO = load_gpio()
 GPIO.setmode(GPIO.BCM)
 GPIO.setup(SOLENOID_PIN, GPIO.OUT)
 GPIO.setup(BUZZER_PIN, GPIO.OUT)
 
 # Initialize serial connection for the fingerprint sensor
-uart = serial.Serial("/dev/ttyUSB0", baudrate=57600, timeout=1)
-finger = adafruit_fingerprint.Adafruit_Fingerprint(uart)
+finger = open_fingerprint()
+finger_detector = FingerDetector(TOUCH_PIN, GPIO)
+identifier = Identifier(finger)  # Fast search with full-search fallback and a confidence gate
 
 
 # Initialize Tkinter window
@@ -66,7 +64,7 @@ class FingerprintEnrollment:
         self.root = root
         self.attendance_app = attendance_app
         self.frame = ttk.Frame(root)
-        self.next_fingerprint_id = self.get_highest_fingerprint_id() + 1  # Properly initialize next_fingerprint_id
+        self.templates = attendance_app.templates  # Slot occupancy from the on-disk mirror; no UART traffic
 
         # Create a canvas to handle the background color as ttk.Frame does not directly support bg color
         self.canvas = tk.Canvas(self.frame, bg='#2D3F7C')
@@ -188,12 +186,7 @@ class FingerprintEnrollment:
     def get_user(self, fingerprint_id):
         """Fetch user information by fingerprint ID."""
         try:
-            response = requests.get(f"{FINGERPRINT_API_URL}{fingerprint_id}")
-            response.raise_for_status()
-            data = response.json()
-            if 'name' in data:
-                return data['name']
-            return None
+            return self.attendance_app.directory.name_for_fingerprint(fingerprint_id)
         except requests.RequestException as e:
             messagebox.showerror("Request Error", f"Failed to connect to API: {e}")
             return None
@@ -201,9 +194,7 @@ class FingerprintEnrollment:
     def fetch_faculty_data(self):
         """Fetch faculty data from the Laravel API, excluding those with exactly two or more registered fingerprint IDs."""
         try:
-            response = requests.get(FACULTIES_URL)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_faculties()
 
             # Filter out faculty members who have exactly two or more fingerprints registered
             filtered_data = [
@@ -214,15 +205,13 @@ class FingerprintEnrollment:
             return filtered_data
 
         except requests.RequestException as e:
-            messagebox.showerror("Error", f"Error fetching faculty data: {e}")
+            self.attendance_app.ui.call_soon(messagebox.showerror, "Error", f"Error fetching faculty data: {e}")
             return []
 
     def fetch_admin_data(self):
         """Fetch admin data from the Laravel API, excluding those with exactly two or more registered fingerprint IDs."""
         try:
-            response = requests.get(ADMIN_URL)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_admins()
 
             # Filter out admin members who have exactly two or more fingerprints registered
             filtered_data = [
@@ -233,15 +222,14 @@ class FingerprintEnrollment:
             return filtered_data
 
         except requests.RequestException as e:
-            messagebox.showerror("Error", f"Error fetching faculty data: {e}")
+            self.attendance_app.ui.call_soon(messagebox.showerror, "Error", f"Error fetching faculty data: {e}")
             return []
 
     def post_fingerprint(self, email, fingerprint_id):
         """Post fingerprint data to the Laravel API."""
         try:
-            url = f"{ENROLL_URL}?email={email}&fingerprint_id={fingerprint_id}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.update_fingerprint(email, fingerprint_id)
+            self.attendance_app.directory.invalidate_fingerprint(fingerprint_id)
             # messagebox.showinfo("Success", "Fingerprint enrolled successfully")
             self.update_message(f"Fingerprint enrolled successfully", color="green")
         except requests.RequestException as e:
@@ -249,26 +237,10 @@ class FingerprintEnrollment:
             self.update_message(f"Error posting fingerprint data: {e}", color="red")
 
 
-    def get_highest_fingerprint_id(self):
-        """Fetch the highest fingerprint ID stored in the sensor."""
-        try:
-            # Read all stored fingerprint templates
-            if finger.read_templates() != adafruit_fingerprint.OK:
-                return 0  # Return 0 if no fingerprints are stored
-
-            # Find the highest ID among the stored fingerprints
-            if finger.templates:
-                return max(finger.templates)
-            else:
-                return 0
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to read stored fingerprints: {e}")
-            return 0
-
     def check_fingerprint_exists(self):
         """Check if the current fingerprint is already registered."""
         print("Searching for existing fingerprint...")
-        if finger.finger_search() == adafruit_fingerprint.OK:
+        if identifier.identify() == adafruit_fingerprint.OK:
             existing_user = self.get_user(finger.finger_id)
             if existing_user:
                 # messagebox.showwarning("Error", f"Fingerprint already registered to {existing_user}")
@@ -281,8 +253,7 @@ class FingerprintEnrollment:
         print("Waiting for image...")
         self.update_message(f"Waiting for image...", color="green")
         # Attempt to capture the first image
-        while finger.get_image() != adafruit_fingerprint.OK:
-            pass
+        finger_detector.wait_for_image(finger)
 
         print("Templating first image...")
         if finger.image_2_tz(1) != adafruit_fingerprint.OK:
@@ -291,7 +262,7 @@ class FingerprintEnrollment:
             return False
 
         print("Checking if fingerprint is already registered...")
-        if finger.finger_search() == adafruit_fingerprint.OK:
+        if identifier.identify() == adafruit_fingerprint.OK:
             existing_user = self.get_user(finger.finger_id)
             if existing_user:
                 # messagebox.showwarning("Error", f"Fingerprint already registered to {existing_user}")
@@ -300,9 +271,8 @@ class FingerprintEnrollment:
 
         # Prompt to place the finger again for verification
         print("Place the same finger again...")
-        time.sleep(3)
-        while finger.get_image() != adafruit_fingerprint.OK:
-            pass
+        finger_detector.wait_for_removal(finger, timeout=3)
+        finger_detector.wait_for_image(finger)
 
         print("Templating second image...")
         if finger.image_2_tz(2) != adafruit_fingerprint.OK:
@@ -311,7 +281,7 @@ class FingerprintEnrollment:
             return False
 
         print("Re-Checking if fingerprint is already registered...")
-        if finger.finger_search() == adafruit_fingerprint.OK:
+        if identifier.identify() == adafruit_fingerprint.OK:
             existing_user = self.get_user(finger.finger_id)
             if existing_user:
                 # messagebox.showwarning("Error", f"Fingerprint already registered to {existing_user}")
@@ -325,16 +295,20 @@ class FingerprintEnrollment:
 
             return False
 
-        # Use self.next_fingerprint_id here
-        print(f"Storing model at location #{self.next_fingerprint_id}...")
-        if finger.store_model(self.next_fingerprint_id) != adafruit_fingerprint.OK:
+        # Lowest free slot, including ones freed by deleted templates
+        fingerprint_id = self.templates.allocate()
+        if fingerprint_id is None:
+            self.update_message("Fingerprint library is full.", color="red")
+            return False
+
+        print(f"Storing model at location #{fingerprint_id}...")
+        if self.templates.store(finger, fingerprint_id, owner=email) != adafruit_fingerprint.OK:
             # messagebox.showwarning("Error", "Failed to store fingerprint model.")
             self.update_message(f"Failed to store fingerprint model.", color="red")
             return False
 
         # Post the fingerprint data to the API
-        self.post_fingerprint(email, self.next_fingerprint_id)
-        self.next_fingerprint_id += 1  # Increment the ID for the next registration
+        self.post_fingerprint(email, fingerprint_id)
         return True
 
     def on_enroll_button_click(self):
@@ -357,16 +331,21 @@ class FingerprintEnrollment:
             self.refresh_table()
 
     def refresh_table(self):
-        """Refresh the table with data from the Laravel API."""
+        """Refresh the table with data from the Laravel API (downloaded off the Tk thread)."""
+        self.attendance_app.ui.submit(self.fetch_users, on_done=self.populate_table)
+
+    def fetch_users(self):
+        return self.fetch_faculty_data(), self.fetch_admin_data()
+
+    def populate_table(self, users):
+        faculty_data, admin_data = users
         for row in self.tree.get_children():
             self.tree.delete(row)
 
-        faculty_data = self.fetch_faculty_data()
         for faculty in faculty_data:
             # Only display faculty who have less than 2 fingerprints registered
             self.tree.insert("", tk.END, values=(faculty['name'], faculty['email']))
 
-        admin_data = self.fetch_admin_data()
         for admin in admin_data:
             # Only display admin who have less than 2 fingerprints registered
             self.tree.insert("", tk.END, values=(admin['name'], admin['email']))
@@ -390,6 +369,9 @@ class AttendanceApp:
         # Add key binding to exit full screen
         self.root.bind("<Escape>", self.exit_full_screen)
 
+        # Network jobs run on a worker pool; results and widget updates come back through one queue
+        self.ui = UIDispatcher(self.root)
+
         # Initialize the text-to-speech engine
         try:
             self.speech_engine = pyttsx3.init(driverName='espeak')  # Ensure the correct driver is used for Raspberry Pi
@@ -439,6 +421,53 @@ class AttendanceApp:
         self.clock_label = tk.Label(center_frame, font=("Exo 2", 30), fg="red", bg="#F6F5FB")
         self.clock_label.pack(anchor="center", pady=(0, 10))  # Center the clock label with some padding
 
+        # Sync the local clock with the API once, then re-sync in the background
+        self.clock = TimeSync(api)
+        self.clock.start()
+
+        # Lab schedules keyed by fingerprint ID and RFID UID, parsed once per download
+        self.schedules = ScheduleCache(api)
+
+        # Sounds are decoded once and played without blocking the scan loops
+        self.audio = AudioEngine()
+        self.buzzer_active = threading.Event()
+
+        # Prompts are spoken on their own thread; fixed phrases come from a WAV cache
+        self.speech = SpeechWorker(self.speech_engine, self.audio)
+        self.speech.start()
+
+        # Which sensor slots are in use, mirrored on disk; one count_templates() round trip checks it
+        self.templates = TemplateIndex()
+        try:
+            self.templates.verify(finger)
+        except (RuntimeError, OSError) as e:
+            print(f"Failed to check the fingerprint library: {e}")
+
+        # Names and card profiles resolved from memory; refreshed in the background
+        self.directory = UserDirectory(api)
+        self.directory.start()
+
+        # Download every known schedule now and again shortly before each class starts
+        self.prefetcher = SchedulePrefetcher(api, self.schedules, self.clock)
+        self.prefetcher.add_listener(self.on_schedule_prefetched)
+        self.prefetcher.start()
+
+        # Time-in/time-out and door events go to a local journal first and are uploaded in the background
+        self.journal = AttendanceJournal()
+        self.uploader = JournalUploader(api, self.journal, self.clock)
+        self.uploader.add_listener(self.on_journal_uploaded)
+        self.uploader.start()
+
+        # Who is timed in, answered from memory; our own writes update it and /recent-logs reconciles it
+        self.attendance = AttendanceState(api, self.journal)
+        self.attendance.start()
+
+        # Concurrent lookups for each fingerprint scan, under one shared deadline
+        self.scan_pipeline = ScanPipeline()
+
+        # Closes open student logs concurrently in the background when the instructor times out
+        self.closeout = BulkTimeOut(api, self.uploader)
+
         # Start the clock update
         self.update_clock()
 
@@ -498,6 +527,10 @@ class AttendanceApp:
         self.year_entry = self.create_label_entry(right_frame, "Year:", label_font)
         self.section_entry = self.create_label_entry(right_frame, "Section:", label_font)
 
+        # Number of taps waiting to be recorded (visible during the class-start rush)
+        self.tap_queue_label = ttk.Label(right_frame, text="", font=label_font, background="#F6F5FB")
+        self.tap_queue_label.pack(pady=5)
+
         # Error Message Label
         self.error_label = tk.Label(self.main_frame, text="", font=("Exo 2", 20, "bold", "italic"), foreground="green", bg="#2D3F7C")
         # Use self.main_frame
@@ -515,14 +548,18 @@ class AttendanceApp:
 
         # Initialize NFC reader
         try:
-            self.clf = nfc.ContactlessFrontend('usb')
+            self.clf = open_nfc()
         except Exception as e:
             print("NFC Error", f"Failed to initialize NFC reader: {e}")
             self.clf = None
 
         self.running = True
-        self.nfc_thread = threading.Thread(target=self.read_nfc_loop)
-        self.nfc_thread.start()
+        # The reader thread only reads cards; taps are recorded on a worker pool
+        self.tap_processor = TapProcessor(self.handle_tap)
+        self.tap_processor.add_listener(self.on_tap_queue_depth)
+        self.nfc_reader = NFCReader(self.clf)
+        self.nfc_reader.add_listener(self.queue_tap)
+        self.nfc_reader.start()
 
         # Initialize serial connection for fingerprint sensor
         self.finger = self.initialize_serial()
@@ -535,15 +572,16 @@ class AttendanceApp:
         self.last_time_in = {}
         self.is_manual_unlock = False  # Flag to check if the door was manually unlocked
 
-        # Start periodic checking of log status
-        self.root.after(1000, self.check_log_status_periodically)  # Check log status every 10 seconds
+        # Watch /logs for remote lock/unlock commands (incremental, sub-second)
+        self.remote_commands = RemoteCommandPoller(api, self.handle_remote_log)
+        self.remote_commands.start()
 
         # Handle window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def update_clock(self):
-        """Update the clock label with the current time from the API."""
-        # Fetch the current date and time from the API
+        """Update the clock label with the current time from the API-synced clock."""
+        # Read the current date and time from the local synced clock (no network call)
         current_time_data = self.fetch_current_date_time()
 
         if current_time_data:
@@ -605,95 +643,99 @@ class AttendanceApp:
             self.logs_tree.heading(col, text=col)
             self.logs_tree.column(col, minwidth=100, width=100, anchor='center')
 
+        # Keyed model: refreshes only touch rows that changed, one page of rows at a time
+        self.logs_model = LogTableModel(self.logs_tree)
+
+        # Pager for logs older than the first page
+        pager_frame = ttk.Frame(table_frame, style="ContainerFrame.TFrame")
+        pager_frame.pack(fill='x')
+        tk.Button(pager_frame, text="Newer", bg="#D3D1ED", command=self.logs_model.prev_page).pack(side="left")
+        tk.Button(pager_frame, text="Older", bg="#D3D1ED", command=self.logs_model.next_page).pack(side="right")
+        self.logs_page_label = tk.Label(pager_frame, text="", font=("Exo 2", 10), bg="#F6F5FB")
+        self.logs_page_label.pack(anchor="center")
+        self.logs_model.add_listener(self.update_logs_page_label)
+
+    def update_logs_page_label(self, page, page_count):
+        self.logs_page_label.config(text=f"Page {page + 1} of {page_count}")
+
     def initialize_serial(self):
         try:
-            uart = serial.Serial("/dev/ttyUSB0", baudrate=57600, timeout=1)
-            return adafruit_fingerprint.Adafruit_Fingerprint(uart)
-        except serial.SerialException as e:
+            return open_fingerprint()
+        except OSError as e:  # serial.SerialException
             print("Serial Error", f"Failed to connect to serial port: {e}")
             return None
 
     def unlock_door(self):
-        GPIO.output(SOLENOID_PIN, GPIO.LOW)
+        with span('gpio unlock'):
+            GPIO.output(SOLENOID_PIN, GPIO.LOW)
         print("Door unlocked.")
 
     def lock_door(self):
-        GPIO.output(SOLENOID_PIN, GPIO.HIGH)
+        with span('gpio lock'):
+            GPIO.output(SOLENOID_PIN, GPIO.HIGH)
         print("Door locked.")
 
     def speak(self, message):
-        """Utility method to handle text-to-speech."""
-        if self.speech_engine:
-            self.speech_engine.say(message)
-            self.speech_engine.runAndWait()
-
-    def fetch_latest_log_status(self):
-        try:
-            # Fetch the latest logs from the server
-            response = requests.get(LOGS_URL)
-            response.raise_for_status()
-            logs = response.json().get("logs", [])
-
-            if logs:
-                latest_log = logs[-1]  # Get the latest log (assuming logs are in chronological order)
-                status = latest_log.get("status", "")
-                action_type = latest_log.get("action_type", "")
-
-                # Handle remote actions (manual unlock or lock)
-                if action_type == "manual_unlock":
-                    if self.is_door_locked():  # Only unlock if it's currently locked
-                        self.unlock_door()
-                        print("Door unlocked by remote action.")
-                elif action_type == "manual_lock":
-                    if not self.is_door_locked():  # Only lock if it's currently unlocked
-                        self.lock_door()
-                        print("Door locked by remote action.")
-
-                # Handle automatic lock/unlock based on the status field
-                if status == "close" and not self.is_door_locked():  # Check if the door needs to be locked
-                    self.lock_door()
-                    print("Door locked automatically based on log status.")
-                    self.update_door_status(self.finger.finger_id, 'close')  # Update the door status to 'close'
+        """Queue a text-to-speech prompt; returns without waiting for it to be said."""
+        with span('tts'):
+            self.speech.speak(message)
 
-                elif status == "open" and self.is_door_locked():  # Check if the door needs to be unlocked
-                    self.unlock_door()
-                    print("Door unlocked automatically based on log status.")
-                    self.update_door_status(self.finger.finger_id, 'open')  # Update the door status to 'open'
-
-        except requests.RequestException as e:
-            print(f"Error fetching log status: {e}")
+    def on_schedule_prefetched(self, kind, key, index):
+        """Pre-render the greetings of users who have a class today."""
+        if kind != FINGERPRINT:
+            return
+        user = self.directory.peek_fingerprint(key)
+        name = user['name'] if user else None
+        now = self.current_schedule_time()
+        if name and now and index.class_starts(now[0], now[1]):
+            self.speech.prerender(greeting_phrases(name))
+
+    def handle_remote_log(self, latest_log):
+        """Apply a new /logs entry delivered by the remote command poller."""
+        status = latest_log.get("status", "")
+        action_type = latest_log.get("action_type", "")
+        begin_trace('remote_command')
+
+        # Handle remote actions (manual unlock or lock)
+        if action_type == "manual_unlock":
+            if self.is_door_locked():  # Only unlock if it's currently locked
+                self.unlock_door()
+                print("Door unlocked by remote action.")
+        elif action_type == "manual_lock":
+            if not self.is_door_locked():  # Only lock if it's currently unlocked
+                self.lock_door()
+                print("Door locked by remote action.")
+
+        # Handle automatic lock/unlock based on the status field
+        if status == "close" and not self.is_door_locked():  # Check if the door needs to be locked
+            self.lock_door()
+            print("Door locked automatically based on log status.")
+            self.update_door_status(self.finger.finger_id, 'close')  # Update the door status to 'close'
+
+        elif status == "open" and self.is_door_locked():  # Check if the door needs to be unlocked
+            self.unlock_door()
+            print("Door unlocked automatically based on log status.")
+            self.update_door_status(self.finger.finger_id, 'open')  # Update the door status to 'open'
+
+        end_trace(action_type or status or None)
 
     def is_door_locked(self):
         # Function to check the current state of the door (you can track it via a GPIO pin)
         return GPIO.input(SOLENOID_PIN) == GPIO.HIGH
 
-    def check_log_status_periodically(self):
-        self.fetch_latest_log_status()
-        self.root.after(10000, self.check_log_status_periodically)  # Call again after 10 seconds
-
     def get_user_details(self, fingerprint_id):
         try:
-            response = requests.get(f"{FINGERPRINT_API_URL}{fingerprint_id}")
-            response.raise_for_status()
-            data = response.json()
-            return data.get('name', None)
+            return self.directory.name_for_fingerprint(fingerprint_id)
         except requests.RequestException as e:
             print("API Error", f"Failed to fetch data from API: {e}")
             return None
 
     def fetch_current_date_time(self):
-        try:
-            response = requests.get(CURRENT_DATE_TIME_URL)
-            response.raise_for_status()
-            data = response.json()
-            if 'day_of_week' in data and 'current_time' in data:
-                return data
-            else:
-                print("Error: Missing expected keys in the API response.")
-                return None
-        except requests.RequestException as e:
-            print(f"Error fetching current date and time from API: {e}")
-            return None
+        """Return the API date and time from the local synced clock, or None if never synced."""
+        data = self.clock.now()
+        if data is None:
+            print("Error: Clock has not been synced with the API yet.")
+        return data
 
     def update_current_date_time(self):
         """Fetch and update the current date and time in the label."""
@@ -708,57 +750,31 @@ class AttendanceApp:
         # Update the current date and time every minute
         self.root.after(60000, self.update_current_date_time)
 
+    def current_schedule_time(self):
+        """Return (day_of_week, date, minute_of_day) from the synced clock, or None."""
+        current = self.clock.now_datetime()
+        if current is None:
+            print("Error: Could not fetch current date and time from API.")
+            return None
+        return current.strftime('%A'), current.date(), current.hour * 60 + current.minute
+
     def get_schedule(self, fingerprint_id):
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                print("Error: Could not fetch current date and time from API.")
+            now = self.current_schedule_time()
+            if not now:
                 return False
+            current_day, current_date, current_minute = now
+            print(f"Current Day from API: {current_day}, Current Time from API: {current_minute // 60:02d}:{current_minute % 60:02d}")
 
-            current_day = current_time_data.get('day_of_week')  # Example: "Wednesday"
-            current_time = current_time_data.get('current_time')  # Example: "06:30"
-            current_date = datetime.now().date()  # Fetch today's date
-
-            # Convert the current time to a time object for comparison
-            current_time_obj = datetime.strptime(current_time, "%H:%M").time()
-
-            if not current_day or not current_time:
-                print("Error: Invalid response from current date-time API.")
-                return False
+            schedule = self.schedules.fingerprint(fingerprint_id)
 
-            print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
-
-            response = requests.get(f"{LAB_SCHEDULE_FINGERPRINT_URL}{fingerprint_id}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                schedule_day = schedule.get('day_of_the_week')
-                start_time = schedule.get('class_start')
-                end_time = schedule.get('class_end')
-                is_makeup_class = schedule.get('is_makeup_class', 0)
-                specific_date = schedule.get('specific_date')
-
-                if start_time and end_time:
-                    # Convert start and end times to time objects
-                    start_time_obj = datetime.strptime(start_time, "%H:%M").time()
-                    end_time_obj = datetime.strptime(end_time, "%H:%M").time()
-
-                    # For regular classes, use `day_of_the_week`
-                    if not is_makeup_class:
-                        if schedule_day and schedule_day.lower() == current_day.lower():
-                            if start_time_obj <= current_time_obj < end_time_obj:
-                                print("Access allowed based on regular schedule.")
-                                return True
-
-                    # For makeup classes, use `specific_date`
-                    elif is_makeup_class == 1:
-                        if specific_date:
-                            schedule_date = datetime.strptime(specific_date, '%Y-%m-%d').date()
-                            if schedule_date == current_date:
-                                if start_time_obj <= current_time_obj < end_time_obj:
-                                    print("Access allowed based on makeup class schedule.")
-                                    return True
+            # Regular classes use `day_of_the_week`, makeup classes use `specific_date`
+            if schedule.allows_regular(current_day, current_minute):
+                print("Access allowed based on regular schedule.")
+                return True
+            if schedule.allows_makeup(current_date, current_minute):
+                print("Access allowed based on makeup class schedule.")
+                return True
 
             print("Access denied: No matching schedule found or not within allowed time.")
             return False
@@ -769,42 +785,17 @@ class AttendanceApp:
 
     def get_schedule_mock_up(self, fingerprint_id):
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                print("Error: Could not fetch current date and time from API.")
+            now = self.current_schedule_time()
+            if not now:
                 return False
+            current_day, current_date, current_minute = now
+            print(f"Current Date: {current_date}, Current Time from API: {current_minute // 60:02d}:{current_minute % 60:02d}")
 
-            current_day = current_time_data.get('day_of_week')
-            current_time = current_time_data.get('current_time')
-            current_date = datetime.now().date()  # Fetch current date
+            schedule = self.schedules.fingerprint(fingerprint_id)
 
-            if not current_day or not current_time:
-                print("Error: Invalid response from current date-time API.")
-                return False
-
-            print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
-
-            response = requests.get(f"{LAB_SCHEDULE_FINGERPRINT_URL}{fingerprint_id}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                specific_date = schedule.get('specific_date')
-                start_time = schedule.get('class_start')
-                end_time = schedule.get('class_end')  # Assuming end time is available in the schedule data
-
-                if specific_date and start_time and end_time:
-                    # Convert specific_date string to a date object
-                    schedule_date = datetime.strptime(specific_date, '%Y-%m-%d').date()
-
-                    print(f"Checking Schedule: Date: {schedule_date}, Start: {start_time}, End: {end_time}")
-
-                    # Check if the schedule date matches the current date
-                    if schedule_date == current_date:
-                        # Check if the current time is within the scheduled time period
-                        if start_time <= current_time < end_time:
-                            print("Access allowed based on schedule.")
-                            return True
+            if schedule.allows_makeup(current_date, current_minute):
+                print("Access allowed based on schedule.")
+                return True
 
             print("Access denied: No matching schedule found or not within allowed time.")
             return False
@@ -814,40 +805,17 @@ class AttendanceApp:
 
     def get_rfid_schedule(self, rfid_number):
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                print("Error: Could not fetch current date and time from API.")
+            now = self.current_schedule_time()
+            if not now:
                 return False
+            current_day, current_date, current_minute = now
+            print(f"Current Day from API: {current_day}, Current Time: {current_minute // 60:02d}:{current_minute % 60:02d}")
 
-            current_day = current_time_data.get('day_of_week')
-            current_time = current_time_data.get('current_time')
+            schedule = self.schedules.rfid(rfid_number)
 
-            if not current_day or not current_time:
-                print("Error: Invalid response from current date-time API.")
-                return False
-
-            print(f"Current Day from API: {current_day}, Current Time: {current_time}")
-
-            response = requests.get(f"{LAB_SCHEDULE_URL}{rfid_number}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                schedule_day = schedule.get('day_of_the_week')
-                start_time = schedule.get('class_start')
-                end_time = schedule.get('class_end')  # Assuming class_end is available
-                is_makeup_class = schedule.get('is_makeup_class', 0)
-                specific_date = schedule.get('specific_date', 'N/A')
-
-                if is_makeup_class == 0 and schedule_day and start_time and end_time:
-                    print(f"Checking Regular Schedule: Day: {schedule_day}, Start: {start_time}, End: {end_time}")
-
-                    # Check if the current day matches the schedule day
-                    if schedule_day.lower() == current_day.lower():
-                        # Check if the current time is within the scheduled class period
-                        if start_time <= current_time < end_time:
-                            print("Access allowed based on regular schedule.")
-                            return True
+            if schedule.allows_regular(current_day, current_minute):
+                print("Access allowed based on regular schedule.")
+                return True
 
             print("Access denied: No matching regular schedule found or not within allowed time.")
             return False
@@ -857,42 +825,17 @@ class AttendanceApp:
 
     def get_rfid_schedule_mock_up(self, rfid_number):
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                print("Error: Could not fetch current date and time from API.")
-                return False
-
-            current_time = current_time_data.get('current_time')
-            current_date = datetime.now().date()  # Fetch current date
-
-            if not current_time:
-                print("Error: Invalid response from current date-time API.")
+            now = self.current_schedule_time()
+            if not now:
                 return False
+            current_day, current_date, current_minute = now
+            print(f"Current Date: {current_date}, Current Time: {current_minute // 60:02d}:{current_minute % 60:02d}")
 
-            print(f"Current Date: {current_date}, Current Time: {current_time}")
-
-            response = requests.get(f"{LAB_SCHEDULE_URL}{rfid_number}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                specific_date = schedule.get('specific_date')
-                start_time = schedule.get('class_start')
-                end_time = schedule.get('class_end')  # Assuming class_end is available
-                is_makeup_class = schedule.get('is_makeup_class', 0)
-
-                if is_makeup_class == 1 and specific_date and start_time and end_time:
-                    # Convert specific_date string to a date object
-                    if specific_date != 'N/A':
-                        schedule_date = datetime.strptime(specific_date, '%Y-%m-%d').date()
-                        print(f"Checking Make-Up Schedule: Date: {schedule_date}, Start: {start_time}, End: {end_time}")
+            schedule = self.schedules.rfid(rfid_number)
 
-                        # Check if the schedule date matches the current date
-                        if schedule_date == current_date:
-                            # Check if the current time is within the scheduled make-up class period
-                            if start_time <= current_time < end_time:
-                                print("Access allowed based on make-up schedule.")
-                                return True
+            if schedule.allows_makeup(current_date, current_minute):
+                print("Access allowed based on make-up schedule.")
+                return True
 
             print("Access denied: No matching make-up schedule found or not within allowed time.")
             return False
@@ -906,26 +849,14 @@ class AttendanceApp:
         Returns True if any class is a make-up class; otherwise, returns False.
         """
         try:
-            response = requests.get(f"{LAB_SCHEDULE_URL}{rfid_number}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                # Check if 'is_makeup_class' is 1, indicating a make-up class
-                if schedule.get('is_makeup_class') == 1:
-                    return True
-            return False
+            return self.schedules.rfid(rfid_number).has_makeup_class
         except requests.RequestException as e:
             print(f"Error checking if class is a make-up class: {e}")
             return False
 
     def check_time_in_record_fingerprint(self, fingerprint_id):
         try:
-            url = f"{RECENT_LOGS_FINGERPRINT_URL2}?fingerprint_id={fingerprint_id}"
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
-            return any(log.get('time_in') and not log.get('time_out') for log in logs)
+            return self.attendance.fingerprint_is_in(fingerprint_id)
         except requests.RequestException as e:
             print(f"Error checking Time-In record: {e}")
             return False
@@ -935,13 +866,13 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_IN_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_in={current_time_data['current_time']}&user_name={user_name}&role_id={role_id}"
-            response = requests.put(url)
-            response.raise_for_status()
+            self.uploader.submit('time_in_fingerprint', fingerprint_id, current_time_data['current_time'],
+                                 user_name, role_id)
+            self.attendance.mark_fingerprint_in(fingerprint_id)
             print("Time-In recorded successfully.")
             print("Success", "Time-In recorded successfully.")
             print("Door unlocked!")
-        except requests.RequestException as e:
+        except sqlite3.Error as e:
             print("Error", f"Error recording Time-In: {e}")
 
     def record_time_out_fingerprint(self, fingerprint_id):
@@ -949,12 +880,11 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_OUT_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            self.uploader.submit('time_out_fingerprint', fingerprint_id, current_time_data['current_time'])
+            self.attendance.mark_fingerprint_out(fingerprint_id)
             print("Time-Out recorded successfully.")
             print("Door locked!")
-        except requests.RequestException as e:
+        except sqlite3.Error as e:
             print(f"Error recording Time-Out: {e}")
 
     def stop_fingerprint_scanning(self):
@@ -989,71 +919,41 @@ class AttendanceApp:
         print("Fingerprint scanning started.")
 
     def play_welcome_song(self):
-        """Play the welcome.mp3 song for 2 seconds when the door is unlocked."""
-        try:
-            pygame.mixer.music.load("welcome.mp3")  # Load the MP3 file
-            pygame.mixer.music.play()  # Start playing the song
-            time.sleep(2)  # Wait for 2 seconds
-            pygame.mixer.music.stop()  # Stop the song after 11 seconds
-        except pygame.error as e:
-            print(f"Failed to play tabi.mp3: {e}")
+        """Play welcome.mp3 (2 s) when the door is unlocked or locked. Returns immediately."""
+        with span('audio welcome'):
+            self.audio.play('welcome')
 
     def play_wrong_song(self):
-        """Play the farewell.mp3 song for 15 seconds when the door is unlocked."""
-        try:
-            pygame.mixer.music.load("wrong.mp3")  # Load the MP3 file
-            pygame.mixer.music.play()  # Start playing the song
-            time.sleep(1)  # Wait for 11 seconds
-            pygame.mixer.music.stop()  # Stop the song after 15 seconds
-        except pygame.error as e:
-            print(f"Failed to play farewell.mp3: {e}")
+        """Play wrong.mp3 (1 s) after a failed scan. Returns immediately."""
+        with span('audio wrong'):
+            self.audio.play('wrong')
 
     def play_tot_sound(self):
-        """Play the farewell.mp3 song for 15 seconds when the door is unlocked."""
-        try:
-            pygame.mixer.music.load("beep.mp3")  # Load the MP3 file
-            pygame.mixer.music.play()  # Start playing the song
-            time.sleep(1)  # Wait for 1 seconds
-            pygame.mixer.music.stop()  # Stop the song after 1 seconds
-        except pygame.error as e:
-            print(f"Failed to play tot.mp3: {e}")
+        """Play beep.mp3 (1 s) as tap feedback. Returns immediately."""
+        with span('audio beep'):
+            self.audio.play('beep')
 
     def play_alarm_sound(self):
-        """Play the farewell.mp3 song for 10 seconds when the door is unlocked."""
-        try:
-            pygame.mixer.music.load("alarm-2.mp3")  # Load the MP3 file
-            pygame.mixer.music.play()  # Start playing the song
-            time.sleep(10)  # Wait for 10 seconds
-            pygame.mixer.music.stop()  # Stop the song after 11 seconds
-        except pygame.error as e:
-            print(f"Failed to play alarm.mp3: {e}")
+        """Play alarm-2.mp3 (10 s), preempting any other event sound. Returns immediately."""
+        with span('audio alarm'):
+            self.audio.play('alarm')
 
     def update_door_status(self, fingerprint_id, status):
         """
-        Update the door status (open/close) by making an API request.
+        Record the door status (open/close) in the journal; it is sent to the API in the background.
+        The caller has already moved the solenoid, so this is a record only and works offline.
         :param fingerprint_id: The fingerprint ID that was matched
         :param status: The new door status ('open' or 'close')
         """
         try:
-            # Construct the URL with fingerprint_id and status
-            url = f'{API_URL}/door/log-status?fingerprint_id={fingerprint_id}&status={status}'
-            response = requests.post(url)
-            response.raise_for_status()
-
-            # Check if the API response contains a success message
-            if response.status_code == 200:
-                data = response.json()
-                log_info = data.get('log', {})
-                print(f"Door {status} successfully: {log_info}")
-                # You can further extract and use details from the log (e.g., instructor name, log time)
-            else:
-                print(f"Failed to update door status: {response.status_code}")
-
-        except requests.RequestException as e:
-            print(f"API request failed: {e}")
+            self.uploader.submit('update_door_status', fingerprint_id, status)
+            print(f"Door {status} recorded.")
+        except sqlite3.Error as e:
+            print(f"Failed to record door status: {e}")
 
     def auto_scan_fingerprint(self):
         failed_attempts = 0  # Initialize the counter for failed attempts
+        scan_identifier = Identifier(self.finger)  # self.finger is reopened after enrollment
         cooldown_period = 120  # 2 minutes cooldown in seconds
         last_time_in_global = None  # Track the time of the last time-in for any fingerprint
 
@@ -1074,26 +974,34 @@ class AttendanceApp:
             self.update_result("Waiting for fingerprint image...", color="green")
             self.speak("Waiting for fingerprint")  # Announce that the system is waiting for a fingerprint
 
-            while self.finger.get_image() != adafruit_fingerprint.OK:
-                if not self.running:
-                    return
-                time.sleep(1)
+            if not finger_detector.wait_for_image(self.finger, should_continue=lambda: self.running):
+                return
+
+            # Time the scan from the get_image() call that captured the finger
+            trace = begin_trace('fingerprint_scan', started=finger_detector.last_image[0])
+            trace.add_span('get_image', *finger_detector.last_image)
 
             print("Templating fingerprint...")
-            if self.finger.image_2_tz(1) != adafruit_fingerprint.OK:
+            with span('image_2_tz'):
+                templated = self.finger.image_2_tz(1)
+            if templated != adafruit_fingerprint.OK:
                 print("Failed to template the fingerprint image.")
                 failed_attempts += 1
                 self.check_failed_attempts(failed_attempts)  # Check failed attempts and trigger the buzzer if needed
+                end_trace('template_failed')
                 time.sleep(3)
                 continue
 
             # Search for fingerprint match and get the fingerprint ID
-            if self.finger.finger_search() != adafruit_fingerprint.OK:
+            with span('finger_search'):
+                searched = scan_identifier.identify()
+            if searched != adafruit_fingerprint.OK:
                 self.update_result("No matching fingerprint found.", color="red")
                 self.play_wrong_song()  # Play the song when the door is unlocked
                 self.speak("No matching fingerprint found. Please try again.")
                 failed_attempts += 1
                 self.check_failed_attempts(failed_attempts)
+                end_trace('no_match')
                 time.sleep(3)
                 continue
 
@@ -1104,53 +1012,71 @@ class AttendanceApp:
             fingerprint_id = self.finger.finger_id
             print(f"Fingerprint ID detected: {fingerprint_id}")
 
-            # Fetch user details from the database
-            name = self.get_user_details(fingerprint_id)
+            # Check if this is a superuser who can skip time-in/time-out
+            is_superuser = fingerprint_id in [1, 2]
+
+            # User, schedule and time-in lookups are independent: run them together
+            lookups = {'name': lambda: self.get_user_details(fingerprint_id)}
+            denies = {'name': lambda result: not result}
+            if not is_superuser:
+                lookups['schedule'] = lambda: self.check_schedule_fingerprint(fingerprint_id)
+                lookups['has_time_in'] = lambda: self.check_time_in_record_fingerprint(fingerprint_id)
+                denies['schedule'] = lambda result: not result
+            with span('lookups'):
+                results, denied_by, timed_out = self.scan_pipeline.run(lookups, denies)
+
+            if timed_out:
+                self.update_result("The server took too long to respond. Please try again.", color="red")
+                self.speak("Please try again.")
+                self.play_wrong_song()
+                end_trace('timeout')
+                time.sleep(3)
+                continue
+
+            name = results.get('name')
 
             if not name:
                 self.update_result("No matching fingerprint found in the database.", color="red")
                 self.speak("No matching fingerprint found in the database.")
                 self.play_wrong_song()  # Play the song when the door is unlocked
+                end_trace('unknown_user')
                 time.sleep(3)
                 continue
 
             print(f"User {name} found in the database.")
 
-            # Check if this is a superuser who can skip time-in/time-out
-            is_superuser = fingerprint_id in [1, 2]
-
             if is_superuser:
+                # The solenoid is driven here; the journaled status is only the record of it
                 if self.is_manual_unlock:
+                    self.lock_door()
                     self.update_door_status(fingerprint_id, 'close')
                     self.is_manual_unlock = False
                     self.update_result(f"Goodbye, {name}! Door locked.", color="green")
-                    self.speak(f"Goodbye {name}. The door is locked.")
+                    self.speak(GOODBYE_PHRASE.format(name=name))
                     self.play_welcome_song()  # Play the song when the door is locked
+                    end_trace('lock')
                 else:
+                    self.unlock_door()
                     self.update_door_status(fingerprint_id, 'open')
                     self.is_manual_unlock = True
                     self.update_result(f"Welcome, {name}! Door unlocked.", color="green")
-                    self.speak(f"Welcome {name}. The door is unlocked.")
+                    self.speak(WELCOME_PHRASE.format(name=name))
                     self.play_welcome_song()  # Play the song when the door is unlocked
+                    end_trace('unlock')
 
             else:
                 # Regular user schedule and time-in/out process
-                is_makeup_class = self.check_if_makeup_class(fingerprint_id)
-
-                if is_makeup_class:
-                    schedule_check = self.get_schedule_mock_up(fingerprint_id)
-                else:
-                    schedule_check = self.get_schedule(fingerprint_id)
-
-                if not schedule_check:
+                if not results.get('schedule'):
                     self.update_result("Access denied: Outside of allowed schedule.", color="red")
                     self.speak("Access denied. You are outside of your allowed schedule.")
                     self.play_wrong_song()  # Play the song when the door is unlocked
+                    end_trace('outside_schedule')
                     time.sleep(3)
                     continue
 
                 # Proceed with time-in or time-out logic based on the user
-                if not self.check_time_in_record_fingerprint(fingerprint_id):
+                if not results.get('has_time_in'):
+                    self.unlock_door()
                     self.record_time_in_fingerprint(fingerprint_id, name)
                     self.update_door_status(fingerprint_id, 'open')
 
@@ -1158,32 +1084,34 @@ class AttendanceApp:
                     last_time_in_global = current_time  # Set global time-in cooldown
 
                     self.update_result(f"Welcome, {name}! Door unlocked.", color="green")
-                    self.speak(f"Welcome {name}. The door is unlocked.")
+                    self.speak(WELCOME_PHRASE.format(name=name))
                     self.play_welcome_song()  # Play the song when the door is unlocked
+                    end_trace('time_in')
 
                 else:
+                    self.lock_door()
                     self.record_time_out_fingerprint(fingerprint_id)
                     self.update_door_status(fingerprint_id, 'close')
+                    self.record_all_time_out()  # The instructor is leaving: close out the students' logs
 
                     self.update_result(f"Goodbye, {name}! Door locked.", color="green")
-                    self.speak(f"Goodbye {name}. The door is locked.")
+                    self.speak(GOODBYE_PHRASE.format(name=name))
                     self.play_welcome_song()  # Play the song when the door is locked
+                    end_trace('time_out')
 
             time.sleep(3)
 
 
+    def check_schedule_fingerprint(self, fingerprint_id):
+        """Check the makeup or regular schedule, whichever applies to this user."""
+        if self.check_if_makeup_class(fingerprint_id):
+            return self.get_schedule_mock_up(fingerprint_id)
+        return self.get_schedule(fingerprint_id)
+
     def check_if_makeup_class(self, fingerprint_id):
-        # Replace with your logic to determine if this is a make-up class or not
-        # Example: Fetch schedule and check the 'is_makeup_class' field
+        # Uses the cached schedule, so the follow-up get_schedule call does not download it again
         try:
-            response = requests.get(f"{LAB_SCHEDULE_FINGERPRINT_URL}{fingerprint_id}")
-            response.raise_for_status()
-            schedules = response.json()
-
-            for schedule in schedules:
-                if schedule.get('is_makeup_class') == 1:
-                    return True
-            return False
+            return self.schedules.fingerprint(fingerprint_id).has_makeup_class
         except requests.RequestException as e:
             print("Request Error", f"Failed to check for make-up class: {e}")
             return False
@@ -1196,99 +1124,86 @@ class AttendanceApp:
             failed_attempts = 0
 
     def trigger_buzzer(self):
-        for _ in range(50):  # 5 seconds with 0.1-second intervals
-            GPIO.output(BUZZER_PIN, GPIO.HIGH)
-            time.sleep(0.1)
-            GPIO.output(BUZZER_PIN, GPIO.LOW)
-            time.sleep(0.1)
+        """Pulse the buzzer for 10 seconds on its own thread so scanning carries on."""
+        if self.buzzer_active.is_set():
+            return  # An alarm is already sounding
+        self.buzzer_active.set()
+        threading.Thread(target=self._pulse_buzzer, daemon=True).start()
 
-    def record_all_time_out(self):
+    def _pulse_buzzer(self):
         try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
-
-            for log in logs:
-                uid = log.get('UID')
-                if log.get('time_in') and not log.get('time_out') and uid:
-                    default_time_out = "00:00"
-                    url = f"{TIME_OUT_URL}?rfid_number={uid}&time_out={default_time_out}"
-                    response = requests.put(url)
-                    response.raise_for_status()
-                    print(f"Time-Out recorded for UID {uid} at {default_time_out}.")
+            for _ in range(50):  # 10 seconds with 0.1-second intervals
+                if not self.running:
+                    break
+                GPIO.output(BUZZER_PIN, GPIO.HIGH)
+                time.sleep(0.1)
+                GPIO.output(BUZZER_PIN, GPIO.LOW)
+                time.sleep(0.1)
+        finally:
+            GPIO.output(BUZZER_PIN, GPIO.LOW)
+            self.buzzer_active.clear()
 
+    def record_all_time_out(self):
+        """Time out every open student log in the background; returns immediately."""
+        day = self.uploader.today()  # Server-clock day, as the journal dates events: keys match on retry
+        self.closeout.run_async(day=day, on_done=lambda *result: self.on_close_out_done(*result, day=day))
+
+    def on_close_out_done(self, closed, failed, attempts, day=None):
+        self.attendance.mark_all_out(closed + list(failed))
+        # Logs the server would not take now are handed to the journal to retry, under the same key
+        for uid in failed:
+            try:
+                self.uploader.submit('time_out', uid, DEFAULT_TIME_OUT,
+                                     idempotency_key=close_out_key(uid, DEFAULT_TIME_OUT, day))
+            except sqlite3.Error as e:
+                print(f"Error journaling time-out for UID {uid}: {e}")
+        self.refresh_logs_table()
+
+    def on_journal_uploaded(self, action, args):
+        """Refresh the logs table once a journaled time-in/time-out reaches the server."""
+        if action != 'update_door_status':
             self.refresh_logs_table()
 
-        except requests.RequestException as e:
-            print(f"Error updating default time-out records: {e}")
-
     def refresh_logs_table(self):
-        self.root.after(100, self.fetch_recent_logs)
+        self.ui.call_soon(self.fetch_recent_logs)
 
     def fetch_recent_logs(self):
-        try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
-
-            # Clear the logs table before inserting new data
-            for i in self.logs_tree.get_children():
-                self.logs_tree.delete(i)
-
-            # Insert logs with the latest first
-            for log in reversed(logs):  # Reverse the logs to display the latest on top
-                self.logs_tree.insert("", "end", values=(
-                    log.get('date', 'N/A'),
-                    log.get('user_name', 'N/A'),
-                    log.get('seat_id', 'N/A'),
-                    log.get('user_number', 'N/A'),
-                    log.get('year', 'N/A'),
-                    log.get('block_name', 'N/A'),
-                    log.get('assigned_instructor', 'N/A'),
-                    log.get('time_in', 'N/A'),
-                    log.get('time_out', 'N/A')
-                ))
-        except requests.RequestException as e:
-            self.update_result(f"Error fetching recent logs: {e}", color="red")
+        """Download recent logs on a worker thread; the table is updated on the Tk thread."""
+        # Apply only the rows that changed, with the latest on top
+        self.ui.submit(api.get_recent_logs, on_done=self.logs_model.set_logs, on_error=self.on_recent_logs_error)
 
-    def read_nfc_loop(self):
-        while self.running:
-            try:
-                tag = self.clf.connect(rdwr={'on-connect': lambda tag: False})
-                if tag:
+    def on_recent_logs_error(self, e):
+        self.update_result(f"Error fetching recent logs: {e}", color="red")
 
-                    self.play_tot_sound()  # Play the song when the smart card is tap
+    def queue_tap(self, uid, timestamp):
+        """Hand a tap to the recording workers; waits (holding the reader) while the queue is full."""
+        if not self.tap_processor.submit(uid, timestamp):
+            self.update_result("Too many taps at once. Please tap your card again.", color="red")
+            self.play_wrong_song()
 
-                    uid = tag.identifier.hex()
-                    self.fetch_user_info(uid)
-                    time.sleep(1)
-            except Exception as e:
-                print(f"Error: {e}")
-                time.sleep(1)
+    def on_tap_queue_depth(self, depth):
+        self.ui.call_soon(self._show_tap_queue_depth, depth)
 
-    def fetch_user_info(self, uid):
-        try:
-            url = f'{USER_INFO_URL}?id_card_id={uid}'
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            self.student_number_entry.delete(0, tk.END)
-            self.student_number_entry.insert(0, data.get('user_number', 'None'))
+    def _show_tap_queue_depth(self, depth):
+        self.tap_queue_label.config(text=f"Taps waiting: {depth}" if depth else "")
 
-            self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, data.get('user_name', 'None'))
+    def handle_tap(self, uid, timestamp):
+        """Record one card tap (runs on a TapProcessor worker)."""
+        # The trace starts at the read, so time spent waiting for a worker is included
+        trace = begin_trace('nfc_scan', started=time.perf_counter() - max(0.0, time.time() - timestamp))
+        trace.add_span('tap queue', trace.started, time.perf_counter())
 
-            self.year_entry.delete(0, tk.END)
-            self.year_entry.insert(0, data.get('year', 'None'))
+        self.play_tot_sound()  # Play the song when the smart card is tap
 
-            self.section_entry.delete(0, tk.END)
-            self.section_entry.insert(0, data.get('block', 'None'))
+        self.fetch_user_info(uid)
+        end_trace('done')
 
-            self.error_label.config(text="")
+    def fetch_user_info(self, uid):
+        try:
+            data = self.directory.user_for_card(uid)
 
-            # Clear entries after 3 seconds
-            self.root.after(3000, self.clear_entries)
+            # Widgets are updated on the Tk thread; this runs on the NFC thread
+            self.ui.run_on_ui(self.show_user_info, data)
 
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
@@ -1296,14 +1211,15 @@ class AttendanceApp:
 
             current_time = datetime.strptime(current_time_data['current_time'], "%H:%M")
 
+            # One memory lookup decides the toggle; no recent-logs round trip
             if self.check_time_in_record(uid):
-                self.record_time_out(uid)
+                self.record_time_out(uid, current_time_data)
             else:
-                self.record_time_in(uid, data.get('user_name', 'None'), data.get('year', 'None'))
+                self.record_time_in(uid, data.get('user_name', 'None'), data.get('year', 'None'), current_time_data)
                 self.last_time_in[uid] = current_time
 
         except requests.HTTPError as http_err:
-            if response.status_code == 404:
+            if http_err.response is not None and http_err.response.status_code == 404:
                 self.clear_data()
                 self.update_result("Card is not registered, Please contact the administrator.", color="red")
             else:
@@ -1311,6 +1227,25 @@ class AttendanceApp:
         except requests.RequestException as e:
             self.update_result(f"Error fetching user info: {e}", color="red")
 
+    def show_user_info(self, data):
+        """Fill the Student Number, Name, Year, and Section entries (Tk thread only)."""
+        self.student_number_entry.delete(0, tk.END)
+        self.student_number_entry.insert(0, data.get('user_number', 'None'))
+
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, data.get('user_name', 'None'))
+
+        self.year_entry.delete(0, tk.END)
+        self.year_entry.insert(0, data.get('year', 'None'))
+
+        self.section_entry.delete(0, tk.END)
+        self.section_entry.insert(0, data.get('block', 'None'))
+
+        self.error_label.config(text="")
+
+        # Clear entries after 3 seconds
+        self.root.after(3000, self.clear_entries)
+
     def clear_entries(self):
         """Clear the entries for Student Number, Name, Year, and Section."""
         self.student_number_entry.delete(0, tk.END)
@@ -1320,16 +1255,12 @@ class AttendanceApp:
 
     def check_time_in_record(self, rfid_number):
         try:
-            url = f'{RECENT_LOGS_URL2}?rfid_number={rfid_number}'
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
-            return any(log.get('time_in') and not log.get('time_out') for log in logs)
+            return self.attendance.is_in(rfid_number)
         except requests.RequestException as e:
             self.update_result(f"Error checking Time-In record: {e}", color="red")
             return False
 
-    def record_time_in(self, rfid_number, user_name, year):
+    def record_time_in(self, rfid_number, user_name, year, current_time_data):
         # Check if the class is a make-up class or a regular class
         is_makeup_class = self.check_if_makeup_class_rfid(rfid_number)
 
@@ -1344,50 +1275,29 @@ class AttendanceApp:
             return
 
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                return
-            url = f"{TIME_IN_URL}?rfid_number={rfid_number}&time_in={current_time_data['current_time']}&year={year}&user_name={user_name}&role_id=3"
-            response = requests.put(url)
-            response.raise_for_status()
+            self.uploader.submit('time_in', rfid_number, current_time_data['current_time'], year, user_name)
+            self.attendance.mark_in(rfid_number)
 
             print("Time-In recorded successfully.")
             self.update_result("Time-In recorded successfully.", color="green")
-            self.fetch_recent_logs()
-        except requests.RequestException as e:
+        except sqlite3.Error as e:
             self.update_result(f"Error recording Time-In: {e}", color="red")
 
-    def record_time_out(self, rfid_number):
-        # Check if the class is a make-up class or a regular class
-        is_makeup_class = self.check_if_makeup_class_rfid(rfid_number)
-
-        if is_makeup_class:
-            schedule_check = self.get_rfid_schedule_mock_up(rfid_number)
-        else:
-            schedule_check = self.get_rfid_schedule(rfid_number)
-
-        if not schedule_check:
-            self.update_result("Access denied: Not within scheduled time.", color="red")
-            self.play_wrong_song()  # Play the song when the door is unlocked
-
+    def record_time_out(self, rfid_number, current_time_data):
+        # Only called for a card that is timed in, so neither the schedule nor the logs are fetched again
         try:
-            current_time_data = self.fetch_current_date_time()
-            if not current_time_data:
-                return
-            if not self.check_time_in_record(rfid_number):
-                self.update_result("No Time-In record found for this RFID. Cannot record Time-Out.", color="red")
-                return
-
-            url = f"{TIME_OUT_URL}?rfid_number={rfid_number}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            self.uploader.submit('time_out', rfid_number, current_time_data['current_time'])
+            self.attendance.mark_out(rfid_number)
             print("Time-Out recorded successfully.")
             self.update_result("Time-Out recorded successfully.", color="green")
-            self.fetch_recent_logs()
-        except requests.RequestException as e:
+        except sqlite3.Error as e:
             self.update_result(f"Error recording Time-Out: {e}", color="red")
 
     def clear_data(self):
+        """Clear the entries and the result label (safe from any thread)."""
+        self.ui.run_on_ui(self._clear_data)
+
+    def _clear_data(self):
         self.student_number_entry.delete(0, tk.END)
         self.name_entry.delete(0, tk.END)
         self.year_entry.delete(0, tk.END)
@@ -1395,7 +1305,10 @@ class AttendanceApp:
         self.error_label.config(text="")
 
     def update_result(self, message, color="green"):
-        """Update the result label with a message and specified color."""
+        """Update the result label with a message and specified color (safe from any thread)."""
+        self.ui.run_on_ui(self._show_result, message, color)
+
+    def _show_result(self, message, color):
         self.error_label.config(text=message, fg=color)  # Set the text and color
         self.root.after(3000, self.clear_result)  # Schedule to clear the message after 3 seconds
 
@@ -1404,12 +1317,26 @@ class AttendanceApp:
 
     def on_closing(self):
         self.running = False
-        if self.nfc_thread.is_alive():
-            self.nfc_thread.join()
+        self.clock.stop()
+        self.prefetcher.stop()
+        self.directory.stop()
+        self.directory.save()
+        self.uploader.stop()
+        self.attendance.stop()
+        self.attendance.save()
+        self.remote_commands.stop()
+        self.ui.stop()
+        self.scan_pipeline.shutdown()
+        self.speech.stop()
+        self.audio.stop()
+        self.nfc_reader.stop()
+        self.nfc_reader.join()
+        self.tap_processor.shutdown()
         if self.fingerprint_thread.is_alive():
             self.fingerprint_thread.join()
         if self.clf is not None:
             self.clf.close()
+        api.close()
         self.root.destroy()
 
 
@@ -0,0 +1,50 @@
+import numpy as np
+
+IMAGE_WIDTH, IMAGE_HEIGHT = 256, 288  # get_fpdata(sensorbuffer="image"): two 4-bit pixels per byte
+GRAY_SCALE = 17  # 0x0 -> 0, 0xF -> 255
+RIDGE_LEVEL = 8  # Nibble values below this are dark (ridge) pixels
+
+
+def unpack_image(data, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """Raw sensor levels (0-15) as a height x width uint8 array.
+
+    `data` is the get_fpdata() payload (a list of ints, or bytes). Each byte
+    holds two horizontally adjacent pixels, the left one in the high nibble
+    (section 4.2.1 of the sensor manual). A short upload is padded white.
+    """
+    packed = np.frombuffer(data if isinstance(data, (bytes, bytearray)) else bytes(data), dtype=np.uint8)
+    expected = width * height // 2
+    if packed.size != expected:
+        packed = np.pad(packed[:expected], (0, max(0, expected - packed.size)), constant_values=0xFF)
+    pixels = np.empty(expected * 2, dtype=np.uint8)
+    pixels[0::2] = packed >> 4
+    pixels[1::2] = packed & 0x0F
+    return pixels.reshape(height, width)
+
+
+def to_grayscale(levels):
+    """Scale raw 0-15 levels to 8-bit gray (0-255)."""
+    return levels * np.uint8(GRAY_SCALE)
+
+
+def image_from_fpdata(data, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """PIL "L" (8-bit gray) image of a get_fpdata(sensorbuffer="image") payload."""
+    from PIL import Image
+    return Image.fromarray(to_grayscale(unpack_image(data, width, height)))
+
+
+def image_quality(levels, ridge_level=RIDGE_LEVEL):
+    """Quick statistics for rejecting poor captures before templating.
+
+    Returns {'mean': average level, 'contrast': standard deviation of the
+    levels, 'coverage': fraction of 16x16 blocks that contain ridges}.
+    A dry or barely-touching finger shows up as low contrast and coverage.
+    """
+    height, width = levels.shape
+    blocks = levels[:height - height % 16, :width - width % 16].reshape(height // 16, 16, width // 16, 16)
+    ridged = (blocks < ridge_level).any(axis=(1, 3))
+    return {
+        'mean': float(levels.mean()),
+        'contrast': float(levels.std()),
+        'coverage': float(ridged.mean()),
+    }
@@ -6,12 +6,15 @@ import serial
 
 import adafruit_fingerprint
 
+from sensor_link import saved_baudrate
+
 
 # import board
 # uart = busio.UART(board.TX, board.RX, baudrate=57600)
 
 # If using with a computer such as Linux/RaspberryPi, Mac, Windows with USB/serial converter:
-uart = serial.Serial("/dev/ttyUSB0", baudrate=57600, timeout=1)
+# (at the rate sensor_link.py negotiated, if it has been run)
+uart = serial.Serial("/dev/ttyUSB0", baudrate=saved_baudrate("/dev/ttyUSB0", 57600), timeout=1)
 
 # If using with Linux/Raspberry Pi and hardware UART:
 # uart = serial.Serial("/dev/ttyS0", baudrate=57600, timeout=1)
@@ -161,32 +164,12 @@ def save_fingerprint_image(filename):
     while finger.get_image():
         pass
 
-    # let PIL take care of the image headers and file structure
-    from PIL import Image  # pylint: disable=import-outside-toplevel
+    # unpack the two 4-bit pixels in each byte with NumPy (see fingerprint_image.py
+    #   and section 4.2.1 of the manual); PIL takes care of the file structure
+    from fingerprint_image import image_from_fpdata  # pylint: disable=import-outside-toplevel
 
-    img = Image.new("L", (256, 288), "white")
-    pixeldata = img.load()
-    mask = 0b00001111
     result = finger.get_fpdata(sensorbuffer="image")
-
-    # this block "unpacks" the data received from the fingerprint
-    #   module then copies the image data to the image placeholder "img"
-    #   pixel by pixel.  please refer to section 4.2.1 of the manual for
-    #   more details.  thanks to Bastian Raschke and Danylo Esterman.
-    # pylint: disable=invalid-name
-    x = 0
-    # pylint: disable=invalid-name
-    y = 0
-    # pylint: disable=consider-using-enumerate
-    for i in range(len(result)):
-        pixeldata[x, y] = (int(result[i]) >> 4) * 17
-        x += 1
-        pixeldata[x, y] = (int(result[i]) & mask) * 17
-        if x == 255:
-            x = 0
-            y += 1
-        else:
-            x += 1
+    img = image_from_fpdata(result)
 
     if not img.save(filename):
         return True
@@ -0,0 +1,55 @@
+import os
+
+# "pi" talks to the real sensor, reader and GPIO header; "sim" replays a
+# scripted session so the kiosk can run on any Linux box.
+HARDWARE_BACKEND = os.environ.get('PROLOCK_HARDWARE', 'pi')
+SIM_SCRIPT = os.environ.get('PROLOCK_SIM_SCRIPT')  # Scenario JSON for the simulator
+SIM_TIMINGS = os.environ.get('PROLOCK_SIM_TIMINGS')  # TimingRecorder JSON for the simulator
+
+FINGERPRINT_PORT = "/dev/ttyUSB0"
+FINGERPRINT_BAUDRATE = 57600
+NFC_PATH = 'usb'
+
+_simulator = None
+
+
+def simulator():
+    """The process-wide HardwareSimulator, started on first use."""
+    global _simulator
+    if _simulator is None:
+        from hardware_sim import HardwareSimulator, load_script, load_timings
+        script = load_script(SIM_SCRIPT) if SIM_SCRIPT else None
+        timings = load_timings(SIM_TIMINGS) if SIM_TIMINGS else None
+        _simulator = HardwareSimulator(script, timings).start()
+    return _simulator
+
+
+def load_gpio(backend=None):
+    """Return the RPi.GPIO module, or the simulator's stand-in."""
+    if (backend or HARDWARE_BACKEND) == 'sim':
+        return simulator().gpio
+    import RPi.GPIO as GPIO
+    return GPIO
+
+
+def open_fingerprint(backend=None, port=FINGERPRINT_PORT, baudrate=None):
+    """Open the fingerprint sensor. Raises OSError (serial.SerialException) if the port is missing.
+
+    Without `baudrate`, the port is opened at the rate sensor_link.py negotiated for it, or 57600.
+    """
+    if (backend or HARDWARE_BACKEND) == 'sim':
+        finger = simulator().fingerprint
+        return finger.reopen(baudrate) if baudrate else finger
+    import serial
+    import adafruit_fingerprint
+    from sensor_link import saved_baudrate
+    uart = serial.Serial(port, baudrate=baudrate or saved_baudrate(port, FINGERPRINT_BAUDRATE), timeout=1)
+    return adafruit_fingerprint.Adafruit_Fingerprint(uart)
+
+
+def open_nfc(backend=None, path=NFC_PATH):
+    """Open the NFC reader. Raises IOError if no reader is attached."""
+    if (backend or HARDWARE_BACKEND) == 'sim':
+        return simulator().nfc
+    import nfc
+    return nfc.ContactlessFrontend(path)
@@ -0,0 +1,444 @@
+import json
+import threading
+import time
+from itertools import cycle
+
+import adafruit_fingerprint
+
+# Typical R307/AS608 command times at 57600 baud (command + ack packets plus
+# on-sensor processing). A JSON file recorded on the device with
+# TimingRecorder replaces these with real samples.
+DEFAULT_TIMINGS = {
+    'get_image': 0.12,  # With a finger on the glass; NOFINGER comes back faster
+    'get_image_empty': 0.03,
+    'image_2_tz': 0.30,
+    'verify_password': 0.03,
+    'read_sysparam': 0.03,  # The library re-reads the parameters before every search
+    'finger_search': 0.35,
+    'finger_fast_search': 0.08,
+    'finger_search_per_template': 0.0006,  # Added per stored template the search looks at
+    'finger_fast_search_per_template': 0.0001,
+    'create_model': 0.10,
+    'store_model': 0.05,
+    'delete_model': 0.05,
+    'read_templates': 0.06,
+    'load_model': 0.02,
+    # Command and ack only; the template bytes themselves are timed from the baud rate
+    'upload_char': 0.01,
+    'download_char': 0.01,
+    'upload_image': 0.02,
+    'set_sysparam': 0.25,  # adafruit_fingerprint sleeps 0.25 s after every parameter change
+    'count_templates': 0.03,
+    'nfc_read': 0.02,  # Tag select after it enters the field
+}
+
+
+def load_timings(path):
+    """Read a TimingRecorder file ({command: [seconds, ...]})."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_script(path):
+    """Read a scenario file: {"enrolled": {slot: finger}, "events": [...]}."""
+    with open(path) as f:
+        return json.load(f)
+
+
+class TimingRecorder:
+    """Wraps a real Adafruit_Fingerprint and records how long each command takes.
+
+    Run the kiosk on the device with the recorder in place, save(), and
+    replay the file off-device with HardwareSimulator(timings=...).
+    """
+
+    def __init__(self, finger):
+        self._finger = finger
+        self.samples = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._finger, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = attr(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            key = name
+            if name == 'get_image' and result == adafruit_fingerprint.NOFINGER:
+                key = 'get_image_empty'
+            self.samples.setdefault(key, []).append(round(elapsed, 5))
+            return result
+        return timed
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.samples, f, indent=2)
+
+
+TEMPLATE_SIZE = 512  # Bytes in a character file (get_fpdata/send_fpdata payload)
+IMAGE_WIDTH, IMAGE_HEIGHT = 256, 288
+IMAGE_SIZE = IMAGE_WIDTH * IMAGE_HEIGHT // 2  # Two 4-bit pixels per byte
+PACKET_SIZES = {0: 32, 1: 64, 2: 128, 3: 256}  # data_packet_size code -> payload bytes per packet
+PACKET_OVERHEAD = 11  # Start code, address, type, length and checksum around each packet
+ACK_BYTES = 12
+
+_test_image = None
+
+
+def test_image():
+    """Diagonal stripes, packed like the sensor's image upload (high nibble = left pixel)."""
+    global _test_image
+    if _test_image is None:
+        pixels = [((x + y) // 8) & 0x0F for y in range(IMAGE_HEIGHT) for x in range(IMAGE_WIDTH)]
+        _test_image = bytes((pixels[i] << 4) | pixels[i + 1] for i in range(0, len(pixels), 2))
+    return _test_image
+
+
+# Raw search opcodes -> the timing they are simulated with
+SEARCH_COMMANDS = {0x04: 'finger_search', 0x1B: 'finger_fast_search'}
+
+
+class SimulatedUART:
+    def __init__(self, baudrate=57600):
+        self.baudrate = baudrate
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+
+class SimulatedFingerprint:
+    """Stands in for adafruit_fingerprint.Adafruit_Fingerprint.
+
+    Fingers are labels: a touch puts a label on the glass for `hold` seconds,
+    and a search matches it against the labels stored in the library.
+    """
+
+    def __init__(self, sim, enrolled=None, library_size=1000):
+        self.sim = sim
+        self.library = {int(slot): label for slot, label in (enrolled or {}).items()}
+        self.library_size = library_size
+        self.buffers = {1: None, 2: None}
+        self.image = None
+        self.finger_id = None
+        self.confidence = None
+        self.match_confidence = 150  # Score reported for a match
+        self._pending = None  # Raw command waiting for _get_packet()
+        self.templates = []
+        self.template_count = 0
+        self.baudrate = 6  # As read_sysparam() reports it: multiples of 9600
+        self.data_packet_size = 2  # 128-byte data packets
+        self.max_baud = 115200  # Fastest rate the wiring carries without errors; above it every other reply is garbled
+        self._commands = 0
+        self._uart = SimulatedUART()
+
+    def reopen(self, baudrate):
+        """Open the host side at `baudrate`, like a new serial.Serial + Adafruit_Fingerprint. Returns self."""
+        self._uart = SimulatedUART(baudrate)
+        if self.verify_password() != adafruit_fingerprint.OK:
+            raise RuntimeError("Failed to find sensor, check wiring!")
+        return self
+
+    def _check_link(self):
+        """Fail like the library does when the two ends disagree on the rate or the wiring cannot carry it."""
+        self._commands += 1
+        if not self._uart.is_open or self._uart.baudrate != 9600 * self.baudrate \
+                or (self._uart.baudrate > self.max_baud and self._commands % 2):
+            raise RuntimeError("Failed to read data from sensor")
+
+    def verify_password(self):
+        self.sim.delay('verify_password')
+        self._check_link()
+        return adafruit_fingerprint.OK
+
+    def set_sysparam(self, param_num, param_val):
+        """4 = baud rate (9600 * N, effective right after the ack), 6 = data packet size code."""
+        self._check_link()
+        self.sim.delay('set_sysparam')
+        if param_num == 4:
+            self.baudrate = param_val
+        elif param_num == 6:
+            self.data_packet_size = param_val
+        return adafruit_fingerprint.OK
+
+    def wire(self, payload=0):
+        """Sleep for the serial time of one ack plus `payload` bytes split into data packets."""
+        packets = -(-payload // PACKET_SIZES[self.data_packet_size])
+        line_bytes = ACK_BYTES + payload + packets * PACKET_OVERHEAD
+        time.sleep(line_bytes * 10 / (9600 * self.baudrate))
+
+    def get_image(self):
+        label = self.sim.finger_on_glass()
+        if label is None:
+            self.sim.delay('get_image_empty')
+            return adafruit_fingerprint.NOFINGER
+        self.sim.delay('get_image')
+        self.image = label
+        return adafruit_fingerprint.OK
+
+    def image_2_tz(self, slot=1):
+        self.sim.delay('image_2_tz')
+        if self.image is None:
+            return adafruit_fingerprint.IMAGEMESS
+        self.buffers[slot] = self.image
+        return adafruit_fingerprint.OK
+
+    def read_sysparam(self):
+        self.sim.delay('read_sysparam')
+        self._check_link()
+        return adafruit_fingerprint.OK
+
+    def _search(self, command, start=0, count=None):
+        """Scan stored templates in slot order, like the sensor; the time grows with the templates looked at."""
+        self.sim.delay(command)
+        end = self.library_size if count is None else start + count
+        label = self.buffers[1]
+        scanned = 0
+        for slot in sorted(self.library):
+            if not start <= slot < end:
+                continue
+            scanned += 1
+            if self.library[slot] == label:
+                self.sim.delay(f'{command}_per_template', scanned)
+                self.finger_id = slot
+                self.confidence = self.match_confidence
+                return adafruit_fingerprint.OK
+        self.sim.delay(f'{command}_per_template', scanned)
+        self.finger_id = 0
+        self.confidence = 0
+        return adafruit_fingerprint.NOTFOUND
+
+    def finger_search(self):
+        self.read_sysparam()
+        return self._search('finger_search')
+
+    def finger_fast_search(self):
+        self.read_sysparam()
+        return self._search('finger_fast_search')
+
+    def _send_packet(self, data):
+        """Raw search commands (0x04 search, 0x1B high-speed search), as sent by identification.py."""
+        if data[0] not in SEARCH_COMMANDS:
+            raise RuntimeError(f"Simulator does not handle raw command 0x{data[0]:02X}")
+        self._pending = data
+
+    def _get_packet(self, expected):
+        data, self._pending = self._pending, None
+        start, count = (data[2] << 8) | data[3], (data[4] << 8) | data[5]
+        code = self._search(SEARCH_COMMANDS[data[0]], start, count)
+        return [code, self.finger_id >> 8, self.finger_id & 0xFF, self.confidence >> 8, self.confidence & 0xFF]
+
+    def create_model(self):
+        self.sim.delay('create_model')
+        if self.buffers[1] is None or self.buffers[1] != self.buffers[2]:
+            return adafruit_fingerprint.ENROLLMISMATCH
+        return adafruit_fingerprint.OK
+
+    def store_model(self, location, slot=1):
+        self.sim.delay('store_model')
+        if not 0 <= location < self.library_size:
+            return adafruit_fingerprint.BADLOCATION
+        self.library[location] = self.buffers[slot]
+        return adafruit_fingerprint.OK
+
+    def delete_model(self, location):
+        self.sim.delay('delete_model')
+        self.library.pop(location, None)
+        return adafruit_fingerprint.OK
+
+    def load_model(self, location, slot=1):
+        self.sim.delay('load_model')
+        if location not in self.library:
+            return adafruit_fingerprint.BADLOCATION
+        self.buffers[slot] = self.library[location]
+        return adafruit_fingerprint.OK
+
+    def get_fpdata(self, sensorbuffer="char", slot=1):
+        """A character file that carries the label, so send_fpdata() can restore it elsewhere.
+
+        sensorbuffer="image" returns a 4-bit-per-pixel test pattern of IMAGE_SIZE bytes.
+        """
+        self._check_link()
+        if sensorbuffer == "image":
+            self.sim.delay('upload_image')
+            self.wire(IMAGE_SIZE)
+            return list(test_image())
+        if sensorbuffer != "char":
+            raise RuntimeError("Unknown sensor buffer type")
+        self.sim.delay('upload_char')
+        label = (self.buffers[slot] or '').encode()
+        data = list(bytes([len(label)]) + label + bytes(TEMPLATE_SIZE - 1 - len(label)))
+        self.wire(len(data))
+        return data
+
+    def send_fpdata(self, data, sensorbuffer="char", slot=1):
+        self._check_link()
+        if sensorbuffer != "char":
+            raise RuntimeError("Simulator only transfers character files")
+        self.sim.delay('download_char')
+        self.wire(len(data))
+        self.buffers[slot] = bytes(data[1:1 + data[0]]).decode()
+        return True
+
+    def read_templates(self):
+        self.sim.delay('read_templates')
+        self.templates = sorted(self.library)
+        return adafruit_fingerprint.OK
+
+    def count_templates(self):
+        self.sim.delay('count_templates')
+        self.template_count = len(self.library)
+        return adafruit_fingerprint.OK
+
+
+class SimulatedTag:
+    def __init__(self, uid, tapped_at=None):
+        self.identifier = bytes.fromhex(uid)
+        self.tapped_at = tapped_at  # Scripted monotonic time of the tap, for latency measurements
+
+    def __str__(self):
+        return f"Type2Tag ID={self.identifier.hex().upper()}"
+
+
+class SimulatedNFC:
+    """Stands in for nfc.ContactlessFrontend: connect() blocks until the next scripted tap."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.closed = threading.Event()
+
+    def connect(self, rdwr=None, terminate=None, **options):
+        while not self.closed.is_set():
+            if terminate is not None and terminate():
+                return None
+            tap = self.sim.next_tag(timeout=0.1)
+            if tap is None:
+                continue
+            self.sim.delay('nfc_read')
+            tag = SimulatedTag(tap[1], tapped_at=tap[0])
+            on_connect = (rdwr or {}).get('on-connect')
+            if on_connect is not None:
+                on_connect(tag)
+            return tag
+        return None
+
+    def close(self):
+        self.closed.set()
+
+
+class SimulatedGPIO:
+    """The subset of RPi.GPIO the kiosk uses. Outputs are logged with timestamps."""
+    BCM, BOARD = 11, 10
+    IN, OUT = 1, 0
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.levels = {}
+        self.log = []  # (monotonic time, pin, level)
+        self.callbacks = {}
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        if direction == self.OUT:
+            self.levels[pin] = initial or self.LOW
+
+    def output(self, pin, level):
+        self.levels[pin] = level
+        self.log.append((time.monotonic(), pin, level))
+
+    def input(self, pin):
+        if pin in self.callbacks:  # A touch line: high while a finger is on the glass
+            return self.HIGH if self.sim.finger_on_glass() is not None else self.LOW
+        return self.levels.get(pin, self.LOW)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def fire_touch(self):
+        for pin, callback in list(self.callbacks.items()):
+            if callback is not None:
+                callback(pin)
+
+    def cleanup(self, *pins):
+        self.levels.clear()
+        self.callbacks.clear()
+
+
+class HardwareSimulator:
+    """Replays a scripted session of finger touches and card taps in real time.
+
+    `script` is {"enrolled": {slot: finger}, "events": [...]}, where each
+    event is {"at": seconds, "finger": label, "hold": seconds} or
+    {"at": seconds, "tag": "hex uid"}, relative to start(). `timings`
+    maps each sensor command to a delay in seconds or a list of recorded
+    samples, which are replayed in order and then repeated.
+    """
+
+    def __init__(self, script=None, timings=None):
+        script = script or {}
+        self.events = sorted(script.get('events', []), key=lambda event: event['at'])
+        self.timings = {}
+        for command, value in {**DEFAULT_TIMINGS, **(timings or {})}.items():
+            self.timings[command] = cycle(value) if isinstance(value, list) else cycle([value])
+        self.started_at = None
+        self.touches = []  # (start, end, label), absolute monotonic times
+        self.tags = []  # (at, uid)
+        self.fingerprint = SimulatedFingerprint(self, script.get('enrolled'))
+        self.nfc = SimulatedNFC(self)
+        self.gpio = SimulatedGPIO(self)
+
+    def delay(self, command, times=1):
+        time.sleep(next(self.timings[command]) * times)
+
+    def start(self):
+        """Anchor the script to now and arm touch-line callbacks for every finger event."""
+        self.started_at = time.monotonic()
+        for event in self.events:
+            at = self.started_at + event['at']
+            if 'finger' in event:
+                self.touches.append((at, at + event.get('hold', 1.0), event['finger']))
+                timer = threading.Timer(event['at'], self.gpio.fire_touch)
+                timer.daemon = True
+                timer.start()
+            elif 'tag' in event:
+                self.tags.append((at, event['tag']))
+        return self
+
+    def finger_on_glass(self):
+        touch = self.current_touch()
+        return touch[2] if touch else None
+
+    def current_touch(self):
+        """The (start, end, label) touch in progress, or None."""
+        now = time.monotonic()
+        for touch in self.touches:
+            if touch[0] <= now < touch[1]:
+                return touch
+        return None
+
+    def next_tag(self, timeout=None):
+        """Wait for the next tap that is due and consume it. Returns (at, uid) or None."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            now = time.monotonic()
+            if self.tags and self.tags[0][0] <= now:
+                return self.tags.pop(0)
+            wake = self.tags[0][0] if self.tags else float('inf')
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                wake = min(wake, deadline)
+            time.sleep(max(0.0, min(wake - now, 0.05)))
@@ -0,0 +1,73 @@
+import os
+
+import adafruit_fingerprint
+
+# "fast" asks the sensor for its high-speed search and falls back to the
+# full search on NOTFOUND; "full" always runs the full library search.
+SEARCH_MODE = os.environ.get('PROLOCK_SEARCH_MODE', 'fast')
+SEARCH_FALLBACK = True  # Retry a fast-search miss with the full search
+MIN_CONFIDENCE = 50  # Matches scoring below this are treated as NOTFOUND
+
+FAST, FULL = 'fast', 'full'
+LOWCONFIDENCE = 0x100  # Not a sensor code: a match that failed the confidence gate
+
+_SEARCH_OPCODES = {FAST: 0x1B, FULL: 0x04}  # HISPEEDSEARCH, FINGERPRINTSEARCH
+_SEARCH_METHODS = {FAST: 'finger_fast_search', FULL: 'finger_search'}
+
+
+class Identifier:
+    """One-to-many fingerprint identification against the sensor's library.
+
+    Searches the template in char buffer 1. adafruit_fingerprint's
+    finger_search() and finger_fast_search() each re-read the system
+    parameters first, so every search costs two round trips; the library
+    size is read once here and the search packet sent directly, making a
+    search one round trip. In FAST mode a NOTFOUND is retried with the full
+    search when `fallback` is set, since the high-speed search can miss
+    poor-quality images the full search still finds. A match whose
+    finger.confidence is below `min_confidence` returns LOWCONFIDENCE.
+    """
+
+    def __init__(self, finger, mode=SEARCH_MODE, fallback=SEARCH_FALLBACK, min_confidence=MIN_CONFIDENCE):
+        if mode not in _SEARCH_OPCODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.finger = finger
+        self.mode = mode
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.library_size = None
+        self.last_mode = None  # Search that produced the last result, for tracing and benchmarks
+
+    def _library_size(self):
+        if self.library_size is None:
+            if self.finger.read_sysparam() != adafruit_fingerprint.OK:
+                raise RuntimeError("Failed to read sensor parameters")
+            self.library_size = self.finger.library_size
+        return self.library_size
+
+    def invalidate(self):
+        """Re-read the library size before the next search (e.g. after changing sensors)."""
+        self.library_size = None
+
+    def search(self, mode):
+        """One search of the whole library; sets finger.finger_id and finger.confidence like the library does."""
+        self.last_mode = mode
+        if not hasattr(self.finger, '_send_packet'):
+            return getattr(self.finger, _SEARCH_METHODS[mode])()
+        capacity = self._library_size()
+        self.finger._send_packet([_SEARCH_OPCODES[mode], 0x01, 0x00, 0x00, capacity >> 8, capacity & 0xFF])
+        r = self.finger._get_packet(16)
+        self.finger.finger_id = (r[1] << 8) | r[2]
+        self.finger.confidence = (r[3] << 8) | r[4]
+        return r[0]
+
+    def identify(self):
+        """Search for the templated finger. Returns OK, NOTFOUND, LOWCONFIDENCE or another sensor code."""
+        result = self.search(self.mode)
+        if result == adafruit_fingerprint.NOTFOUND and self.mode == FAST and self.fallback:
+            result = self.search(FULL)
+        if result == adafruit_fingerprint.OK and self.finger.confidence < self.min_confidence:
+            print(f"Match #{self.finger.finger_id} rejected: confidence {self.finger.confidence} "
+                  f"< {self.min_confidence}")
+            return LOWCONFIDENCE
+        return result
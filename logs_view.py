@@ -0,0 +1,101 @@
+LOG_FIELDS = ('date', 'user_name', 'seat_id', 'user_number', 'year', 'block_name',
+              'assigned_instructor', 'time_in', 'time_out')
+ROW_CAP = 200  # Rows kept in the Treeview at once; older logs are reached by paging
+
+
+def log_key(log):
+    """Stable row ID for a log: its server ID, else who/when it was recorded."""
+    if log.get('id') is not None:
+        return f"log-{log['id']}"
+    return "log-" + "|".join(str(log.get(field, '')) for field in ('UID', 'user_number', 'date', 'time_in'))
+
+
+class LogTableModel:
+    """Keyed model behind the recent-logs Treeview.
+
+    set_logs() keeps the full response, but only one page of `row_cap` rows
+    is ever inserted into the widget. Each render diffs the page against the
+    rows already shown (by log ID) and issues only the insert, item, move and
+    delete calls needed, instead of clearing and re-inserting every row.
+    """
+
+    def __init__(self, tree, row_cap=ROW_CAP, fields=LOG_FIELDS):
+        self.tree = tree
+        self.row_cap = row_cap
+        self.fields = fields
+        self.logs = []  # Latest first
+        self.page = 0
+        self.rendered = {}  # iid -> values currently in the Treeview
+        self.order = []  # iids in display order
+        self.listeners = []  # Called after every render, e.g. to update a page label
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def set_logs(self, logs):
+        """Replace the data with a /recent-logs response (oldest first) and re-render."""
+        self.logs = list(reversed(logs))
+        self.page = min(self.page, self.page_count() - 1)
+        return self.render()
+
+    def page_count(self):
+        return max(1, -(-len(self.logs) // self.row_cap))
+
+    def next_page(self):
+        if self.page + 1 < self.page_count():
+            self.page += 1
+            self.render()
+
+    def prev_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self.render()
+
+    def _desired_rows(self):
+        start = self.page * self.row_cap
+        rows = []
+        seen = {}
+        for log in self.logs[start:start + self.row_cap]:
+            key = log_key(log)
+            # Two logs without IDs can share a key; keep both rows
+            if key in seen:
+                seen[key] += 1
+                key = f"{key}#{seen[key]}"
+            else:
+                seen[key] = 0
+            rows.append((key, tuple(log.get(field, 'N/A') for field in self.fields)))
+        return rows
+
+    def render(self):
+        """Bring the Treeview in line with the current page. Returns (inserted, updated, moved, removed)."""
+        desired = self._desired_rows()
+        desired_keys = {key for key, _ in desired}
+
+        removed = [iid for iid in self.order if iid not in desired_keys]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self.rendered[iid]
+        live = [iid for iid in self.order if iid in desired_keys]
+
+        inserted = updated = moved = 0
+        for index, (key, values) in enumerate(desired):
+            if key not in self.rendered:
+                self.tree.insert("", index, iid=key, values=values)
+                live.insert(index, key)
+                inserted += 1
+            else:
+                if self.rendered[key] != values:
+                    self.tree.item(key, values=values)
+                    updated += 1
+                if live[index] != key:
+                    self.tree.move(key, "", index)
+                    live.remove(key)
+                    live.insert(index, key)
+                    moved += 1
+            self.rendered[key] = values
+
+        self.order = live
+        for callback in self.listeners:
+            callback(self.page, self.page_count())
+        return inserted, updated, moved, len(removed)
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+
+TAP_DEBOUNCE = 3.0  # Seconds a card must be away from the reader before it counts as a new tap
+REPEAT_READ_DELAY = 0.2  # Pause after a suppressed read so a lingering card does not spin the loop
+MAX_TRACKED_UIDS = 256
+TAP_WORKERS = 3  # Taps recorded concurrently
+TAP_QUEUE_SIZE = 64  # Taps waiting for a worker before the reader is held back
+TAP_PUT_TIMEOUT = 5.0  # Seconds the reader waits for room before refusing a tap
+READ_ERROR_DELAY = 1.0  # Back-off after the frontend raises
+
+
+class TapDebouncer:
+    """Turns the reader's stream of reads into taps, per card UID.
+
+    connect() returns the same card over and over while it rests on the
+    reader. A read only counts as a tap if that UID has not been seen for
+    `window` seconds, and every read of a lingering card restarts its window.
+    Other UIDs are tracked separately, so a card left on the reader never
+    delays someone else's tap.
+    """
+
+    def __init__(self, window=TAP_DEBOUNCE, max_tracked=MAX_TRACKED_UIDS):
+        self.window = window
+        self.max_tracked = max_tracked
+        self.last_seen = {}  # UID -> monotonic time of its latest read
+
+    def accept(self, uid, now=None):
+        """Record a read of `uid`; True if it is a new tap."""
+        now = time.monotonic() if now is None else now
+        last = self.last_seen.get(uid)
+        self.last_seen[uid] = now
+        if len(self.last_seen) > self.max_tracked:
+            self._prune(now)
+        return last is None or now - last >= self.window
+
+    def _prune(self, now):
+        for uid, seen in list(self.last_seen.items()):
+            if now - seen >= self.window:
+                del self.last_seen[uid]
+
+
+class NFCReader:
+    """Producer side of the NFC pipeline: reads cards and emits taps.
+
+    The reader thread only talks to the frontend. Each new tap goes to the
+    listeners as (uid, timestamp), with timestamp taken from time.time() at
+    the read. Listeners should only queue the tap (e.g. TapProcessor.submit),
+    so the next card can be read while earlier taps are still being
+    recorded; a full queue holds the reader back until there is room.
+    Repeat reads of the same card within `suppression_window` are dropped.
+    """
+
+    def __init__(self, clf, suppression_window=TAP_DEBOUNCE):
+        self.clf = clf
+        self.debouncer = TapDebouncer(suppression_window)
+        self.listeners = []  # Called with (uid, timestamp) for every new tap
+        self.running = False
+        self.thread = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        if self.clf is None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def join(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join()
+
+    def _read_loop(self):
+        while self.running:
+            try:
+                tag = self.clf.connect(rdwr={'on-connect': lambda tag: False},
+                                       terminate=lambda: not self.running)
+            except Exception as e:
+                print(f"NFC read error: {e}")
+                time.sleep(READ_ERROR_DELAY)
+                continue
+            if not tag:
+                continue
+            uid = tag.identifier.hex()
+            timestamp = time.time()
+            if not self.debouncer.accept(uid):
+                time.sleep(REPEAT_READ_DELAY)
+                continue
+            for callback in self.listeners:
+                callback(uid, timestamp)
+
+
+class TapProcessor:
+    """Consumer side: a bounded tap queue drained by a small worker pool.
+
+    Taps for different cards are recorded in parallel; taps for the same
+    card are handed out one at a time in arrival order, so a student's
+    time-in is always recorded before their time-out. When `max_pending`
+    taps are already waiting, submit() blocks the reader for up to
+    `put_timeout` and then refuses the tap (returns False) instead of
+    queueing without limit. Depth listeners are called with the number of
+    waiting taps whenever it changes.
+    """
+
+    def __init__(self, handler, workers=TAP_WORKERS, max_pending=TAP_QUEUE_SIZE, put_timeout=TAP_PUT_TIMEOUT):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.pending = deque()  # (uid, timestamp), oldest first
+        self.active = set()  # UIDs a worker is recording right now
+        self.cond = threading.Condition()
+        self.listeners = []  # Called with the queue depth after every change
+        self.running = True
+        self.workers = [threading.Thread(target=self._work_loop, daemon=True, name=f"tap-{i}")
+                        for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def depth(self):
+        return len(self.pending)
+
+    def _notify_depth(self, depth):
+        for callback in self.listeners:
+            callback(depth)
+
+    def submit(self, uid, timestamp):
+        """Queue a tap. Returns False if the queue stayed full for `put_timeout` seconds."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: len(self.pending) < self.max_pending or not self.running,
+                                      timeout=self.put_timeout) or not self.running:
+                print(f"Tap queue full; dropped tap from {uid}.")
+                return False
+            self.pending.append((uid, timestamp))
+            depth = len(self.pending)
+            self.cond.notify_all()
+        self._notify_depth(depth)
+        return True
+
+    def _next_tap(self):
+        """The oldest waiting tap whose card is not already being recorded (caller holds cond)."""
+        for index, (uid, timestamp) in enumerate(self.pending):
+            if uid not in self.active:
+                del self.pending[index]
+                self.active.add(uid)
+                return uid, timestamp
+        return None
+
+    def _work_loop(self):
+        while True:
+            with self.cond:
+                tap = None
+                while self.running and tap is None:
+                    tap = self._next_tap()
+                    if tap is None:
+                        self.cond.wait()
+                if tap is None:
+                    return
+                depth = len(self.pending)
+                self.cond.notify_all()  # Room for the reader
+            self._notify_depth(depth)
+
+            uid, timestamp = tap
+            try:
+                self.handler(uid, timestamp)
+            except Exception as e:
+                print(f"Tap {uid} failed: {e}")
+            finally:
+                with self.cond:
+                    self.active.discard(uid)
+                    self.cond.notify_all()  # Later taps of this card may now run
+
+    def join(self, timeout=None):
+        """Wait until every queued tap has been recorded. Returns False on timeout."""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.active, timeout=timeout)
+
+    def shutdown(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
@@ -0,0 +1,200 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from tracing import span
+
+API_URL = 'https://prolocklogger.pro/api'
+
+# API URLs for Fingerprint, NFC, and Current Date-Time
+FINGERPRINT_API_URL = f'{API_URL}/getuserbyfingerprint/'
+TIME_IN_FINGERPRINT_URL = f'{API_URL}/logs/time-in/fingerprint'
+TIME_OUT_FINGERPRINT_URL = f'{API_URL}/logs/time-out/fingerprint'
+RECENT_LOGS_FINGERPRINT_URL2 = f'{API_URL}/recent-logs/by-fingerid'
+LAB_SCHEDULE_FINGERPRINT_URL = f'{API_URL}/lab-schedules/fingerprint/'
+
+USER_INFO_URL = f'{API_URL}/user-information/by-id-card'
+RECENT_LOGS_URL = f'{API_URL}/recent-logs'
+TIME_IN_URL = f'{API_URL}/logs/time-in'
+TIME_OUT_URL = f'{API_URL}/logs/time-out'
+RECENT_LOGS_URL2 = f'{API_URL}/recent-logs/by-uid'
+CURRENT_DATE_TIME_URL = f'{API_URL}/current-date-time'
+LAB_SCHEDULE_URL = f'{API_URL}/student/lab-schedule/rfid/'
+LOGS_URL = f'{API_URL}/logs'
+DOOR_STATUS_URL = f'{API_URL}/door/log-status'
+
+# Laravel API endpoint URLs
+FACULTIES_URL = f'{API_URL}/users/role/2'
+ENROLL_URL = f'{API_URL}/users/update-fingerprint'
+ADMIN_URL = f'{API_URL}/admin/role/1'
+
+# Connection pool sizing: the fingerprint thread, the NFC thread and the Tk
+# thread can each have a request in flight at the same time.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+REQUEST_TIMEOUT = 10  # seconds
+
+
+def route_name(path):
+    """Path without its ID segments, so spans for different users group together."""
+    return '/'.join(segment for segment in path.strip('/').split('/')
+                    if segment and not any(c.isdigit() for c in segment))
+
+
+def dated(params, log_date):
+    """Add the day an event happened, so a write replayed after midnight lands on that day."""
+    if log_date is not None:
+        params['date'] = log_date
+    return params
+
+
+def idempotency_headers(idempotency_key):
+    """Header that lets the server drop a write it has already applied."""
+    if idempotency_key is None:
+        return None
+    return {'Idempotency-Key': idempotency_key}
+
+
+class ProLockAPI:
+    """Keep-alive client for the prolocklogger.pro API.
+
+    Every request goes through one requests.Session, so the TCP and TLS
+    handshake is paid once per pooled connection instead of once per call.
+    Reads return the decoded JSON body; writes (PUT/POST) return the
+    response unparsed, since any 2xx means the server applied them. All
+    methods raise requests.RequestException (including HTTPError from
+    raise_for_status) on failure, so callers keep their existing except
+    blocks.
+    """
+
+    def __init__(self, base_url=API_URL, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'Connection': 'keep-alive'})
+
+    def url(self, path):
+        return f'{self.base_url}/{path.lstrip("/")}'
+
+    def request(self, method, path, params=None, headers=None, decode=True):
+        with span(f'api {method} {route_name(path)}'):
+            response = self.session.request(method, self.url(path), params=params, headers=headers,
+                                            timeout=self.timeout)
+            response.raise_for_status()
+            return response.json() if decode else response
+
+    def get(self, path, params=None):
+        return self.request('GET', path, params)
+
+    def get_if_changed(self, path, etag=None, params=None):
+        """GET with If-None-Match. Returns (body, etag); body is None when the server answers 304."""
+        headers = {'If-None-Match': etag} if etag else None
+        with span(f'api GET {route_name(path)}'):
+            response = self.session.get(self.url(path), params=params, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return None, etag
+            response.raise_for_status()
+            return response.json(), response.headers.get('ETag', etag)
+
+    def put(self, path, params=None, idempotency_key=None):
+        return self.request('PUT', path, params, idempotency_headers(idempotency_key), decode=False)
+
+    def post(self, path, params=None, idempotency_key=None):
+        return self.request('POST', path, params, idempotency_headers(idempotency_key), decode=False)
+
+    def close(self):
+        self.session.close()
+
+    # Users
+    def get_user_by_fingerprint(self, fingerprint_id):
+        return self.get(f'getuserbyfingerprint/{fingerprint_id}')
+
+    def get_user_by_id_card(self, uid):
+        return self.get('user-information/by-id-card', {'id_card_id': uid})
+
+    def get_faculties(self):
+        return self.get('users/role/2')
+
+    def get_admins(self):
+        return self.get('admin/role/1')
+
+    def get_faculties_if_changed(self, etag=None):
+        return self.get_if_changed('users/role/2', etag)
+
+    def get_admins_if_changed(self, etag=None):
+        return self.get_if_changed('admin/role/1', etag)
+
+    def update_fingerprint(self, email, fingerprint_id):
+        return self.put('users/update-fingerprint', {'email': email, 'fingerprint_id': fingerprint_id})
+
+    # Clock
+    def get_current_date_time(self):
+        return self.get('current-date-time')
+
+    # Schedules
+    def get_lab_schedule_fingerprint(self, fingerprint_id):
+        return self.get(f'lab-schedules/fingerprint/{fingerprint_id}')
+
+    def get_lab_schedule_rfid(self, rfid_number):
+        return self.get(f'student/lab-schedule/rfid/{rfid_number}')
+
+    # Logs
+    def get_logs(self):
+        return self.get('logs')
+
+    def get_logs_changes(self, since=None, etag=None):
+        """Conditional, incremental /logs fetch.
+
+        Sends `since` (the highest log ID already seen) and If-None-Match.
+        Returns (logs, etag); logs is None when the server answers 304.
+        """
+        params = {'since': since} if since is not None else None
+        data, etag = self.get_if_changed('logs', etag, params)
+        return (None if data is None else data.get('logs', [])), etag
+
+    def get_recent_logs(self):
+        return self.get('recent-logs')
+
+    def get_recent_logs_by_fingerprint(self, fingerprint_id):
+        return self.get('recent-logs/by-fingerid', {'fingerprint_id': fingerprint_id})
+
+    def get_recent_logs_by_uid(self, rfid_number):
+        return self.get('recent-logs/by-uid', {'rfid_number': rfid_number})
+
+    def time_in_fingerprint(self, fingerprint_id, time_in, user_name, role_id="2", log_date=None,
+                            idempotency_key=None):
+        return self.put('logs/time-in/fingerprint', dated({
+            'fingerprint_id': fingerprint_id,
+            'time_in': time_in,
+            'user_name': user_name,
+            'role_id': role_id,
+        }, log_date), idempotency_key)
+
+    def time_out_fingerprint(self, fingerprint_id, time_out, log_date=None, idempotency_key=None):
+        return self.put('logs/time-out/fingerprint',
+                        dated({'fingerprint_id': fingerprint_id, 'time_out': time_out}, log_date), idempotency_key)
+
+    def time_in(self, rfid_number, time_in, year, user_name, role_id=3, log_date=None, idempotency_key=None):
+        return self.put('logs/time-in', dated({
+            'rfid_number': rfid_number,
+            'time_in': time_in,
+            'year': year,
+            'user_name': user_name,
+            'role_id': role_id,
+        }, log_date), idempotency_key)
+
+    def time_out(self, rfid_number, time_out, log_date=None, idempotency_key=None):
+        return self.put('logs/time-out', dated({'rfid_number': rfid_number, 'time_out': time_out}, log_date),
+                        idempotency_key)
+
+    # Door
+    def update_door_status(self, fingerprint_id, status, log_date=None, idempotency_key=None):
+        return self.post('door/log-status', dated({'fingerprint_id': fingerprint_id, 'status': status}, log_date),
+                         idempotency_key)
+
+
+# Shared client imported by every kiosk script
+api = ProLockAPI()
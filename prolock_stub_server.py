@@ -0,0 +1,178 @@
+"""Local stand-in for the prolocklogger.pro API, used by the benchmarks.
+
+Run directly to serve on http://127.0.0.1:8000/api:
+    python prolock_stub_server.py --port 8000 --connect-delay 40
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def default_routes():
+    """Canned JSON bodies keyed by API path (without the /api prefix)."""
+    now = datetime.now()
+    schedule = [{
+        'day_of_the_week': now.strftime('%A'),
+        'class_start': '00:00',
+        'class_end': '23:59',
+        'is_makeup_class': 0,
+        'specific_date': None,
+    }]
+    return {
+        'current-date-time': {
+            'day_of_week': now.strftime('%A'),
+            'current_time': now.strftime('%H:%M'),
+            'date': now.strftime('%d'),
+            'month': now.strftime('%m'),
+            'year': now.strftime('%Y'),
+        },
+        'getuserbyfingerprint/': {'name': 'Stub Faculty'},
+        'user-information/by-id-card': {'user_number': '2021-0001', 'user_name': 'Stub Student',
+                                        'year': '3', 'block': 'A'},
+        'lab-schedules/fingerprint/': schedule,
+        'student/lab-schedule/rfid/': schedule,
+        'recent-logs/by-fingerid': [],
+        'recent-logs/by-uid': [],
+        'recent-logs': [],
+        'logs/time-in/fingerprint': {'message': 'ok'},
+        'logs/time-out/fingerprint': {'message': 'ok'},
+        'logs/time-in': {'message': 'ok'},
+        'logs/time-out': {'message': 'ok'},
+        'logs': {'logs': []},
+        'door/log-status': {'log': {}},
+        'users/role/2': [],
+        'admin/role/1': [],
+        'users/update-fingerprint': {'message': 'ok'},
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Allow keep-alive so pooled clients can reuse sockets
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024  # Send headers and body in one segment
+
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path.startswith('/api/'):
+            path = path[len('/api/'):]
+        routes = self.server.routes
+        if path in routes:
+            return routes[path], parse_qs(parsed.query)
+        # Prefix routes such as 'getuserbyfingerprint/<id>'
+        for key in sorted(routes, key=len, reverse=True):
+            if key.endswith('/') and path.startswith(key):
+                return routes[key], parse_qs(parsed.query)
+        return None, None
+
+    def _reply(self):
+        self.server.request_count += 1
+        if self.server.response_delay:
+            time.sleep(self.server.response_delay)
+        body, query = self._route()
+        status, headers = 200, {}
+        if callable(body):
+            # Dynamic routes return a body, or (status, body, headers)
+            body = body(self, query)
+            if isinstance(body, tuple):
+                status, body, headers = body
+        if body is None and status == 200:
+            status, body = 404, {'message': 'Not Found'}
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _reply
+    do_PUT = _reply
+    do_POST = _reply
+
+
+class LogFeed:
+    """Dynamic /logs route that supports ETag/If-None-Match and a since= cursor."""
+
+    def __init__(self, logs=None):
+        self.logs = list(logs or [])
+        self.lock = threading.Lock()
+        self.bytes_sent = 0
+
+    def append(self, **fields):
+        with self.lock:
+            fields.setdefault('id', len(self.logs) + 1)
+            self.logs.append(fields)
+            return fields['id']
+
+    def __call__(self, handler, query):
+        with self.lock:
+            etag = f'"logs-{len(self.logs)}"'
+            if handler.headers.get('If-None-Match') == etag:
+                return 304, None, {'ETag': etag}
+            since = query.get('since', [None])[0]
+            logs = self.logs
+            if since is not None:
+                logs = [log for log in logs if log['id'] > int(since)]
+            body = {'logs': logs}
+            self.bytes_sent += len(json.dumps(body))
+            return 200, body, {'ETag': etag}
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server that can simulate per-connection handshake cost."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, routes=None, connect_delay=0.0, response_delay=0.0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.routes = routes if routes is not None else default_routes()
+        self.connect_delay = connect_delay
+        self.response_delay = response_delay
+        self.connection_count = 0
+        self.request_count = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/api'
+
+    def process_request(self, request, client_address):
+        # Each new TCP connection pays the simulated TCP+TLS handshake once
+        self.connection_count += 1
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        super().process_request(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a local stub of the ProLock API.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--connect-delay', type=float, default=0.0, help="Simulated handshake cost in ms")
+    parser.add_argument('--response-delay', type=float, default=0.0, help="Simulated server time in ms")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, connect_delay=args.connect_delay / 1000.0,
+                        response_delay=args.response_delay / 1000.0)
+    print(f"Stub API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,39 +1,29 @@
 
 import threading
 import time
-import serial
 import adafruit_fingerprint
-import nfc
 import tkinter as tk
 from tkinter import ttk, font, messagebox
-import RPi.GPIO as GPIO
+from hardware import load_gpio, open_fingerprint, open_nfc  # Real devices or the simulator (PROLOCK_HARDWARE)
 import requests
 from datetime import datetime, timedelta
-
-# API URLs for Fingerprint, NFC, and Current Date-Time
-FINGERPRINT_API_URL = "https://prolocklogger.pro/api/getuserbyfingerprint/"
-TIME_IN_FINGERPRINT_URL = "https://prolocklogger.pro/api/logs/time-in/fingerprint"
-TIME_OUT_FINGERPRINT_URL = "https://prolocklogger.pro/api/logs/time-out/fingerprint"
-RECENT_LOGS_FINGERPRINT_URL2 = 'https://prolocklogger.pro/api/recent-logs/by-fingerid'
-LAB_SCHEDULE_FINGERPRINT_URL = 'https://prolocklogger.pro/api/lab-schedules/fingerprint/'
-
-USER_INFO_URL = 'https://prolocklogger.pro/api/user-information/by-id-card'
-RECENT_LOGS_URL = 'https://prolocklogger.pro/api/recent-logs'
-TIME_IN_URL = 'https://prolocklogger.pro/api/logs/time-in'
-TIME_OUT_URL = 'https://prolocklogger.pro/api/logs/time-out'
-RECENT_LOGS_URL2 = 'https://prolocklogger.pro/api/recent-logs/by-uid'
-CURRENT_DATE_TIME_URL = 'https://prolocklogger.pro/api/current-date-time'
-LAB_SCHEDULE_URL = 'https://prolocklogger.pro/api/student/lab-schedule/rfid/'
+from prolock_api import api  # Shared keep-alive client for prolocklogger.pro
+from sensor_driver import FingerDetector
+from closeout import BulkTimeOut
 
 # GPIO pin configuration for the solenoid lock and buzzer
 SOLENOID_PIN = 17
 BUZZER_PIN = 27
+TOUCH_PIN = None  # BCM pin wired to the sensor's touch-sense output; None polls get_image() instead
 
 # Setup GPIO
+GPIO = load_gpio()
 GPIO.setmode(GPIO.BCM)
 GPIO.setup(SOLENOID_PIN, GPIO.OUT)
 GPIO.setup(BUZZER_PIN, GPIO.OUT)
 
+finger_detector = FingerDetector(TOUCH_PIN, GPIO)
+
 
 class AttendanceApp:
     def __init__(self, root):
@@ -79,9 +69,12 @@ class AttendanceApp:
         # Fetch and display recent logs
         self.fetch_recent_logs()
 
+        # Closes open student logs concurrently in the background when the instructor times out
+        self.closeout = BulkTimeOut(api)
+
         # Initialize NFC reader
         try:
-            self.clf = nfc.ContactlessFrontend('usb')
+            self.clf = open_nfc()
         except Exception as e:
             messagebox.showerror("NFC Error", f"Failed to initialize NFC reader: {e}")
             self.clf = None
@@ -122,9 +115,8 @@ class AttendanceApp:
 
     def initialize_serial(self):
         try:
-            uart = serial.Serial("/dev/ttyUSB0", baudrate=57600, timeout=1)
-            return adafruit_fingerprint.Adafruit_Fingerprint(uart)
-        except serial.SerialException as e:
+            return open_fingerprint()
+        except OSError as e:  # serial.SerialException
             messagebox.showerror("Serial Error", f"Failed to connect to serial port: {e}")
             return None
 
@@ -138,9 +130,7 @@ class AttendanceApp:
 
     def get_user_details(self, fingerprint_id):
         try:
-            response = requests.get(f"{FINGERPRINT_API_URL}{fingerprint_id}")
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_user_by_fingerprint(fingerprint_id)
             return data.get('name', None)
         except requests.RequestException as e:
             messagebox.showerror("API Error", f"Failed to fetch data from API: {e}")
@@ -149,9 +139,7 @@ class AttendanceApp:
     def fetch_current_date_time(self):
         """Fetches the current date and time from the API."""
         try:
-            response = requests.get(CURRENT_DATE_TIME_URL)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_current_date_time()
             if 'day_of_week' in data and 'current_time' in data:
                 return data
             else:
@@ -178,9 +166,7 @@ class AttendanceApp:
 
             print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
 
-            response = requests.get(f"{LAB_SCHEDULE_FINGERPRINT_URL}{fingerprint_id}")
-            response.raise_for_status()
-            schedules = response.json()
+            schedules = api.get_lab_schedule_fingerprint(fingerprint_id)
 
             for schedule in schedules:
                 schedule_day = schedule.get('day_of_the_week')
@@ -219,9 +205,7 @@ class AttendanceApp:
             print(f"Current Day from API: {current_day}, Current Time from API: {current_time}")
 
             # Fetch the schedule for the RFID number
-            response = requests.get(f"{LAB_SCHEDULE_URL}{rfid_number}")
-            response.raise_for_status()
-            schedules = response.json()
+            schedules = api.get_lab_schedule_rfid(rfid_number)
 
             # Check if the current time falls within any of the allowed schedules
             for schedule in schedules:
@@ -244,10 +228,7 @@ class AttendanceApp:
 
     def check_time_in_record_fingerprint(self, fingerprint_id):
         try:
-            url = f"{RECENT_LOGS_FINGERPRINT_URL2}?fingerprint_id={fingerprint_id}"
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs_by_fingerprint(fingerprint_id)
             return any(log.get('time_in') and not log.get('time_out') for log in logs)
         except requests.RequestException as e:
             print(f"Error checking Time-In record: {e}")
@@ -258,9 +239,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_IN_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_in={current_time_data['current_time']}&user_name={user_name}&role_id={role_id}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_in_fingerprint(fingerprint_id, current_time_data['current_time'], user_name, role_id)
             print("Time-In recorded successfully.")
             messagebox.showinfo("Success", "Time-In recorded successfully.")
         except requests.RequestException as e:
@@ -271,9 +250,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_OUT_FINGERPRINT_URL}?fingerprint_id={fingerprint_id}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_out_fingerprint(fingerprint_id, current_time_data['current_time'])
             print("Time-Out recorded successfully.")
         except requests.RequestException as e:
             print(f"Error recording Time-Out: {e}")
@@ -286,10 +263,8 @@ class AttendanceApp:
                 return
 
             print("Waiting for fingerprint image...")
-            while self.finger.get_image() != adafruit_fingerprint.OK:
-                if not self.running:
-                    return
-                time.sleep(0.5)
+            if not finger_detector.wait_for_image(self.finger, should_continue=lambda: self.running):
+                return
 
             print("Templating...")
             if self.finger.image_2_tz(1) != adafruit_fingerprint.OK:
@@ -362,27 +337,11 @@ class AttendanceApp:
             time.sleep(0.1)
 
     def record_all_time_out(self):
-        """Record a default time-out of '11:11' for all users with time-in but no time-out."""
-        try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
-
-            # Loop through logs and find entries with time-in but no time-out
-            for log in logs:
-                uid = log.get('UID')  # Use the correct key 'UID' from the JSON response
-                if log.get('time_in') and not log.get('time_out') and uid:
-                    default_time_out = "00:00"
-                    url = f"{TIME_OUT_URL}?rfid_number={uid}&time_out={default_time_out}"
-                    response = requests.put(url)
-                    response.raise_for_status()
-                    print(f"Time-Out recorded for UID {uid} at {default_time_out}.")
+        """Record a default time-out of '00:00' for all users with time-in but no time-out.
 
-            # Refresh the logs table after updating time-out records
-            self.refresh_logs_table()
-
-        except requests.RequestException as e:
-            print(f"Error updating default time-out records: {e}")
+        Runs in the background; the door is already locked when this returns.
+        """
+        self.closeout.run_async(on_done=lambda closed, failed, attempts: self.refresh_logs_table())
 
     def refresh_logs_table(self):
         """Refresh the logs table to display the latest entries, including updates."""
@@ -391,9 +350,7 @@ class AttendanceApp:
     def fetch_recent_logs(self):
         """Fetches and updates the logs table with the most recent logs."""
         try:
-            response = requests.get(RECENT_LOGS_URL)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs()
             # Clear existing table entries
             for i in self.logs_tree.get_children():
                 self.logs_tree.delete(i)
@@ -427,10 +384,7 @@ class AttendanceApp:
 
     def fetch_user_info(self, uid):
         try:
-            url = f'{USER_INFO_URL}?id_card_id={uid}'
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = api.get_user_by_id_card(uid)
 
             self.student_number_entry.delete(0, tk.END)
             self.student_number_entry.insert(0, data.get('user_number', 'None'))
@@ -467,7 +421,7 @@ class AttendanceApp:
                 self.last_time_in[uid] = current_time  # Update the last time-in time
 
         except requests.HTTPError as http_err:
-            if response.status_code == 404:
+            if http_err.response is not None and http_err.response.status_code == 404:
                 self.clear_data()
                 self.update_result("Card is not registered, Please contact the administrator.")
             else:
@@ -477,10 +431,7 @@ class AttendanceApp:
 
     def check_time_in_record(self, rfid_number):
         try:
-            url = f'{RECENT_LOGS_URL2}?rfid_number={rfid_number}'
-            response = requests.get(url)
-            response.raise_for_status()
-            logs = response.json()
+            logs = api.get_recent_logs_by_uid(rfid_number)
             return any(log.get('time_in') and not log.get('time_out') for log in logs)
         except requests.RequestException as e:
             self.update_result(f"Error checking Time-In record: {e}")
@@ -496,9 +447,7 @@ class AttendanceApp:
             current_time_data = self.fetch_current_date_time()
             if not current_time_data:
                 return
-            url = f"{TIME_IN_URL}?rfid_number={rfid_number}&time_in={current_time_data['current_time']}&year={year}&user_name={user_name}&role_id=3"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_in(rfid_number, current_time_data['current_time'], year, user_name)
             print("Time-In recorded successfully.")
             self.update_result("Time-In recorded successfully.")
             self.fetch_recent_logs()
@@ -519,9 +468,7 @@ class AttendanceApp:
                 self.update_result("No Time-In record found for this RFID. Cannot record Time-Out.")
                 return
 
-            url = f"{TIME_OUT_URL}?rfid_number={rfid_number}&time_out={current_time_data['current_time']}"
-            response = requests.put(url)
-            response.raise_for_status()
+            api.time_out(rfid_number, current_time_data['current_time'])
             print("Time-Out recorded successfully.")
             self.update_result("Time-Out recorded successfully.")
             self.fetch_recent_logs()
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import requests
+
+POLL_INTERVAL = 0.5  # seconds between conditional polls of /api/logs
+FULL_POLL_INTERVAL = 10  # seconds between polls when the server ignores since= and If-None-Match
+REAPPLY_INTERVAL = 10  # seconds between re-applying the latest entry, for handlers that want it
+ERROR_BACKOFF = 5  # seconds to wait after a failed poll
+
+
+def log_cursor(log, by_id=True):
+    """Sortable position of a log entry: its numeric ID, or its timestamp when the server sends no IDs.
+
+    None when the entry lacks that field, so IDs and timestamps are never compared.
+    """
+    if by_id:
+        return int(log['id']) if log.get('id') is not None else None
+    return log.get('updated_at') or log.get('created_at')
+
+
+class RemoteCommandPoller:
+    """Watches /api/logs for new entries without re-downloading the history.
+
+    Each poll sends the highest log ID already handled as `since` plus the
+    last ETag as If-None-Match, so an idle server answers 304 with no body and
+    a busy one sends only new rows. Entries are filtered against the cursor on
+    our side as well, in case the server ignores `since`. New entries are
+    passed, oldest first, to `handler(log)`; on the first poll only the latest
+    entry is handled so that history is not replayed on start-up. The first
+    poll also fixes the cursor type: log IDs if the server sends them, else
+    timestamps. A handler error is logged and skips only that entry.
+
+    Polling every `interval` seconds is only cheap if the server honours the
+    cursor. A 200 without an ETag, or one that repeats entries at or below
+    `since`, means it does not, and the poller drops back to
+    `full_interval`, the old full-download cadence. `reapply(log)`, if
+    given, is called with the latest entry every `reapply_interval` seconds
+    even when nothing changed, so a missed or failed GPIO action is
+    corrected.
+    """
+
+    def __init__(self, client, handler, interval=POLL_INTERVAL, full_interval=FULL_POLL_INTERVAL,
+                 reapply=None, reapply_interval=REAPPLY_INTERVAL):
+        self.client = client
+        self.handler = handler
+        self.interval = interval
+        self.full_interval = full_interval
+        self.reapply = reapply
+        self.reapply_interval = reapply_interval
+        self.cursor = None
+        self.by_id = None  # Cursor type, chosen on the first poll that returns entries
+        self.etag = None
+        self.incremental = True  # False once the server is seen to ignore since= or If-None-Match
+        self.latest_log = None  # Newest entry seen, for reapply
+        self.reapplied_at = 0.0
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _poll_loop(self):
+        while self.running:
+            try:
+                self.poll_once()
+                self.reapply_latest()
+                delay = self.interval if self.incremental else self.full_interval
+            except requests.RequestException as e:
+                print(f"Error fetching log status: {e}")
+                delay = ERROR_BACKOFF
+            except Exception as e:  # A malformed payload must not stop remote lock/unlock
+                print(f"Error reading log status: {e}")
+                delay = ERROR_BACKOFF
+            self.wakeup.wait(delay)
+
+    def poll_once(self):
+        """Fetch and handle new log entries. Returns how many were handled."""
+        since = self.cursor if self.by_id else None
+        logs, self.etag = self.client.get_logs_changes(since, self.etag)
+        if logs is not None and self.incremental:
+            self._check_incremental(logs, since)
+        if not logs:
+            return 0
+
+        if self.by_id is None:
+            self.by_id = logs[-1].get('id') is not None
+        positions = [(log_cursor(log, self.by_id), log) for log in logs]
+        positions = [(cursor, log) for cursor, log in positions if cursor is not None]
+        if self.cursor is None:
+            new_logs = logs[-1:]
+        else:
+            new_logs = [log for cursor, log in positions if cursor > self.cursor]
+        if positions:
+            newest_cursor, newest_log = max(positions, key=lambda position: position[0])
+            if self.cursor is None or newest_cursor > self.cursor:
+                self.cursor = newest_cursor
+                self.latest_log = newest_log
+        elif self.latest_log is None:
+            self.latest_log = logs[-1]
+        if not new_logs:
+            return 0
+
+        for log in new_logs:
+            try:
+                self.handler(log)
+            except Exception as e:  # Skip the entry, keep polling
+                print(f"Error applying log entry {log.get('id')}: {e}")
+        self.reapplied_at = time.monotonic()
+        return len(new_logs)
+
+    def _check_incremental(self, logs, since):
+        """Fall back to the full-poll interval if this 200 shows the server ignoring the cursor."""
+        if self.etag is None:
+            reason = "sends no ETag"
+        elif since is not None and any(log_cursor(log) is not None and log_cursor(log) <= since for log in logs):
+            reason = "ignores since="
+        else:
+            return
+        self.incremental = False
+        print(f"Log status: server {reason}; polling every {self.full_interval} s instead of {self.interval} s.")
+
+    def reapply_latest(self):
+        """Hand the latest entry to `reapply` again if `reapply_interval` has passed since it was last applied."""
+        if self.reapply is None or self.latest_log is None:
+            return
+        now = time.monotonic()
+        if now - self.reapplied_at < self.reapply_interval:
+            return
+        self.reapplied_at = now
+        try:
+            self.reapply(self.latest_log)
+        except Exception as e:
+            print(f"Error re-applying log entry {self.latest_log.get('id')}: {e}")
@@ -0,0 +1,61 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+SCAN_DEADLINE = 5.0  # seconds for all lookups of one scan together
+SCAN_WORKERS = 4
+
+
+class ScanPipeline:
+    """Runs the independent lookups of one scan concurrently under a shared deadline.
+
+    Scan-to-unlock time becomes the slowest lookup instead of the sum of all
+    of them. As soon as a result is known to deny access, the lookups that
+    have not started yet are cancelled and the scan stops waiting for the
+    rest; requests already on the wire finish in the background and their
+    results are discarded.
+    """
+
+    def __init__(self, workers=SCAN_WORKERS, deadline=SCAN_DEADLINE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self.deadline = deadline
+
+    def run(self, lookups, denies=None):
+        """Run `lookups` ({name: callable}) concurrently.
+
+        `denies` maps a lookup name to a predicate; when it returns True for
+        that lookup's result the scan is denied immediately. Returns
+        (results, denied_by, timed_out); results holds every lookup that
+        finished in time, and a lookup that raised is stored as None.
+        """
+        denies = denies or {}
+        deadline = time.monotonic() + self.deadline
+        # Each lookup runs in a copy of the caller's context so its API spans join the scan's trace
+        futures = {self.executor.submit(contextvars.copy_context().run, func): name
+                   for name, func in lookups.items()}
+        results = {}
+        denied_by = None
+        pending = set(futures)
+
+        while pending and denied_by is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"Scan lookup {name} failed: {e}")
+                    results[name] = None
+                if name in denies and denies[name](results[name]):
+                    denied_by = name
+
+        for future in pending:
+            future.cancel()
+        timed_out = bool(pending) and denied_by is None
+        return results, denied_by, timed_out
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
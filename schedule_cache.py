@@ -0,0 +1,197 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+import requests
+
+SCHEDULE_TTL = 10 * 60  # Seconds before a cached schedule is re-downloaded
+SCHEDULE_CACHE_SIZE = 512  # Most users a kiosk keeps schedules for at once
+
+FINGERPRINT = 'fingerprint'
+RFID = 'rfid'
+
+
+def to_minutes(value):
+    """Convert "HH:MM" or "HH:MM:SS" to minutes since midnight."""
+    parts = value.split(':')
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def merge_intervals(intervals):
+    """Sort and merge overlapping (start, end) minute intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IntervalList:
+    """Sorted, non-overlapping intervals with a bisect lookup."""
+
+    def __init__(self, intervals):
+        merged = merge_intervals(intervals)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def contains(self, minute):
+        i = bisect_right(self.starts, minute) - 1
+        return i >= 0 and minute < self.ends[i]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class ScheduleIndex:
+    """A user's lab schedule, parsed once for O(log n) access checks.
+
+    Regular classes are grouped by weekday and makeup classes by their
+    specific_date; both become sorted interval lists in minutes since midnight.
+    """
+
+    def __init__(self, schedules):
+        weekly = {}
+        dated = {}
+        weekly_starts = {}
+        dated_starts = {}
+        self.has_makeup_class = False
+
+        for schedule in schedules:
+            start_time = schedule.get('class_start')
+            end_time = schedule.get('class_end')
+            is_makeup_class = schedule.get('is_makeup_class', 0)
+            if is_makeup_class == 1:
+                self.has_makeup_class = True
+            if not start_time or not end_time:
+                continue
+
+            try:
+                interval = (to_minutes(start_time), to_minutes(end_time))
+            except ValueError:
+                print(f"Skipping schedule with invalid time: {start_time}-{end_time}")
+                continue
+
+            schedule_day = schedule.get('day_of_the_week')
+            specific_date = schedule.get('specific_date')
+            if is_makeup_class == 1:
+                if specific_date and specific_date != 'N/A':
+                    try:
+                        schedule_date = datetime.strptime(specific_date, '%Y-%m-%d').date()
+                    except ValueError:
+                        print(f"Skipping schedule with invalid date: {specific_date}")
+                        continue
+                    dated.setdefault(schedule_date, []).append(interval)
+                    dated_starts.setdefault(schedule_date, set()).add(interval[0])
+            elif schedule_day:
+                weekly.setdefault(schedule_day.lower(), []).append(interval)
+                weekly_starts.setdefault(schedule_day.lower(), set()).add(interval[0])
+
+        self.weekly = {day: IntervalList(intervals) for day, intervals in weekly.items()}
+        self.dated = {day: IntervalList(intervals) for day, intervals in dated.items()}
+        self.weekly_starts = weekly_starts
+        self.dated_starts = dated_starts
+
+    def class_starts(self, day_of_week, date):
+        """Minutes since midnight at which a class starts on the given day."""
+        return self.weekly_starts.get(day_of_week.lower(), set()) | self.dated_starts.get(date, set())
+
+    def allows_regular(self, day_of_week, minute):
+        """True if a regular class on `day_of_week` covers `minute`."""
+        intervals = self.weekly.get(day_of_week.lower())
+        return intervals is not None and intervals.contains(minute)
+
+    def allows_makeup(self, date, minute):
+        """True if a makeup class on `date` covers `minute`."""
+        intervals = self.dated.get(date)
+        return intervals is not None and intervals.contains(minute)
+
+    def allows(self, day_of_week, date, minute):
+        return self.allows_regular(day_of_week, minute) or self.allows_makeup(date, minute)
+
+
+class ScheduleCache:
+    """TTL + LRU cache of ScheduleIndex objects keyed by fingerprint ID or RFID UID.
+
+    A miss or an expired entry downloads the schedule through the API client.
+    If that download fails and an expired entry is still held, the stale
+    entry is served rather than denying access because the network blipped.
+    """
+
+    def __init__(self, client, ttl=SCHEDULE_TTL, max_entries=SCHEDULE_CACHE_SIZE):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (kind, key) -> (ScheduleIndex, fetched_at)
+        self.lock = threading.Lock()
+
+    def _download(self, kind, key):
+        if kind == FINGERPRINT:
+            return self.client.get_lab_schedule_fingerprint(key)
+        return self.client.get_lab_schedule_rfid(key)
+
+    def put(self, kind, key, schedules):
+        """Parse and store a schedule list that was fetched elsewhere."""
+        index = ScheduleIndex(schedules)
+        cache_key = (kind, str(key))
+        with self.lock:
+            self.entries[cache_key] = (index, time.monotonic())
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return index
+
+    def peek(self, kind, key):
+        """Return the cached index (fresh or stale) without touching the network."""
+        with self.lock:
+            entry = self.entries.get((kind, str(key)))
+            return entry[0] if entry else None
+
+    def get(self, kind, key):
+        """Return the ScheduleIndex for a user, downloading it if missing or expired."""
+        cache_key = (kind, str(key))
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry is not None:
+                self.entries.move_to_end(cache_key)
+                if time.monotonic() - entry[1] < self.ttl:
+                    return entry[0]
+
+        try:
+            schedules = self._download(kind, key)
+        except requests.RequestException:
+            if entry is not None:
+                print(f"Using cached {kind} schedule for {key}: API unavailable.")
+                return entry[0]
+            raise
+        return self.put(kind, key, schedules)
+
+    def keys(self, kind):
+        """User keys of one kind currently held (fresh or stale)."""
+        with self.lock:
+            return [key for entry_kind, key in self.entries if entry_kind == kind]
+
+    def indexes(self):
+        with self.lock:
+            return [index for index, _ in self.entries.values()]
+
+    def invalidate(self, kind=None, key=None):
+        """Drop one user's schedule, every schedule of one kind, or everything."""
+        with self.lock:
+            if kind is None:
+                self.entries.clear()
+            elif key is None:
+                for cache_key in [k for k in self.entries if k[0] == kind]:
+                    del self.entries[cache_key]
+            else:
+                self.entries.pop((kind, str(key)), None)
+
+    def fingerprint(self, fingerprint_id):
+        return self.get(FINGERPRINT, fingerprint_id)
+
+    def rfid(self, rfid_number):
+        return self.get(RFID, rfid_number)
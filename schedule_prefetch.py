@@ -0,0 +1,137 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+
+from schedule_cache import FINGERPRINT, RFID
+
+PREFETCH_LEAD = 5 * 60  # Refresh this many seconds before a class starts
+PREFETCH_IDLE_INTERVAL = 60 * 60  # Refresh hourly when no class start is coming up today
+PREFETCH_RETRY_INTERVAL = 60  # Seconds before trying again after a refresh failed outright
+PREFETCH_WORKERS = 4  # Concurrent schedule downloads (stays within the API client's pool)
+
+
+def fingerprint_ids_of(users):
+    """Collect fingerprint slot IDs from a /users/role or /admin/role payload."""
+    ids = set()
+    for user in users:
+        fingerprint_ids = user.get('fingerprint_id') or []
+        if not isinstance(fingerprint_ids, list):
+            fingerprint_ids = [fingerprint_ids]
+        for fingerprint_id in fingerprint_ids:
+            if isinstance(fingerprint_id, dict):
+                fingerprint_id = fingerprint_id.get('fingerprint_id')
+            if fingerprint_id not in (None, ''):
+                ids.add(str(fingerprint_id))
+    return ids
+
+
+class SchedulePrefetcher:
+    """Fills the ScheduleCache in bulk so the first scan of a period is a cache hit.
+
+    The API has no "all schedules for this lab" endpoint, so the set of users
+    is assembled from the faculty and admin lists (fingerprint IDs), the card
+    UIDs seen in /recent-logs, and anyone already in the cache. A background
+    thread repeats the prefetch `lead` seconds before each class_start.
+    """
+
+    def __init__(self, client, cache, clock, lead=PREFETCH_LEAD, workers=PREFETCH_WORKERS):
+        self.client = client
+        self.cache = cache
+        self.clock = clock
+        self.lead = lead
+        self.workers = workers
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+        self.listeners = []  # Called with (kind, key, index) after each download
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def known_users(self):
+        fingerprint_ids = set(self.cache.keys(FINGERPRINT))
+        rfid_numbers = set(self.cache.keys(RFID))
+        for fetch in (self.client.get_faculties, self.client.get_admins):
+            try:
+                fingerprint_ids |= fingerprint_ids_of(fetch())
+            except requests.RequestException as e:
+                print(f"Prefetch: failed to list users: {e}")
+        try:
+            for log in self.client.get_recent_logs():
+                if log.get('UID'):
+                    rfid_numbers.add(str(log['UID']))
+        except requests.RequestException as e:
+            print(f"Prefetch: failed to list recent card users: {e}")
+        return fingerprint_ids, rfid_numbers
+
+    def _fetch(self, kind, key):
+        try:
+            if kind == FINGERPRINT:
+                schedules = self.client.get_lab_schedule_fingerprint(key)
+            else:
+                schedules = self.client.get_lab_schedule_rfid(key)
+        except requests.RequestException as e:
+            print(f"Prefetch: failed to download {kind} schedule for {key}: {e}")
+            return False
+        try:
+            index = self.cache.put(kind, key, schedules)
+        except Exception as e:  # Malformed payload: skip this user, keep the rest of the batch
+            print(f"Prefetch: could not index {kind} schedule for {key}: {e}")
+            return False
+        for callback in self.listeners:
+            try:
+                callback(kind, key, index)
+            except Exception as e:
+                print(f"Prefetch: listener {getattr(callback, '__name__', callback)} failed for {key}: {e}")
+        return True
+
+    def prefetch(self):
+        """Download every known user's schedule into the cache. Returns the number stored."""
+        fingerprint_ids, rfid_numbers = self.known_users()
+        jobs = [(FINGERPRINT, key) for key in fingerprint_ids] + [(RFID, key) for key in rfid_numbers]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            stored = sum(pool.map(lambda job: self._fetch(*job), jobs))
+        print(f"Prefetched {stored}/{len(jobs)} lab schedules.")
+        return stored
+
+    def seconds_until_next_refresh(self):
+        """Seconds until `lead` before the next class_start today, from the cached schedules."""
+        now = self.clock.now_datetime()
+        if now is None:
+            return PREFETCH_IDLE_INTERVAL
+        day_of_week = now.strftime('%A')
+        current_minute = now.hour * 60 + now.minute
+        starts = set()
+        for index in self.cache.indexes():
+            starts |= index.class_starts(day_of_week, now.date())
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        upcoming = [midnight + timedelta(minutes=start) - timedelta(seconds=self.lead)
+                    for start in starts if start > current_minute]
+        # Skip boundaries whose refresh time has just passed (we were woken for them)
+        upcoming = [refresh_at for refresh_at in upcoming if refresh_at > now + timedelta(seconds=1)]
+        if not upcoming:
+            return PREFETCH_IDLE_INTERVAL
+        return min(PREFETCH_IDLE_INTERVAL, (min(upcoming) - now).total_seconds())
+
+    def start(self):
+        """Prefetch now in the background, then again ahead of each class period."""
+        self.running = True
+        self.thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _prefetch_loop(self):
+        while self.running:
+            try:
+                self.prefetch()
+                delay = self.seconds_until_next_refresh()
+            except Exception as e:  # Keep refreshing; a dead thread would leave the cache quietly stale
+                print(f"Prefetch: refresh failed: {e}")
+                delay = PREFETCH_RETRY_INTERVAL
+            self.wakeup.wait(delay)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import adafruit_fingerprint
+
+MIN_POLL_INTERVAL = 0.05  # Seconds between get_image() calls right after a touch
+MAX_POLL_INTERVAL = 0.5  # Idle ceiling for the adaptive poll
+POLL_BACKOFF = 1.5  # Interval growth per empty poll
+TOUCH_BURST = 1.0  # Seconds of fast polling after the touch line fires
+STOP_CHECK_INTERVAL = 0.5  # How often a wait re-checks should_continue() while idle
+
+
+class FingerDetector:
+    """Waits for a finger on the R307/AS608 without burning the CPU.
+
+    With `touch_pin` set, the sensor's touch-sense output is watched through
+    an RPi.GPIO edge callback: the waiting thread sleeps on an Event and only
+    talks to the sensor once the line fires. Without it, get_image() is
+    polled adaptively: every empty poll stretches the interval up to
+    `max_interval`, and any sign of a finger snaps it back to `min_interval`.
+    The sensor is passed to each wait, so one touch line can serve every
+    Adafruit_Fingerprint instance opened on the same port.
+    """
+
+    def __init__(self, touch_pin=None, gpio=None, active_high=True,
+                 min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL, backoff=POLL_BACKOFF):
+        self.touch_pin = touch_pin
+        self.gpio = gpio
+        self.active_high = active_high
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.touched = threading.Event()
+        self.last_image = None  # perf_counter() (start, end) of the get_image() call that returned OK
+        if touch_pin is not None and gpio is not None:
+            self._watch_touch_line()
+
+    @property
+    def interrupt_driven(self):
+        return self.touch_pin is not None and self.gpio is not None
+
+    def _watch_touch_line(self):
+        pull = self.gpio.PUD_DOWN if self.active_high else self.gpio.PUD_UP
+        edge = self.gpio.RISING if self.active_high else self.gpio.FALLING
+        self.gpio.setup(self.touch_pin, self.gpio.IN, pull_up_down=pull)
+        self.gpio.add_event_detect(self.touch_pin, edge, callback=self._on_touch, bouncetime=20)
+
+    def _on_touch(self, channel=None):
+        self.touched.set()
+
+    def finger_present(self):
+        """Current level of the touch line (interrupt mode only)."""
+        level = self.gpio.input(self.touch_pin)
+        return bool(level) == self.active_high
+
+    def wait_for_image(self, finger, should_continue=None, timeout=None):
+        """Block until finger.get_image() returns OK. Returns False if stopped or timed out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.interrupt_driven:
+            return self._wait_interrupt(finger, should_continue, deadline)
+        return self._wait_polling(finger, should_continue, deadline)
+
+    def _get_image(self, finger):
+        start = time.perf_counter()
+        result = finger.get_image()
+        if result == adafruit_fingerprint.OK:
+            self.last_image = (start, time.perf_counter())
+        return result
+
+    def _keep_waiting(self, should_continue, deadline):
+        if should_continue is not None and not should_continue():
+            return False
+        return deadline is None or time.monotonic() < deadline
+
+    def _wait_polling(self, finger, should_continue, deadline):
+        while self._keep_waiting(should_continue, deadline):
+            result = self._get_image(finger)
+            if result == adafruit_fingerprint.OK:
+                self.interval = self.min_interval
+                return True
+            if result == adafruit_fingerprint.NOFINGER:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+            else:
+                self.interval = self.min_interval  # Finger there but the image was bad: retry quickly
+            time.sleep(self.interval)
+        return False
+
+    def _wait_interrupt(self, finger, should_continue, deadline):
+        while self._keep_waiting(should_continue, deadline):
+            if not self.finger_present():
+                self.touched.clear()
+                # Re-check after clearing so an edge between the read and the clear is not lost
+                if not self.finger_present():
+                    self.touched.wait(STOP_CHECK_INTERVAL)
+                    continue
+            # Finger on the glass: poll quickly for a short burst
+            burst_end = time.monotonic() + TOUCH_BURST
+            while time.monotonic() < burst_end:
+                if self._get_image(finger) == adafruit_fingerprint.OK:
+                    return True
+                time.sleep(self.min_interval)
+            self.touched.clear()
+        return False
+
+    def wait_for_removal(self, finger, should_continue=None, timeout=None):
+        """Block until the finger is lifted (get_image() reports NOFINGER)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._keep_waiting(should_continue, deadline):
+            if self.interrupt_driven:
+                if not self.finger_present():
+                    return True
+            elif finger.get_image() == adafruit_fingerprint.NOFINGER:
+                return True
+            time.sleep(self.min_interval)
+        return False
+
+    def close(self):
+        if self.interrupt_driven:
+            self.gpio.remove_event_detect(self.touch_pin)
@@ -0,0 +1,199 @@
+"""Serial link tuning for the fingerprint sensor.
+
+The sensor keeps its baud rate and data packet size in flash, so once the
+rate is raised the host must open the port at the new rate from then on.
+tune() finds the rate the sensor is at, steps it up to the fastest one
+that survives a run of round trips and transfers, picks the largest
+stable packet size, and saves the result; hardware.open_fingerprint()
+opens the port at the saved rate:
+    python sensor_link.py [--port /dev/ttyUSB0] [--max-baud 115200]
+"""
+import argparse
+import json
+import os
+
+import adafruit_fingerprint
+
+LINK_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_link.json')
+BAUD_RATES = (115200, 57600, 38400, 19200, 9600)  # Fastest first; the sensor takes 9600 * N
+PACKET_SIZES = {3: 256, 2: 128, 1: 64, 0: 32}  # data_packet_size code -> bytes, largest first
+STABILITY_ROUNDS = 5  # Round trips (read_sysparam + char upload) a setting must survive
+OPEN_ATTEMPTS = 3  # Handshakes tried per rate; a marginal link drops some replies
+STEP_BACK_ATTEMPTS = 5  # Tries to restore the old rate over a link that drops replies
+
+_BAUD_PARAM = 4
+_PACKET_PARAM = 6
+
+
+def load_link(port, path=LINK_CONFIG_PATH):
+    """Saved {'baudrate', 'data_packet_size'} for `port`, or None."""
+    try:
+        with open(path) as f:
+            return json.load(f).get(port)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Link: ignoring unreadable {path}: {e}")
+        return None
+
+
+def save_link(port, baudrate, data_packet_size, path=LINK_CONFIG_PATH):
+    try:
+        with open(path) as f:
+            links = json.load(f)
+    except (OSError, ValueError):
+        links = {}
+    links[port] = {'baudrate': baudrate, 'data_packet_size': data_packet_size}
+    partial = path + '.part'
+    try:
+        with open(partial, 'w') as f:
+            json.dump(links, f, indent=2)
+        os.replace(partial, path)
+    except OSError as e:
+        print(f"Link: failed to save {path}: {e}")
+
+
+def saved_baudrate(port, default, path=LINK_CONFIG_PATH):
+    link = load_link(port, path)
+    return link['baudrate'] if link else default
+
+
+class LinkTuner:
+    """Negotiates the fastest stable baud rate and packet size with the sensor.
+
+    `opener(port, baudrate)` returns a connected Adafruit_Fingerprint (or
+    the simulator's) and raises RuntimeError or OSError when nothing
+    answers at that rate. A setting counts as stable when `rounds`
+    read_sysparam() calls and character-file uploads all succeed; the
+    uploads are skipped on a sensor with no stored template, whose empty
+    char buffer the sensor refuses to upload. Only a rate that has just
+    passed that check is saved.
+    """
+
+    def __init__(self, opener, port, path=LINK_CONFIG_PATH, rounds=STABILITY_ROUNDS, max_baud=BAUD_RATES[0]):
+        self.opener = opener
+        self.port = port
+        self.path = path
+        self.rounds = rounds
+        self.max_baud = max_baud
+        self.upload_probe = True  # Cleared by prime() when there is no template to upload
+
+    def _open(self, baudrate):
+        for _ in range(OPEN_ATTEMPTS):
+            try:
+                return self.opener(self.port, baudrate)
+            except (RuntimeError, OSError):
+                continue
+        return None
+
+    def prime(self, finger):
+        """Load a stored template into char buffer 1 so stable() has something to upload."""
+        try:
+            if finger.read_templates() == adafruit_fingerprint.OK and finger.templates:
+                self.upload_probe = finger.load_model(finger.templates[0], 1) == adafruit_fingerprint.OK
+                return
+        except (RuntimeError, OSError):
+            pass
+        self.upload_probe = False
+
+    def stable(self, finger):
+        try:
+            for _ in range(self.rounds):
+                if finger.read_sysparam() != adafruit_fingerprint.OK:
+                    return False
+                if self.upload_probe:
+                    finger.get_fpdata(sensorbuffer="char", slot=1)
+        # get_fpdata raises UnboundLocalError when the upload is refused (e.g. an empty char buffer)
+        except (RuntimeError, OSError, UnboundLocalError):
+            return False
+        return True
+
+    def find(self, preferred=None):
+        """Open the sensor at whichever rate it answers, trying `preferred` first. Returns (finger, baudrate)."""
+        for baudrate in ([preferred] if preferred else []) + [rate for rate in BAUD_RATES if rate != preferred]:
+            finger = self._open(baudrate)
+            if finger is not None:
+                return finger, baudrate
+        raise RuntimeError(f"Fingerprint sensor did not answer on {self.port} at any baud rate")
+
+    def switch_baud(self, finger, current, target):
+        """Move the sensor from `current` to `target`. Returns (finger, baudrate) for the rate it ends up on."""
+        try:
+            finger.set_sysparam(_BAUD_PARAM, target // 9600)
+        except (RuntimeError, OSError):
+            return finger, current
+        finger._uart.close()
+        switched = self._open(target)
+        if switched is not None and self.stable(switched):
+            return switched, target
+        # The sensor is at `target` but the wiring cannot carry it: step back while it still answers now and then
+        if switched is not None:
+            for _ in range(STEP_BACK_ATTEMPTS):
+                try:
+                    switched.set_sysparam(_BAUD_PARAM, current // 9600)
+                    break
+                except (RuntimeError, OSError):
+                    continue
+            switched._uart.close()
+        return self.find(current)
+
+    def settle(self, finger, baudrate):
+        """Step down from `baudrate` until the link passes stable(). Returns (finger, baudrate)."""
+        if self.stable(finger):
+            return finger, baudrate
+        for lower in BAUD_RATES:
+            if lower >= baudrate:
+                continue
+            finger, baudrate = self.switch_baud(finger, baudrate, lower)
+            if self.stable(finger):
+                return finger, baudrate
+        raise RuntimeError(f"No stable baud rate on {self.port}; link settings not saved")
+
+    def tune_packet_size(self, finger):
+        """Largest data packet size that stays stable. Returns its code."""
+        for code in PACKET_SIZES:
+            try:
+                finger.set_sysparam(_PACKET_PARAM, code)
+            except (RuntimeError, OSError):
+                continue
+            if self.stable(finger):
+                return code
+        return finger.data_packet_size
+
+    def tune(self):
+        """Negotiate, save and return (finger, baudrate, data_packet_size)."""
+        link = load_link(self.port, self.path)
+        finger, baudrate = self.find(link['baudrate'] if link else None)
+        self.prime(finger)
+        for target in BAUD_RATES:
+            if target <= baudrate:
+                break
+            if target > self.max_baud:
+                continue
+            finger, reached = self.switch_baud(finger, baudrate, target)
+            if reached == target:
+                baudrate = target
+                break
+            baudrate = reached
+        # switch_baud may have fallen back to find(), which can reopen at an unstable rate: check again
+        finger, baudrate = self.settle(finger, baudrate)
+        data_packet_size = self.tune_packet_size(finger)
+        save_link(self.port, baudrate, data_packet_size, self.path)
+        print(f"Link: {self.port} at {baudrate} baud, {PACKET_SIZES[data_packet_size]}-byte packets.")
+        return finger, baudrate, data_packet_size
+
+
+def main():
+    from hardware import open_fingerprint, FINGERPRINT_PORT
+
+    parser = argparse.ArgumentParser(description="Negotiate the fastest stable fingerprint sensor link.")
+    parser.add_argument('--port', default=FINGERPRINT_PORT)
+    parser.add_argument('--max-baud', type=int, default=BAUD_RATES[0])
+    args = parser.parse_args()
+    tuner = LinkTuner(lambda port, baudrate: open_fingerprint(port=port, baudrate=baudrate),
+                      args.port, max_baud=args.max_baud)
+    tuner.tune()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import pygame
+
+TTS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')
+MAX_PENDING = 3  # Prompts waiting to be spoken; the oldest is dropped when full
+STALE_AFTER = 3.0  # Seconds after which a prompt is no longer worth saying
+MAX_LOADED = 64  # Rendered phrases kept decoded in memory (the WAVs stay on disk)
+
+WELCOME_PHRASE = "Welcome {name}. The door is unlocked."
+GOODBYE_PHRASE = "Goodbye {name}. The door is locked."
+
+# Said by the scan loops on every pass; rendered once at start-up
+FIXED_PHRASES = (
+    "Waiting for fingerprint",
+    "No matching fingerprint found. Please try again.",
+    "Please try again.",
+    "No matching fingerprint found in the database.",
+    "Access denied. You are outside of your allowed schedule.",
+)
+
+
+def greeting_phrases(name):
+    return WELCOME_PHRASE.format(name=name), GOODBYE_PHRASE.format(name=name)
+
+
+class SpeechWorker:
+    """Speaks prompts on a dedicated thread instead of the scan loops.
+
+    speak() only enqueues. The queue is bounded and coalescing: a prompt that
+    is already waiting is not queued twice, the oldest prompt is dropped
+    when it is full, and a prompt older than `stale_after` is discarded
+    rather than said late. Phrases rendered ahead of time with prerender()
+    are stored as WAVs in `cache_dir` and played through the AudioEngine;
+    anything else falls back to live pyttsx3 synthesis.
+    """
+
+    def __init__(self, engine, audio, cache_dir=TTS_CACHE_DIR, max_pending=MAX_PENDING,
+                 stale_after=STALE_AFTER, max_loaded=MAX_LOADED):
+        self.engine = engine  # pyttsx3 engine; only ever used from the worker thread
+        self.audio = audio
+        self.cache_dir = cache_dir
+        self.max_pending = max_pending
+        self.stale_after = stale_after
+        self.max_loaded = max_loaded
+        self.pending = deque()  # (message, queued_at)
+        self.to_render = deque()
+        self.rendered = OrderedDict()  # message -> pygame.mixer.Sound, LRU
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def speak(self, message):
+        """Queue `message` to be said. Never blocks."""
+        with self.lock:
+            if any(pending == message for pending, _ in self.pending):
+                return
+            if len(self.pending) >= self.max_pending:
+                self.pending.popleft()
+            self.pending.append((message, time.monotonic()))
+        self.wakeup.set()
+
+    def prerender(self, phrases):
+        """Render `phrases` to the WAV cache in the background, between prompts."""
+        with self.lock:
+            queued = set(self.to_render)
+            for phrase in phrases:
+                if phrase not in queued and phrase not in self.rendered:
+                    self.to_render.append(phrase)
+                    queued.add(phrase)
+        self.wakeup.set()
+
+    def cache_path(self, message):
+        digest = hashlib.sha1(message.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    def _load(self, message):
+        """Return the rendered Sound for `message`, from memory or the disk cache, or None."""
+        sound = self.rendered.get(message)
+        if sound is not None:
+            self.rendered.move_to_end(message)
+            return sound
+        path = self.cache_path(message)
+        if not os.path.exists(path):
+            return None
+        try:
+            sound = pygame.mixer.Sound(path)
+        except pygame.error as e:
+            print(f"Failed to load cached speech {path}: {e}")
+            return None
+        self.rendered[message] = sound
+        if len(self.rendered) > self.max_loaded:
+            self.rendered.popitem(last=False)
+        return sound
+
+    def _render(self, message):
+        if self.engine is None or self._load(message) is not None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(message)
+        partial = path + ".part"
+        try:
+            self.engine.save_to_file(message, partial)
+            self.engine.runAndWait()
+            os.replace(partial, path)
+        except Exception as e:
+            print(f"Failed to render speech for {message!r}: {e}")
+            return
+        self._load(message)
+
+    def _say(self, message):
+        sound = self._load(message)
+        if sound is not None:
+            self.audio.play_speech(sound)
+            time.sleep(sound.get_length())  # Keep prompts from overlapping
+        elif self.engine is not None:
+            self.engine.say(message)
+            self.engine.runAndWait()
+
+    def start(self):
+        self.running = True
+        self.prerender(FIXED_PHRASES)
+        self.thread = threading.Thread(target=self._speech_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _speech_loop(self):
+        while self.running:
+            with self.lock:
+                message = queued_at = phrase = None
+                if self.pending:
+                    message, queued_at = self.pending.popleft()
+                elif self.to_render:
+                    phrase = self.to_render.popleft()
+                else:
+                    self.wakeup.clear()
+            if message is not None:
+                if time.monotonic() - queued_at <= self.stale_after:
+                    self._say(message)
+            elif phrase is not None:
+                self._render(phrase)
+            else:
+                self.wakeup.wait()
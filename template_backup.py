@@ -0,0 +1,190 @@
+"""Back up the sensor's fingerprint templates and restore them onto another sensor.
+
+A replacement sensor, or the sensor for a second door, is provisioned from
+an archive instead of re-enrolling every faculty member in person:
+    python template_backup.py export templates.plt
+    python template_backup.py import templates.plt [--overwrite] [--baudrate 115200]
+
+The archive is a fixed header, a JSON manifest (slot, owner, size and
+CRC-32 of each template) and the raw character files back to back.
+"""
+import argparse
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import adafruit_fingerprint
+
+from hardware import open_fingerprint, FINGERPRINT_BAUDRATE, FINGERPRINT_PORT
+from sensor_link import saved_baudrate
+from template_index import TemplateIndex
+
+ARCHIVE_MAGIC = b'PLTA'
+ARCHIVE_VERSION = 1
+ARCHIVE_HEADER = struct.Struct('>4sBHI')  # magic, version, template count, manifest length
+RESTORE_LOOKAHEAD = 4  # Templates read, checked and framed ahead of the one on the wire
+
+_DOWNLOAD = 0x09  # DownChar: the next data packets go into a char buffer
+_STARTCODE = 0xEF01
+_DATAPACKET, _ENDDATAPACKET = 0x02, 0x08
+_PACKET_SIZES = {0: 32, 1: 64, 2: 128, 3: 256}
+
+
+def write_archive(path, templates):
+    """Write (slot, owner, data) tuples to `path`. Returns the number written."""
+    templates = list(templates)
+    manifest = [{'slot': slot, 'owner': owner, 'size': len(data), 'crc32': zlib.crc32(data)}
+                for slot, owner, data in templates]
+    encoded = json.dumps(manifest, separators=(',', ':')).encode()
+    with open(path, 'wb') as f:
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, len(manifest), len(encoded)))
+        f.write(encoded)
+        for _, _, data in templates:
+            f.write(data)
+    return len(manifest)
+
+
+def read_archive(path):
+    """Yield (manifest entry, data) from an archive one template at a time. Raises ValueError if it is damaged."""
+    with open(path, 'rb') as f:
+        magic, version, count, manifest_length = ARCHIVE_HEADER.unpack(f.read(ARCHIVE_HEADER.size))
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            raise ValueError(f"{path} is not a version {ARCHIVE_VERSION} template archive")
+        manifest = json.loads(f.read(manifest_length))
+        if len(manifest) != count:
+            raise ValueError(f"{path}: manifest lists {len(manifest)} templates, header says {count}")
+        for entry in manifest:
+            data = f.read(entry['size'])
+            if len(data) != entry['size'] or zlib.crc32(data) != entry['crc32']:
+                raise ValueError(f"{path}: template for slot {entry['slot']} is damaged")
+            yield entry, data
+
+
+def export_templates(finger, path, slots, owners=None):
+    """Pull each slot's model through char buffer 1 into an archive. Returns (templates, bytes, seconds)."""
+    owners = owners or {}
+    started = time.perf_counter()
+    templates = []
+    for slot in slots:
+        if finger.load_model(slot, 1) != adafruit_fingerprint.OK:
+            print(f"Backup: slot {slot} could not be loaded; skipped.")
+            continue
+        try:
+            data = bytes(finger.get_fpdata(sensorbuffer="char", slot=1))
+        except UnboundLocalError:  # get_fpdata's way of reporting a refused upload
+            print(f"Backup: slot {slot} could not be uploaded; skipped.")
+            continue
+        templates.append((slot, owners.get(str(slot)), data))
+    write_archive(path, templates)
+    return len(templates), sum(len(data) for _, _, data in templates), time.perf_counter() - started
+
+
+def frame_data(finger, data):
+    """Split a template into the sensor's data packets, as one buffer for a single UART write."""
+    size = _PACKET_SIZES.get(getattr(finger, 'data_packet_size', 2), 128)
+    frame = bytearray()
+    for start in range(0, len(data), size):
+        chunk = data[start:start + size]
+        packet_type = _ENDDATAPACKET if start + size >= len(data) else _DATAPACKET
+        length = len(chunk) + 2
+        body = bytes([packet_type, length >> 8, length & 0xFF]) + chunk
+        checksum = sum(body)
+        frame += struct.pack('>H', _STARTCODE) + bytes(finger.address) + body
+        frame += bytes([(checksum >> 8) & 0xFF, checksum & 0xFF])
+    return bytes(frame)
+
+
+def send_template(finger, data, frame=None):
+    """Download one template into char buffer 1. Returns True once the sensor has taken it."""
+    if frame is None or not hasattr(finger, '_send_data'):
+        return finger.send_fpdata(list(data), sensorbuffer="char", slot=1)
+    finger._send_packet([_DOWNLOAD, 1])
+    if finger._get_packet(12)[0] != adafruit_fingerprint.OK:
+        return False
+    finger._uart.write(frame)
+    return True
+
+
+def restore_templates(finger, path, index=None, overwrite=False, lookahead=RESTORE_LOOKAHEAD):
+    """Stream an archive onto the sensor. Returns (restored, skipped, bytes, seconds).
+
+    A reader thread checks and frames the next `lookahead` templates while
+    the current one is on the wire, so the serial line never waits for the
+    disk. Each template is written with one UART write instead of one per
+    data packet, then stored in its original slot. Occupied slots are
+    skipped unless `overwrite` is set.
+    """
+    pending = queue.Queue(maxsize=lookahead)
+    framed = hasattr(finger, '_send_data')
+
+    def read_ahead():
+        try:
+            for entry, data in read_archive(path):
+                pending.put((entry, data, frame_data(finger, data) if framed else None))
+        except (OSError, ValueError) as e:
+            pending.put(e)
+            return
+        pending.put(None)
+
+    threading.Thread(target=read_ahead, daemon=True).start()
+    restored, skipped, total_bytes = 0, 0, 0
+    started = time.perf_counter()
+    while True:
+        item = pending.get()
+        if item is None:
+            break
+        if isinstance(item, Exception):
+            raise item
+        entry, data, frame = item
+        slot = entry['slot']
+        if index is not None and index.occupied(slot) and not overwrite:
+            print(f"Restore: slot {slot} is already in use; skipped.")
+            skipped += 1
+            continue
+        if not send_template(finger, data, frame) or finger.store_model(slot, 1) != adafruit_fingerprint.OK:
+            print(f"Restore: slot {slot} was not stored.")
+            skipped += 1
+            continue
+        if index is not None:
+            index.mark_stored(slot, entry.get('owner'), save=False)
+        restored += 1
+        total_bytes += len(data)
+    if index is not None:
+        index.save()
+    return restored, skipped, total_bytes, time.perf_counter() - started
+
+
+def report(action, count, total_bytes, elapsed, baudrate):
+    per_template = elapsed / count * 1000 if count else 0.0
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{action}: {count} templates ({total_bytes / 1024:.0f} KiB) in {elapsed:.1f} s at {baudrate} baud, "
+          f"{per_template:.0f} ms per template, {rate:.1f} templates/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up or restore fingerprint templates.")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('archive')
+    parser.add_argument('--baudrate', type=int, help="Default: the rate sensor_link.py saved for the port")
+    parser.add_argument('--overwrite', action='store_true', help="Replace templates in occupied slots")
+    args = parser.parse_args()
+
+    baudrate = args.baudrate or saved_baudrate(FINGERPRINT_PORT, FINGERPRINT_BAUDRATE)
+    finger = open_fingerprint(baudrate=baudrate)
+    index = TemplateIndex()
+    index.verify(finger)
+    if args.action == 'export':
+        count, total_bytes, elapsed = export_templates(finger, args.archive, index.slots(), index.owners)
+        report("Exported", count, total_bytes, elapsed, baudrate)
+    else:
+        restored, skipped, total_bytes, elapsed = restore_templates(finger, args.archive, index, args.overwrite)
+        report("Restored", restored, total_bytes, elapsed, baudrate)
+        if skipped:
+            print(f"{skipped} templates skipped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+import adafruit_fingerprint
+
+TEMPLATE_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_templates.json')
+LIBRARY_SIZE = 1000  # Until the sensor has reported its own
+FIRST_SLOT = 1  # Slot 0 is never handed out, as before
+
+
+class TemplateIndex:
+    """On-disk mirror of which sensor slots hold a template, and whose it is.
+
+    Occupied slots are a bitmap, free slots a stack, so allocate() is O(1)
+    and reuses slots freed by delete(). Every store_model/delete_model goes
+    through store() and delete(), which update the mirror and save it, so
+    the enrollment screen never has to read the template list over UART.
+    verify() compares one count_templates() round trip against the mirror
+    at start-up and falls back to a full sync() (read_templates) only when
+    they disagree, e.g. after enrolling with another script.
+    """
+
+    def __init__(self, path=TEMPLATE_INDEX_PATH, library_size=LIBRARY_SIZE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.library_size = library_size
+        self.bitmap = bytearray((library_size + 7) // 8)
+        self.owners = {}  # slot (str) -> email of the user it was enrolled for
+        self.free = []  # Unoccupied slots, lowest on top
+        self.synced = False  # True once the mirror has been loaded or read from the sensor
+        self.load()
+        self._rebuild_free()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Templates: ignoring unreadable {self.path}: {e}")
+            return
+        self.library_size = saved['library_size']
+        self.bitmap = bytearray.fromhex(saved['bitmap'])
+        self.owners = saved.get('owners', {})
+        self.synced = True
+
+    def save(self):
+        with self.lock:
+            snapshot = {'library_size': self.library_size, 'bitmap': self.bitmap.hex(), 'owners': self.owners}
+            data = json.dumps(snapshot, separators=(',', ':'))
+        partial = self.path + '.part'
+        try:
+            with open(partial, 'w') as f:
+                f.write(data)
+            os.replace(partial, self.path)
+        except OSError as e:
+            print(f"Templates: failed to save {self.path}: {e}")
+
+    def _rebuild_free(self):
+        self.free = [slot for slot in range(self.library_size - 1, FIRST_SLOT - 1, -1) if not self.occupied(slot)]
+
+    def occupied(self, slot):
+        return bool(self.bitmap[slot >> 3] & (1 << (slot & 7)))
+
+    def _set(self, slot, stored):
+        if stored:
+            self.bitmap[slot >> 3] |= 1 << (slot & 7)
+        else:
+            self.bitmap[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+
+    def count(self):
+        return sum(bin(byte).count('1') for byte in self.bitmap)
+
+    def slots(self):
+        return [slot for slot in range(self.library_size) if self.occupied(slot)]
+
+    def owner(self, slot):
+        return self.owners.get(str(slot))
+
+    def sync(self, finger):
+        """Rebuild the mirror from read_templates(). Owners of slots that are still occupied are kept."""
+        if finger.read_templates() != adafruit_fingerprint.OK:
+            raise RuntimeError("Failed to read the sensor's template list")
+        library_size = getattr(finger, 'library_size', None) or self.library_size
+        with self.lock:
+            self.library_size = library_size
+            self.bitmap = bytearray((library_size + 7) // 8)
+            for slot in finger.templates:
+                if slot < library_size:
+                    self._set(slot, True)
+            self.owners = {slot: email for slot, email in self.owners.items() if self.occupied(int(slot))}
+            self._rebuild_free()
+            self.synced = True
+        self.save()
+        print(f"Templates: {self.count()} of {library_size} slots in use.")
+
+    def verify(self, finger):
+        """Start-up check: one count_templates() round trip, and a full sync() only on a mismatch."""
+        if self.synced and finger.count_templates() == adafruit_fingerprint.OK \
+                and finger.template_count == self.count():
+            return False
+        self.sync(finger)
+        return True
+
+    def allocate(self):
+        """Take the lowest free slot, or None when the library is full. The slot stays reserved until store() or release()."""
+        with self.lock:
+            while self.free:
+                slot = self.free.pop()
+                if not self.occupied(slot):  # Skip slots filled by mark_stored() since they were freed
+                    return slot
+            return None
+
+    def release(self, slot):
+        """Give back a slot from allocate() that was never stored."""
+        with self.lock:
+            if not self.occupied(slot):
+                self.free.append(slot)
+
+    def store(self, finger, slot, owner=None, buffer=1):
+        """store_model() into `slot` and record it. Returns the sensor's result code."""
+        result = finger.store_model(slot, buffer)
+        if result != adafruit_fingerprint.OK:
+            self.release(slot)
+            return result
+        self.mark_stored(slot, owner)
+        return result
+
+    def mark_stored(self, slot, owner=None, save=True):
+        """Record a template stored without allocate(), e.g. by a restore into its original slot."""
+        with self.lock:
+            self._set(slot, True)
+            if owner is not None:
+                self.owners[str(slot)] = owner
+        if save:
+            self.save()
+
+    def delete(self, finger, slot):
+        """delete_model() and free the slot for reuse. Returns the sensor's result code."""
+        result = finger.delete_model(slot)
+        if result != adafruit_fingerprint.OK:
+            return result
+        with self.lock:
+            if self.occupied(slot):
+                self._set(slot, False)
+                self.free.append(slot)
+            self.owners.pop(str(slot), None)
+        self.save()
+        return result
@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+SYNC_INTERVAL = 15 * 60  # Re-sync with /api/current-date-time every 15 minutes
+RETRY_INTERVAL = 30  # Retry sooner while the server is unreachable
+
+
+def parse_server_datetime(data):
+    """Build a datetime from a /api/current-date-time payload.
+
+    The payload carries day_of_week, current_time ("HH:MM" or "HH:MM:SS") and
+    date/month/year. The month may be a number or a name; if the date fields
+    cannot be read, today's local date is used with the server's time of day.
+    """
+    current_time = data['current_time']
+    time_format = "%H:%M:%S" if current_time.count(':') == 2 else "%H:%M"
+    time_of_day = datetime.strptime(current_time, time_format).time()
+
+    date_value = str(data.get('date', ''))
+    month_value = str(data.get('month', ''))
+    year_value = str(data.get('year', ''))
+    server_date = None
+    for text, fmt in ((date_value, '%Y-%m-%d'),
+                      (f"{year_value}-{month_value}-{date_value}", '%Y-%m-%d'),
+                      (f"{year_value}-{month_value}-{date_value}", '%Y-%B-%d'),
+                      (f"{year_value}-{month_value}-{date_value}", '%Y-%b-%d')):
+        try:
+            server_date = datetime.strptime(text, fmt).date()
+            break
+        except ValueError:
+            continue
+    if server_date is None:
+        server_date = datetime.now().date()
+    return datetime.combine(server_date, time_of_day)
+
+
+class TimeSync:
+    """Local clock anchored to the server's /api/current-date-time.
+
+    The server is asked once at start-up and then every `interval` seconds.
+    In between, the time is served from time.monotonic() plus the offset
+    recorded at the last sync, so reading the clock never touches the network.
+    """
+
+    def __init__(self, client, interval=SYNC_INTERVAL, retry_interval=RETRY_INTERVAL):
+        self.client = client
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.lock = threading.Lock()
+        self.anchor = None  # (server datetime, monotonic seconds) at the last sync
+        self.month_is_name = False
+        self.last_sync = None  # monotonic time of the last successful sync
+        self.drift = None  # seconds the local clock was off at the last re-sync
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+
+    def start(self):
+        """Sync once in the foreground, then keep re-syncing in the background."""
+        self.sync()
+        self.running = True
+        self.thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _sync_loop(self):
+        while self.running:
+            delay = self.interval if self.is_synced() else self.retry_interval
+            self.wakeup.wait(delay)
+            if not self.running:
+                return
+            self.sync()
+
+    def sync(self):
+        """Fetch the server time and re-anchor the local clock. Returns True on success."""
+        try:
+            sent = time.monotonic()
+            data = self.client.get_current_date_time()
+            received = time.monotonic()
+            if 'day_of_week' not in data or 'current_time' not in data:
+                print("Error: Missing expected keys in the API response.")
+                return False
+            server_now = parse_server_datetime(data)
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"Error syncing clock with API: {e}")
+            return False
+
+        # Assume the server read its clock halfway through the round trip
+        midpoint = sent + (received - sent) / 2
+        with self.lock:
+            if self.anchor is not None:
+                predicted = self._at(midpoint)
+                self.drift = (predicted - server_now).total_seconds()
+                if abs(self.drift) >= 60:
+                    print(f"Clock drift of {self.drift:.0f}s corrected on re-sync.")
+            self.anchor = (server_now, midpoint)
+            self.month_is_name = not str(data.get('month', '')).isdigit()
+            self.last_sync = received
+        return True
+
+    def is_synced(self):
+        return self.anchor is not None
+
+    def _at(self, monotonic_time):
+        server_time, anchor_time = self.anchor
+        return server_time + timedelta(seconds=monotonic_time - anchor_time)
+
+    def now_datetime(self):
+        """Current server time as a datetime, or None if never synced."""
+        with self.lock:
+            if self.anchor is None:
+                return None
+            return self._at(time.monotonic())
+
+    def now(self):
+        """Current server time in the same shape as the /api/current-date-time response."""
+        current = self.now_datetime()
+        if current is None:
+            return None
+        return {
+            'day_of_week': current.strftime('%A'),
+            'current_time': current.strftime('%H:%M'),
+            'date': current.strftime('%d'),
+            'month': current.strftime('%B') if self.month_is_name else current.strftime('%m'),
+            'year': current.strftime('%Y'),
+        }
+
+    def seconds_since_sync(self):
+        if self.last_sync is None:
+            return None
+        return time.monotonic() - self.last_sync
@@ -0,0 +1,170 @@
+"""Per-scan tracing: how long each stage between touch and door unlock takes.
+
+A scan loop opens a trace with begin_trace(), stages are wrapped in
+span(), and end_trace() writes the whole trace as one JSON line to a
+rotating metrics file. Spans outside a trace (background polling, prefetch)
+are not recorded. Summarise the file with:
+    python tracing.py [--file prolock_metrics.jsonl] [--kind fingerprint_scan]
+"""
+import argparse
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_metrics.jsonl')
+METRICS_MAX_BYTES = 1024 * 1024
+METRICS_BACKUPS = 5
+
+_current_trace = contextvars.ContextVar('prolock_trace', default=None)
+_metrics_log = None
+
+
+def metrics_log(path=METRICS_PATH):
+    global _metrics_log
+    if _metrics_log is None:
+        _metrics_log = logging.getLogger('prolock.metrics')
+        _metrics_log.setLevel(logging.INFO)
+        _metrics_log.propagate = False
+        handler = RotatingFileHandler(path, maxBytes=METRICS_MAX_BYTES, backupCount=METRICS_BACKUPS)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _metrics_log.addHandler(handler)
+    return _metrics_log
+
+
+class Trace:
+    def __init__(self, kind, started=None):
+        self.kind = kind
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter() if started is None else started
+        self.wall_started = datetime.now().isoformat(timespec='milliseconds')
+        self.spans = []  # (name, start offset s, duration s)
+
+    def add_span(self, name, start, end):
+        """Record a stage timed elsewhere, from two perf_counter() readings."""
+        self.spans.append((name, start - self.started, end - start))
+
+    def to_record(self, outcome, finished):
+        return {
+            'trace': self.trace_id,
+            'kind': self.kind,
+            'at': self.wall_started,
+            'outcome': outcome,
+            'total_ms': round((finished - self.started) * 1000, 1),
+            'spans': [{'name': name, 'start_ms': round(start * 1000, 1), 'ms': round(duration * 1000, 1)}
+                      for name, start, duration in self.spans],
+        }
+
+
+def begin_trace(kind, started=None):
+    """Start a trace on this thread (and on jobs it hands to ScanPipeline)."""
+    trace = Trace(kind, started)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def end_trace(outcome):
+    """Close the current trace and append it to the metrics file."""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    _current_trace.set(None)
+    record = trace.to_record(outcome, time.perf_counter())
+    try:
+        metrics_log().info(json.dumps(record))
+    except OSError as e:
+        print(f"Failed to write scan metrics: {e}")
+    return record
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as a stage of the current trace; a no-op outside one."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter())
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def read_records(path=METRICS_PATH, kind=None):
+    """Yield trace records from the metrics file and its rotated backups, oldest first."""
+    paths = [f"{path}.{n}" for n in range(METRICS_BACKUPS, 0, -1)] + [path]
+    for file_path in paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if kind is None or record.get('kind') == kind:
+                    yield record
+
+
+def summarize(records):
+    """Print p50/p95/p99 per stage and each stage's share of the mean scan time."""
+    by_kind = {}
+    for record in records:
+        by_kind.setdefault(record['kind'], []).append(record)
+
+    for kind, traces in sorted(by_kind.items()):
+        totals = sorted(trace['total_ms'] for trace in traces)
+        mean_total = sum(totals) / len(totals)
+        outcomes = {}
+        stages = {}
+        for trace in traces:
+            outcomes[trace['outcome']] = outcomes.get(trace['outcome'], 0) + 1
+            per_trace = {}
+            for stage in trace['spans']:
+                per_trace[stage['name']] = per_trace.get(stage['name'], 0.0) + stage['ms']
+            for name, ms in per_trace.items():
+                stages.setdefault(name, []).append(ms)
+
+        print(f"\n{kind}: {len(traces)} scans {outcomes}")
+        print(f"  {'stage':<36}{'count':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'share':>8}")
+        print(f"  {'total (touch -> decision)':<36}{len(totals):>6}{percentile(totals, 0.5):>9.0f}"
+              f"{percentile(totals, 0.95):>9.0f}{percentile(totals, 0.99):>9.0f}{'100%':>8}")
+        ranked = sorted(stages.items(), key=lambda item: -sum(item[1]))
+        for name, values in ranked:
+            values.sort()
+            # Share of the mean scan: API lookups run concurrently, so shares can add up past 100%
+            share = sum(values) / len(traces) / mean_total * 100 if mean_total else 0.0
+            print(f"  {name:<36}{len(values):>6}{percentile(values, 0.5):>9.0f}"
+                  f"{percentile(values, 0.95):>9.0f}{percentile(values, 0.99):>9.0f}{share:>7.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise scan latency metrics.")
+    parser.add_argument('--file', default=METRICS_PATH)
+    parser.add_argument('--kind', help="fingerprint_scan or nfc_scan")
+    args = parser.parse_args()
+    records = list(read_records(args.file, args.kind))
+    if not records:
+        print(f"No traces in {args.file}")
+        return
+    summarize(records)
+
+
+if __name__ == '__main__':
+    main()
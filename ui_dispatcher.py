@@ -0,0 +1,74 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PUMP_INTERVAL = 16  # ms between queue drains (~60 fps)
+PUMP_BUDGET = 0.008  # seconds of UI work allowed per drain, so a burst cannot freeze a frame
+DISPATCH_WORKERS = 4
+
+
+class UIDispatcher:
+    """Runs blocking jobs on a thread pool and marshals results back to Tk.
+
+    Tkinter widgets may only be touched from the thread running mainloop.
+    Workers (API calls, the fingerprint and NFC loops) put callbacks on one
+    queue; a single `after` pump on the Tk thread drains it every 16 ms.
+    """
+
+    def __init__(self, root, workers=DISPATCH_WORKERS, interval=PUMP_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ui-job")
+        self.callbacks = queue.Queue()
+        self.ui_thread = threading.current_thread()
+        self.running = True
+        self.root.after(self.interval, self._pump)
+
+    def on_ui_thread(self):
+        return threading.current_thread() is self.ui_thread
+
+    def call_soon(self, func, *args):
+        """Queue `func(*args)` to run on the Tk thread. Safe from any thread."""
+        self.callbacks.put((func, args))
+
+    def run_on_ui(self, func, *args):
+        """Run `func(*args)` now if already on the Tk thread, otherwise queue it."""
+        if self.on_ui_thread():
+            func(*args)
+        else:
+            self.call_soon(func, *args)
+
+    def submit(self, job, *args, on_done=None, on_error=None):
+        """Run `job(*args)` on a worker; deliver its result or exception on the Tk thread."""
+        def run():
+            try:
+                result = job(*args)
+            except Exception as e:
+                if on_error is not None:
+                    self.call_soon(on_error, e)
+                else:
+                    print(f"Background job {getattr(job, '__name__', job)} failed: {e}")
+                return
+            if on_done is not None:
+                self.call_soon(on_done, result)
+
+        return self.executor.submit(run)
+
+    def _pump(self):
+        deadline = time.perf_counter() + PUMP_BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                func, args = self.callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"UI callback {getattr(func, '__name__', func)} failed: {e}")
+        if self.running:
+            self.root.after(self.interval, self._pump)
+
+    def stop(self):
+        self.running = False
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+from schedule_prefetch import fingerprint_ids_of
+
+DIRECTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolock_directory.json')
+DIRECTORY_SYNC_INTERVAL = 5 * 60  # Seconds between background refreshes
+CARD_REFRESH_AGE = 60 * 60  # Re-check a cached card profile after this many seconds
+CARD_REFRESH_BATCH = 20  # Card profiles re-checked per sync, oldest first
+UNKNOWN_CARD_TTL = 30  # Seconds an unregistered card's 404 is answered from memory
+
+FACULTY, ADMIN = 'faculty', 'admin'
+
+
+def fingerprint_record(user, role):
+    """The fields a scan needs from a /users/role or /admin/role entry."""
+    return {'name': user.get('name'), 'email': user.get('email'), 'role': role}
+
+
+def card_record(data):
+    """The fields a tap needs from a /user-information/by-id-card response."""
+    return {field: data.get(field) for field in ('user_number', 'user_name', 'year', 'block')}
+
+
+class UserDirectory:
+    """Local copy of who is behind each fingerprint slot and card UID.
+
+    Two hash indexes serve scans from memory: fingerprint slot -> staff
+    profile and card UID -> student profile. Staff come from the faculty
+    and admin lists, fetched with If-None-Match so an unchanged list costs a
+    304. A changed list is diffed against the index and only the slots that
+    differ are replaced. The two lists are authoritative: a slot resolved
+    through /getuserbyfingerprint because neither list had it yet is kept
+    only until the next sync, and is never saved. Students have no list
+    endpoint, so card profiles are read through on first tap and re-checked
+    in small batches once they are older than `card_refresh_age`. A 404 for a card is remembered for
+    `unknown_card_ttl` seconds and re-raised without asking the server, so
+    an unregistered card held on the reader costs one request, not one per
+    read. `version` goes up with every applied
+    change, and the indexes are saved to `path` so a restart starts warm.
+    """
+
+    def __init__(self, client, path=DIRECTORY_PATH, sync_interval=DIRECTORY_SYNC_INTERVAL,
+                 card_refresh_age=CARD_REFRESH_AGE, unknown_card_ttl=UNKNOWN_CARD_TTL):
+        self.client = client
+        self.path = path
+        self.sync_interval = sync_interval
+        self.card_refresh_age = card_refresh_age
+        self.unknown_card_ttl = unknown_card_ttl
+        self.lock = threading.Lock()
+        self.by_fingerprint = {}  # slot (str) -> fingerprint_record
+        self.by_uid = {}  # card UID -> [card_record, fetched_at (wall clock)]
+        self.unknown_uids = {}  # card UID -> (404 response, expires at (monotonic))
+        self.etags = {FACULTY: None, ADMIN: None}
+        self.version = 0
+        self.running = False
+        self.thread = None
+        self.wakeup = threading.Event()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Directory: ignoring unreadable {self.path}: {e}")
+            return
+        self.by_fingerprint = saved.get('fingerprints', {})
+        self.by_uid = saved.get('cards', {})
+        self.etags.update(saved.get('etags', {}))
+        self.version = saved.get('version', 0)
+
+    def save(self):
+        with self.lock:
+            listed = {slot: record for slot, record in self.by_fingerprint.items() if record.get('role')}
+            snapshot = {'version': self.version, 'etags': self.etags,
+                        'fingerprints': listed, 'cards': self.by_uid}
+            data = json.dumps(snapshot, separators=(',', ':'))
+        partial = self.path + '.part'
+        try:
+            with open(partial, 'w') as f:
+                f.write(data)
+            os.replace(partial, self.path)
+        except OSError as e:
+            print(f"Directory: failed to save {self.path}: {e}")
+
+    def peek_fingerprint(self, fingerprint_id):
+        """Memory-only lookup; None when the slot is unknown."""
+        return self.by_fingerprint.get(str(fingerprint_id))
+
+    def name_for_fingerprint(self, fingerprint_id):
+        """Name behind a fingerprint slot, from memory or (on a miss) the API."""
+        record = self.peek_fingerprint(fingerprint_id)
+        if record is not None:
+            return record['name']
+        data = self.client.get_user_by_fingerprint(fingerprint_id)
+        name = data.get('name')
+        if name:
+            with self.lock:
+                # No role: not on a staff list, so the next sync drops it
+                self.by_fingerprint[str(fingerprint_id)] = {'name': name, 'email': None, 'role': None}
+                self.version += 1
+        return name
+
+    def user_for_card(self, uid):
+        """Profile behind a card UID, from memory or (on a miss) the API.
+
+        Raises requests.HTTPError (404 for an unregistered card) like the API call it replaces.
+        """
+        entry = self.by_uid.get(uid)
+        if entry is not None:
+            return entry[0]
+        unknown = self.unknown_uids.get(uid)
+        if unknown is not None:
+            if time.monotonic() < unknown[1]:
+                # A fresh exception per tap: a shared one would pile up tracebacks across tap workers
+                raise requests.HTTPError(f"404 Client Error: Not Found (cached) for card {uid}",
+                                         response=unknown[0])
+            self.unknown_uids.pop(uid, None)
+        try:
+            record = card_record(self.client.get_user_by_id_card(uid))
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                self.unknown_uids[uid] = (e.response, time.monotonic() + self.unknown_card_ttl)
+            raise
+        with self.lock:
+            self.by_uid[uid] = [record, time.time()]
+            self.version += 1
+        return record
+
+    def invalidate_fingerprint(self, fingerprint_id=None):
+        """Forget a slot (or every slot) and refresh the staff lists on the next sync, e.g. after enrollment."""
+        with self.lock:
+            if fingerprint_id is None:
+                self.by_fingerprint.clear()
+            else:
+                self.by_fingerprint.pop(str(fingerprint_id), None)
+            self.etags = {FACULTY: None, ADMIN: None}
+            self.version += 1
+        self.wakeup.set()
+
+    def invalidate_card(self, uid):
+        self.unknown_uids.pop(uid, None)
+        with self.lock:
+            if self.by_uid.pop(uid, None) is not None:
+                self.version += 1
+
+    def _sync_staff(self):
+        """Fetch changed staff lists and apply the per-slot delta. Returns slots changed."""
+        fetched = {}
+        for role, fetch in ((FACULTY, self.client.get_faculties_if_changed),
+                            (ADMIN, self.client.get_admins_if_changed)):
+            users, etag = fetch(self.etags[role])
+            if users is not None:
+                fetched[role] = (users, etag)
+
+        changed = 0
+        with self.lock:
+            for role, (users, etag) in fetched.items():
+                listed = {}
+                for user in users:
+                    for fingerprint_id in fingerprint_ids_of([user]):
+                        listed[fingerprint_id] = fingerprint_record(user, role)
+                # Slots this role used to own but no longer lists
+                stale = [slot for slot, record in self.by_fingerprint.items()
+                         if record.get('role') == role and slot not in listed]
+                for slot in stale:
+                    del self.by_fingerprint[slot]
+                changed += len(stale)
+                for slot, record in listed.items():
+                    if self.by_fingerprint.get(slot) != record:
+                        self.by_fingerprint[slot] = record
+                        changed += 1
+                self.etags[role] = etag
+            # Both lists are current (fetched now or answered 304): drop slots neither of them lists
+            if all(role in fetched or self.etags[role] is not None for role in (FACULTY, ADMIN)):
+                unlisted = [slot for slot, record in self.by_fingerprint.items() if record.get('role') is None]
+                for slot in unlisted:
+                    del self.by_fingerprint[slot]
+                changed += len(unlisted)
+            self.version += changed
+        return changed
+
+    def _refresh_cards(self):
+        """Re-check the oldest card profiles. Returns cards changed or removed."""
+        cutoff = time.time() - self.card_refresh_age
+        due = sorted((fetched_at, uid) for uid, (_, fetched_at) in list(self.by_uid.items()) if fetched_at < cutoff)
+        changed = 0
+        for _, uid in due[:CARD_REFRESH_BATCH]:
+            try:
+                record = card_record(self.client.get_user_by_id_card(uid))
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    self.invalidate_card(uid)
+                    changed += 1
+                continue
+            with self.lock:
+                if self.by_uid.get(uid, [None])[0] != record:
+                    changed += 1
+                    self.version += 1
+                self.by_uid[uid] = [record, time.time()]
+        return changed
+
+    def sync(self):
+        """One delta refresh of staff slots and stale card profiles. Returns entries changed."""
+        now = time.monotonic()
+        for uid, (_, expires_at) in list(self.unknown_uids.items()):
+            if expires_at <= now:
+                self.unknown_uids.pop(uid, None)
+
+        changed = 0
+        try:
+            changed += self._sync_staff()
+            changed += self._refresh_cards()
+        except requests.RequestException as e:
+            print(f"Directory: sync failed, serving cached profiles: {e}")
+        if changed:
+            print(f"Directory: {changed} entries updated (version {self.version}).")
+        self.save()
+        return changed
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def _sync_loop(self):
+        while self.running:
+            self.sync()
+            self.wakeup.wait(self.sync_interval)
+            self.wakeup.clear()